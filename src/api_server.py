@@ -1,74 +1,22 @@
 import asyncio
-import websockets
 import json
+import logging
 import os
 import threading
-from src.core.asr import asr_engine
-try:
-    from src.core.llm import LLMEngine
-except ImportError:
-    LLMEngine = None  # Handle partial initialization if needed
+import time
+from collections import deque
+from http import HTTPStatus
+from src.core import metrics
+from src.core.config import config_store, models_dir
+from src.core.protocol import BINARY_TOPICS, encode_binary
+from src.core.stats import percentile
+# Engines are imported where they are used, so importing the server stays cheap
 
-# Global state for server
-CLIENTS = set()
-CONFIG_FILE = os.path.join(os.path.expanduser("~"), ".a8qingyu_config.json")
-
-# Default Config
-DEFAULT_CONFIG = {
-    "asr_model": "large-v3",
-    "llm_enabled": True,
-    "llm_model": "Qwen2.5-Coder-7B-Instruct-GGUF",
-    "use_cloud": False,
-    "user_dict": ["Python", "PySide6", "LLM", "A8轻语"],
-    "hotkey": "ctrl+left_win",
-    "sound_enabled": False,
-    "overlay_enabled": True,
-    "asr_prompt": "请准确识别以下语音内容，注意准确识别专业术语和中英文混合表达。",
-    "llm_prompt": """你是一个语音转录校正助手。
-你的任务：
-1. 修正转录文本中的同音字错误、错别字和标点符号问题。
-2. 保持原意，不添加或删除信息。
-3. 严格遵循 [用户词典] 中的专业术语。
-
-[用户词典]
-{user_dict}
-
-仅输出校正后的文本，不要输出任何解释。""",
-    "models_status": {}
-}
-
-current_config = DEFAULT_CONFIG.copy()
-
-def load_config():
-    global current_config
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                saved = json.load(f)
-                current_config.update(saved)
-                print(f"Loaded config from {CONFIG_FILE}")
-        except Exception as e:
-            print(f"Failed to load config: {e}")
-    check_models_status()
+logger = logging.getLogger(__name__)
 
-def save_config():
-    try:
-        # Don't save models_status
-        save_data = {k: v for k, v in current_config.items() if k != 'models_status'}
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(save_data, f, ensure_ascii=False, indent=2)
-        print(f"Saved config to {CONFIG_FILE}")
-    except Exception as e:
-        print(f"Failed to save config: {e}")
-
-def check_models_status():
-    base_dir = os.path.join(os.getcwd(), "models")
-    for size in ["large-v3", "medium", "small"]:
-        path = os.path.join(base_dir, f"faster-whisper-{size}")
-        current_config["models_status"][size] = (
-            os.path.exists(os.path.join(path, "config.json")) and 
-            os.path.exists(os.path.join(path, "model.bin"))
-        )
+# Global state for server
+CLIENTS = {}  # websocket -> ClientOutbox
+LAST_APP_STATE = {"type": "app_state", "data": "IDLE", "t": 0.0}  # Replayed to clients that ask (getState)
 
 def get_vram_gb():
     try:
@@ -80,51 +28,379 @@ def get_vram_gb():
         pass
     return 0.0
 
+# High-rate topics where only the newest message matters: a queued older one is replaced.
+# Everything else (app_state, config, progress...) is delivered in order and never dropped.
+LATEST_ONLY_TYPES = {"audio_level", "pipeline_stats", "metrics"}
+OUTBOX_SIZE = 64  # Soft limit: beyond it, latest-only messages are dropped
+OUTBOX_HARD_LIMIT = 512  # A client this far behind on guaranteed messages is disconnected
+
+
+class ClientOutbox:
+    """Bounded outgoing queue and writer task for one WebSocket client.
+    Must be used from the server event loop."""
+
+    def __init__(self, websocket, history=200):
+        self.websocket = websocket
+        # Topic subscription: None = everything (JSON), set via the "subscribe" action
+        self.topics = None
+        self.binary = set()
+        self._queue = deque()  # (msg_type, message, enqueued_at)
+        self._wakeup = asyncio.Event()
+        self.connected_at = time.time()
+        self.sent = 0
+        self.dropped = 0
+        self.replaced = 0
+        self.max_depth = 0
+        self._lag = deque(maxlen=history)
+        self._closing = False
+        self.task = asyncio.create_task(self._writer())
+
+    def subscribe(self, topics=None, binary=()):
+        self.topics = None if topics is None or "*" in topics else set(topics)
+        self.binary = {t for t in binary if t in BINARY_TOPICS}
+
+    def wants(self, msg_type):
+        return self.topics is None or msg_type in self.topics
+
+    def put(self, message, msg_type=None):
+        if self._closing:
+            return
+        now = time.perf_counter()
+        if msg_type in LATEST_ONLY_TYPES:
+            for i, (queued_type, _, _) in enumerate(self._queue):
+                if queued_type == msg_type:
+                    # Latest wins, keep the original slot so ordering stays sane
+                    self._queue[i] = (msg_type, message, now)
+                    self.replaced += 1
+                    return
+            if len(self._queue) >= OUTBOX_SIZE:
+                self.dropped += 1
+                return
+        elif len(self._queue) >= OUTBOX_HARD_LIMIT:
+            logger.warning("WebSocket client stuck (%s queued), disconnecting", len(self._queue))
+            self.close()
+            return
+        self._queue.append((msg_type, message, now))
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._wakeup.set()
+
+    async def _writer(self):
+        from websockets.exceptions import ConnectionClosed
+        try:
+            while True:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                msg_type, message, enqueued_at = self._queue.popleft()
+                await self.websocket.send(message)
+                self.sent += 1
+                self._lag.append(time.perf_counter() - enqueued_at)
+        except ConnectionClosed:
+            pass
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning("Client writer error: %s", e)
+        finally:
+            self._closing = True
+
+    def close(self):
+        self._closing = True
+        self._queue.clear()
+        self.task.cancel()
+        asyncio.ensure_future(self.websocket.close())
+
+    def stats(self):
+        lag = list(self._lag)
+        remote = getattr(self.websocket, "remote_address", None)
+        return {
+            "client": f"{remote[0]}:{remote[1]}" if remote else None,
+            "connected_s": round(time.time() - self.connected_at, 1),
+            "topics": sorted(self.topics) if self.topics is not None else "*",
+            "binary": sorted(self.binary),
+            "queue": len(self._queue),
+            "max_queue": self.max_depth,
+            "sent": self.sent,
+            "replaced": self.replaced,
+            "dropped": self.dropped,
+            "lag_ms": {
+                "p50": round(percentile(lag, 50) * 1000, 2),
+                "p99": round(percentile(lag, 99) * 1000, 2),
+                "max": round(max(lag) * 1000, 2) if lag else 0.0,
+            },
+        }
+
+
+def client_stats():
+    return [outbox.stats() for outbox in list(CLIENTS.values())]
+
+
+# --- Metrics: GET /metrics on the WebSocket port, "metrics" topic, getMetrics action ---
+METRICS_PATH = "/metrics"
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_INTERVAL_S = 2.0  # "metrics" topic push interval
+# Counters of disconnected clients, so the exported totals never go backwards
+OUTBOX_TOTALS = {"sent": 0, "replaced": 0, "dropped": 0}
+
+def collect_server_metrics():
+    Family = metrics.Family
+    outboxes = list(CLIENTS.values())
+    out = [Family("a8_ws_clients", "gauge", "Connected WebSocket clients").add(len(outboxes))]
+    for key, help_text in (("sent", "Messages written to clients"),
+                           ("replaced", "Latest-only messages replaced in a client queue"),
+                           ("dropped", "Messages dropped for slow clients")):
+        total = OUTBOX_TOTALS[key] + sum(getattr(o, key) for o in outboxes)
+        out.append(Family(f"a8_ws_messages_{key}_total", "counter", help_text).add(total))
+    out.append(Family("a8_ws_queue_depth", "gauge", "Deepest client outbox right now").add(
+        max((len(o._queue) for o in outboxes), default=0)))
+    out.append(Family("a8_dropped_events_total", "counter", "Events dropped or replaced before delivery")
+               .add(OUTBOX_TOTALS["dropped"] + sum(o.dropped for o in outboxes), source="ws_clients", reason="slow_client")
+               .add(OUTBOX_TOTALS["replaced"] + sum(o.replaced for o in outboxes), source="ws_clients", reason="coalesced"))
+    out.append(Family("a8_app_state", "gauge", "Current app state").add(1, state=LAST_APP_STATE.get("data")))
+    if transcription_service is not None:
+        out += metrics.stats_families("a8_stream_asr", transcription_service.stats(),
+                                      counters=("finals", "partials", "skipped_partials", "errors",
+                                                "audio_seconds", "busy_seconds"))
+    if asr_batcher is not None:
+        out += metrics.stats_families("a8_asr_batch", asr_batcher.stats(),
+                                      counters=("requests", "batches", "expired", "failed"))
+    return out
+
+async def process_request(connection, request):
+    """Answer plain HTTP GET /metrics (Prometheus text); anything else continues the WebSocket handshake.
+    websockets >= 14 passes (connection, request), the legacy server (path, headers)."""
+    legacy = isinstance(connection, str)
+    path = connection if legacy else request.path
+    if path.split("?", 1)[0] != METRICS_PATH:
+        return None
+    body = await asyncio.get_running_loop().run_in_executor(None, metrics.registry.render)
+    if legacy:
+        return HTTPStatus.OK, [("Content-Type", METRICS_CONTENT_TYPE)], body.encode("utf-8")
+    response = connection.respond(HTTPStatus.OK, body)
+    del response.headers["Content-Type"]
+    response.headers["Content-Type"] = METRICS_CONTENT_TYPE
+    return response
+
+async def publish_metrics():
+    """Push snapshots to clients that subscribed to "metrics" by name (not to catch-all clients)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(METRICS_INTERVAL_S)
+        targets = [o for o in list(CLIENTS.values()) if o.topics and "metrics" in o.topics]
+        if not targets:
+            continue
+        data = await loop.run_in_executor(None, metrics.registry.snapshot)
+        text = json.dumps({"type": "metrics", "data": data})
+        for outbox in targets:
+            outbox.put(text, "metrics")
+
+
+def send_to(websocket, message):
+    """Queue a reply for one client (keeps ordering with broadcasts)"""
+    outbox = CLIENTS.get(websocket)
+    msg_type = message.get("type") if isinstance(message, dict) else None
+    if isinstance(message, dict):
+        message = json.dumps(message)
+    if outbox:
+        outbox.put(message, msg_type)
+
+
+# --- Cached disk / CUDA probes ---
+# getConfig replies from the config store; the blocking probes run in an executor
+# and the store only rescans models when a directory mtime changed.
+PROBE_CACHE = {"vram_gb": None}
+_probe_lock = threading.Lock()
+_probe_task = None
+
+def refresh_probes(force=False):
+    """Blocking: rescan models if their directories changed, probe VRAM once.
+    Returns (models_changed, vram_changed). Run off the event loop."""
+    with _probe_lock:
+        vram_changed = False
+        models_changed = config_store.refresh_models_status(force)
+        if PROBE_CACHE["vram_gb"] is None:
+            PROBE_CACHE["vram_gb"] = get_vram_gb()
+            vram_changed = True
+        return models_changed, vram_changed
+
+async def _refresh_probes_async(force=False):
+    loop = asyncio.get_running_loop()
+    models_changed, vram_changed = await loop.run_in_executor(None, refresh_probes, force)
+    if models_changed:
+        await broadcast({"type": "config", "data": config_store.snapshot()})
+    if vram_changed:
+        await broadcast({"type": "vram", "data": PROBE_CACHE["vram_gb"]})
+
+def schedule_probe_refresh(force=False):
+    """Start a background refresh unless one is already running (event loop only)"""
+    global _probe_task
+    if _probe_task is None or _probe_task.done():
+        _probe_task = asyncio.ensure_future(_refresh_probes_async(force))
+
 async def broadcast(message):
+    """Encode once per wire format and hand the message to every subscribed client's outbox.
+    Never waits on a client."""
+    global LAST_APP_STATE
+    msg_type = message.get("type") if isinstance(message, dict) else None
+    if msg_type == "app_state":
+        LAST_APP_STATE = message
     if not CLIENTS:
         return
-    if isinstance(message, dict):
-        message = json.dumps(message)
-    # Filter out closed clients
-    to_remove = set()
-    for client in list(CLIENTS):  # Use list() to avoid modification during iteration
-        try:
-            await client.send(message)
-        except websockets.exceptions.ConnectionClosed:
-            to_remove.add(client)
-        except Exception as e:
-            # Handle any other errors gracefully
-            print(f"Broadcast error: {e}")
-            to_remove.add(client)
-    for client in to_remove:
+    text = message if not isinstance(message, dict) else None
+    frame = None
+    for outbox in list(CLIENTS.values()):
+        if not outbox.wants(msg_type):
+            continue
+        if msg_type in outbox.binary:
+            if frame is None:
+                frame = encode_binary(msg_type, message.get("data")) or b""
+            if frame:
+                outbox.put(frame, msg_type)
+                continue
+        if text is None:
+            text = json.dumps(message)
+        outbox.put(text, msg_type)
+
+# --- Streaming transcription (shares the loaded ASR model) ---
+transcription_service = None
+
+asr_batcher = None
+
+def get_transcription_service():
+    global transcription_service, asr_batcher
+    if transcription_service is None:
+        from src.core.asr import asr_engine
+        from src.core.asr_batch import BatchingScheduler
+        from src.core.asr_service import TranscriptionService
+        batch_size = config_store.get("asr_batch_size", 8)
+        asr_batcher = BatchingScheduler(asr_engine, max_batch_size=batch_size,
+                                        max_wait_ms=float(config_store.get("asr_batch_wait_ms", 10)))
+        # One service worker per batch slot so concurrent sessions can share a batch
+        transcription_service = TranscriptionService(asr_batcher, workers=batch_size, partial_deadline_ms=2000)
+    return transcription_service
+
+def _stream_emitter(websocket, loop):
+    """Service callbacks run on ASR worker threads: hop back onto the loop to send"""
+    def emit(msg_type, data):
+        loop.call_soon_threadsafe(send_to, websocket, {"type": msg_type, "data": data})
+    return emit
+
+def handle_transcribe_action(websocket, action, payload, streams):
+    """transcribe.start / transcribe.stop / transcribe.stats. `streams` maps websocket -> session."""
+    service = get_transcription_service()
+    if action == "transcribe.start":
+        if getattr(service.asr, "model", True) is None:
+            send_to(websocket, {"type": "transcript_error", "data": {"error": "ASR model not loaded"}})
+            return
+        old = streams.pop(websocket, None)
+        if old:
+            service.cancel(old)
         try:
-            CLIENTS.discard(client)  # Use discard to avoid KeyError
-        except:
-            pass
+            session = service.open(
+                _stream_emitter(websocket, asyncio.get_running_loop()),
+                fmt=payload.get("format", "pcm_s16le"),
+                prompt=payload.get("prompt", config_store.get("asr_prompt")),
+                partial_interval_ms=payload.get("partial_interval_ms", 1000),
+            )
+        except (ValueError, RuntimeError) as e:
+            send_to(websocket, {"type": "transcript_error", "data": {"error": str(e)}})
+            return
+        streams[websocket] = session
+        send_to(websocket, {"type": "transcribe_started", "data": {
+            "session": session.id, "sample_rate": 16000, "format": session.format}})
+    elif action == "transcribe.stop":
+        session = streams.pop(websocket, None)
+        if session:
+            service.finish(session)
+    elif action == "transcribe.stats":
+        stats = service.stats()
+        if asr_batcher is not None:
+            stats["batching"] = asr_batcher.stats()
+        send_to(websocket, {"type": "transcribe_stats", "data": stats})
+
+def handle_audio_frame(websocket, frame, streams):
+    """Binary frame: raw 16 kHz mono PCM for the client's open stream"""
+    session = streams.get(websocket)
+    if session is None:
+        return
+    try:
+        get_transcription_service().feed(session, frame)
+    except ValueError as e:
+        streams.pop(websocket, None)
+        get_transcription_service().cancel(session)
+        send_to(websocket, {"type": "transcript_error", "data": {"session": session.id, "error": str(e)}})
+
+async def handle_profile_action(websocket, action, payload):
+    """
+    profile.start {"interval_ms", "max_seconds"} / profile.stop {"format": "speedscope" | "collapsed"}
+    / profile.status. Samples every thread of this process; the stop reply carries the file path.
+    Any page or local process can reach this port, so clients never choose where the file is
+    written: it always goes to sampler.REPORT_FILE.
+    """
+    from src.core.sampler import sampler
+    try:
+        if action == "profile.start":
+            status = sampler.start(payload.get("interval_ms", 10.0), payload.get("max_seconds", 120.0))
+            send_to(websocket, {"type": "profile_status", "data": status})
+        elif action == "profile.stop":
+            loop = asyncio.get_running_loop()
+            # Joining the sampler and writing the file stay off the event loop
+            profile = await loop.run_in_executor(None, sampler.stop)
+            if profile is None:
+                raise RuntimeError("No profile recorded")
+            path = await loop.run_in_executor(
+                None, profile.dump, None, payload.get("format", "speedscope"))
+            logger.info("Profile written to %s", path)
+            send_to(websocket, {"type": "profile", "data": dict(profile.summary(), path=path)})
+        elif action == "profile.status":
+            send_to(websocket, {"type": "profile_status", "data": sampler.status()})
+    except (RuntimeError, ValueError, OSError) as e:
+        send_to(websocket, {"type": "profile_error", "data": {"error": str(e)}})
+
+STREAMS = {}  # websocket -> StreamSession
 
 async def handler(websocket):
-    CLIENTS.add(websocket)
-    print("New WebSocket client connected")
+    from websockets.exceptions import ConnectionClosed
+    CLIENTS[websocket] = ClientOutbox(websocket)
+    logger.debug("New WebSocket client connected")
     try:
         async for message in websocket:
+            if isinstance(message, bytes):
+                handle_audio_frame(websocket, message, STREAMS)
+                continue
             try:
                 data = json.loads(message)
                 action = data.get("action")
                 payload = data.get("payload", {})
                 
-                if action == "getConfig":
-                    check_models_status()
-                    await websocket.send(json.dumps({"type": "config", "data": current_config}))
+                if (action or "").startswith("transcribe."):
+                    handle_transcribe_action(websocket, action, payload, STREAMS)
+
+                elif action == "subscribe":
+                    # {"topics": [...] | ["*"], "binary": [...]}; replies with the effective subscription
+                    outbox = CLIENTS[websocket]
+                    outbox.subscribe(payload.get("topics"), payload.get("binary", ()))
+                    send_to(websocket, {"type": "subscribed", "data": {
+                        "topics": sorted(outbox.topics) if outbox.topics is not None else ["*"],
+                        "binary": sorted(outbox.binary),
+                    }})
+
+                elif action == "getState":
+                    # Reconnecting clients sync immediately instead of waiting for the next change
+                    send_to(websocket, LAST_APP_STATE)
+
+                elif action == "getConfig":
+                    # Pure in-memory reply; probes refresh in the background and push changes
+                    send_to(websocket, {"type": "config", "data": config_store.snapshot()})
                     # Also send VRAM
-                    await websocket.send(json.dumps({"type": "vram", "data": get_vram_gb()}))
+                    send_to(websocket, {"type": "vram", "data": PROBE_CACHE["vram_gb"] or 0.0})
+                    schedule_probe_refresh()
                 
                 elif action == "saveConfig":
-                    new_config = payload
-                    if "models_status" in new_config:
-                        del new_config["models_status"]
-                    current_config.update(new_config)
-                    save_config()
-                    await broadcast({"type": "config", "data": current_config})
+                    # Typed, debounced and atomic; models_status is derived and ignored
+                    config_store.update(payload)
+                    await broadcast({"type": "config", "data": config_store.snapshot()})
                     
                 elif action == "downloadModel":
                     # Start download in thread
@@ -134,39 +410,62 @@ async def handler(websocket):
                 elif action == "downloadLLM":
                      threading.Thread(target=download_llm_worker, daemon=True).start()
                      
+                elif action == "getTraces":
+                     from src.core.tracing import tracer
+                     send_to(websocket, {
+                         "type": "trace_summary",
+                         "data": {"summary": tracer.summary(), "recent": tracer.recent(payload.get("n", 20))}
+                     })
+
+                elif action == "getMetrics":
+                    # {"format": "json" (default) | "prometheus"}
+                    loop = asyncio.get_running_loop()
+                    if payload.get("format") == "prometheus":
+                        text = await loop.run_in_executor(None, metrics.registry.render)
+                        send_to(websocket, {"type": "metrics_text", "data": text})
+                    else:
+                        data = await loop.run_in_executor(None, metrics.registry.snapshot)
+                        send_to(websocket, {"type": "metrics", "data": data})
+
+                elif (action or "").startswith("profile."):
+                    await handle_profile_action(websocket, action, payload)
+
+                elif action == "getClientStats":
+                     send_to(websocket, {"type": "client_stats", "data": client_stats()})
+
                 elif action == "checkLLM":
-                     path = os.path.join(os.getcwd(), "models", "qwen2.5-coder-7b-instruct-q4_k_m.gguf")
+                     path = os.path.join(models_dir(), "qwen2.5-coder-7b-instruct-q4_k_m.gguf")
                      exists = os.path.exists(path)
-                     await websocket.send(json.dumps({"type": "llm_status", "exists": exists}))
+                     send_to(websocket, {"type": "llm_status", "exists": exists})
 
             except json.JSONDecodeError:
-                print(f"Invalid JSON: {message}")
+                logger.warning("Invalid JSON: %s", message)
             except Exception as e:
-                print(f"Error handling message: {e}")
-                import traceback
-                traceback.print_exc()
-    except websockets.exceptions.ConnectionClosed:
+                logger.exception("Error handling message: %s", e)
+    except ConnectionClosed:
         pass
     except Exception as e:
-        print(f"WebSocket handler error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("WebSocket handler error: %s", e)
     finally:
-        CLIENTS.discard(websocket)  # Use discard to avoid KeyError
-        print("Client disconnected")
+        session = STREAMS.pop(websocket, None)
+        if session:
+            get_transcription_service().cancel(session)
+        outbox = CLIENTS.pop(websocket, None)
+        if outbox:
+            outbox.task.cancel()
+            for key in OUTBOX_TOTALS:
+                OUTBOX_TOTALS[key] += getattr(outbox, key)
+        logger.debug("Client disconnected")
 
 def start_server(host="127.0.0.1", port=9000):
-    load_config()
-    print(f"Starting WebSocket server on ws://{host}:{port}")
-    # Enable websockets debug logging
-    import logging
-    logger = logging.getLogger('websockets')
-    logger.setLevel(logging.INFO)
-    logger.addHandler(logging.StreamHandler())
+    config_store.load()
+    logger.info("Starting WebSocket server on ws://%s:%s", host, port)
+    import websockets
 
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
-    start_server = websockets.serve(handler, host, port)
+    metrics.registry.register("server", collect_server_metrics)
+    start_server = websockets.serve(handler, host, port, process_request=process_request)
     loop.run_until_complete(start_server)
     loop.run_forever()
 
@@ -192,21 +491,27 @@ def send_update_sync(message):
             # We'll need a reference to the loop. 
             pass
     except Exception as e:
-        print(f"Send update failed: {e}")
+        logger.warning("Send update failed: %s", e)
 
 # We need a global reference to the loop to send messages from threads
 SERVER_LOOP = None
+SERVER_READY = threading.Event()  # Set once the server is listening
 
 def start_server_wrapper():
     global SERVER_LOOP
-    load_config()
-    print("Starting WebSocket server...")
+    config_store.load()
+    logger.info("Starting WebSocket server...")
     
     async def serve():
         global SERVER_LOOP
+        import websockets  # Imported on the server thread, off the first-window path
         SERVER_LOOP = asyncio.get_running_loop()
-        async with websockets.serve(handler, "127.0.0.1", 9000):
-            print("WebSocket Server Listening on port 9000")
+        schedule_probe_refresh()
+        metrics.registry.register("server", collect_server_metrics)
+        asyncio.ensure_future(publish_metrics())
+        async with websockets.serve(handler, "127.0.0.1", 9000, process_request=process_request):
+            logger.info("WebSocket Server Listening on port 9000 (metrics: http://127.0.0.1:9000/metrics)")
+            SERVER_READY.set()
             await asyncio.Future()  # run forever
 
     try:
@@ -214,9 +519,9 @@ def start_server_wrapper():
     except KeyboardInterrupt:
         pass
     except Exception as e:
-        print(f"WebSocket server error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("WebSocket server error: %s", e)
+    finally:
+        SERVER_READY.set()  # Never leave startup waiting on a server that failed to bind
 
 
 # Robust Messaging
@@ -225,55 +530,71 @@ def emit_status(type_str, data):
     Thread-safe emit to all clients.
     Attempts to schedule the broadcast on the running event loop.
     """
-    global SERVER_LOOP
+    global SERVER_LOOP, LAST_APP_STATE
+    message = {"type": type_str, "data": data}
+    if type_str == "app_state":
+        message["t"] = time.time()  # Lets clients measure cross-process state latency
+        LAST_APP_STATE = message  # Kept even before the loop runs, for getState
     if SERVER_LOOP and SERVER_LOOP.is_running():
         try:
-            asyncio.run_coroutine_threadsafe(broadcast({"type": type_str, "data": data}), SERVER_LOOP)
+            asyncio.run_coroutine_threadsafe(broadcast(message), SERVER_LOOP)
         except Exception as e:
-            print(f"Emit failed: {e}")
+            logger.warning("Emit failed: %s", e)
     else:
         # Don't print warning for every dropped message - too noisy
         pass
 
 # Re-implement download workers using emit_status
+def _fetch_progress(model, progress_type):
+    """Fetcher callback: real byte progress (capped below 1.0 until verified) plus throughput"""
+    def report(p):
+        fraction = min(p["progress"], 0.99)
+        emit_status(progress_type, {"model": model, "progress": fraction} if progress_type == "model_progress" else fraction)
+        emit_status("download_stats", dict(p, model=model))
+    return report
+
 def download_worker(model_size):
-    from huggingface_hub import snapshot_download
+    from src.core.fetcher import fetch_hf
     
     repo_id = f"Systran/faster-whisper-{model_size}"
-    save_dir = os.path.join(os.getcwd(), "models", f"faster-whisper-{model_size}")
+    save_dir = os.path.join(models_dir(), f"faster-whisper-{model_size}")
     os.environ["HF_ENDPOINT"] = "https://hf-mirror.com"
     
     emit_status("model_progress", {"model": model_size, "progress": 0.01})
     
     try:
-        snapshot_download(repo_id=repo_id, local_dir=save_dir, max_workers=4, resume_download=True)
-        check_models_status()
+        fetch_hf(repo_id, save_dir, on_progress=_fetch_progress(model_size, "model_progress"))
+        config_store.refresh_models_status(force=True)
         
         # Init engine
         try:
+             from src.core.asr import asr_engine
              asr_engine.initialize(model_size=model_size)
         except Exception as e:
-             print(f"Auto-init warning: {e}")
+             logger.warning("Auto-init warning: %s", e)
              
-        emit_status("config", current_config)
+        emit_status("config", config_store.snapshot())
         emit_status("model_progress", {"model": model_size, "progress": 1.0})
     except Exception as e:
-        print(f"Download failed: {e}")
+        logger.error("Download failed: %s", e)
         emit_status("model_progress", {"model": model_size, "progress": -1.0})
 
 def download_llm_worker():
-    from huggingface_hub import hf_hub_download
+    from src.core.fetcher import fetch_hf
     repo_id = "Qwen/Qwen2.5-Coder-7B-Instruct-GGUF"
     filename = "qwen2.5-coder-7b-instruct-q4_k_m.gguf"
-    save_dir = os.path.join(os.getcwd(), "models")
+    save_dir = models_dir()
     os.environ["HF_ENDPOINT"] = "https://hf-mirror.com"
     
     emit_status("llm_progress", 0.01)
     try:
-        hf_hub_download(repo_id=repo_id, filename=filename, local_dir=save_dir, resume_download=True)
+        fetch_hf(repo_id, save_dir, [filename], on_progress=_fetch_progress("llm", "llm_progress"))
         emit_status("llm_progress", 1.0)
     except Exception as e:
+        logger.error("LLM download failed: %s", e)
         emit_status("llm_progress", -1.0)
 
 if __name__ == "__main__":
+    from src.core import log
+    log.setup()
     start_server_wrapper()
@@ -0,0 +1,166 @@
+"""
+Batch transcription CLI.
+
+Transcribes files or folders of recorded audio with the same model and
+prompt settings as the desktop app, spread across a pool of worker
+processes. Each worker loads the model once. Results stream to a JSONL file
+(one line per file as soon as it finishes); re-running with the same output
+skips files that already succeeded.
+
+Usage:
+    A8轻语.exe --transcribe recordings/ -o transcripts.jsonl
+    python src/main_webview.py --transcribe a.wav b.mp3 recordings/ -o out.jsonl --workers 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Add project root to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from src.core.config import config_store
+from src.core.threads import available_cores
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".opus", ".aac", ".wma", ".mp4", ".webm")
+
+# Per-process engine, created by _init_worker
+_worker_asr = None
+
+
+def collect_files(inputs, recursive=True):
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _dirs, names in os.walk(item):
+                for name in sorted(names):
+                    if name.lower().endswith(AUDIO_EXTENSIONS):
+                        files.append(os.path.abspath(os.path.join(root, name)))
+                if not recursive:
+                    break
+        elif os.path.isfile(item):
+            files.append(os.path.abspath(item))
+        else:
+            print(f"[WARN] Skipping missing input: {item}", file=sys.stderr)
+    # Keep order stable and drop duplicates
+    return list(dict.fromkeys(files))
+
+
+def load_done(output_path):
+    """Paths that already have a successful result in the output file"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partial last line from an interrupted run
+            if record.get("path") and not record.get("error"):
+                done.add(record["path"])
+    return done
+
+
+def _init_worker(model_size, device, cpu_threads):
+    """Runs once per worker process: load the model a single time"""
+    global _worker_asr
+    # Keep worker logs off stdout-redirected pipes in the frozen app
+    sys.stdout = sys.stderr
+    from src.core import log
+    log.setup()  # Engine logs go to stderr through the log queue
+    from src.core.asr import ASREngine
+    _worker_asr = ASREngine()
+    compute_type = "float16" if device == "cuda" else "int8"
+    _worker_asr.initialize(model_size=model_size, device=device, compute_type=compute_type,
+                           cpu_threads=cpu_threads)
+
+
+def _transcribe_file(path, prompt):
+    start = time.perf_counter()
+    record = {"path": path}
+    try:
+        text, info = _worker_asr.transcribe(path, prompt=prompt, with_info=True)
+        record["text"] = text
+        record["duration"] = round(float(getattr(info, "duration", 0.0) or 0.0), 3)
+    except Exception as e:
+        record["error"] = str(e)
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    record["pid"] = os.getpid()
+    return record
+
+
+def plan_workers(device, workers, threads_per_worker):
+    """Fill the machine: workers x threads ~= available cores on CPU, one worker per GPU"""
+    cores = len(available_cores())
+    if device == "cuda":
+        return workers or 1, threads_per_worker or 2
+    threads_per_worker = threads_per_worker or (4 if cores >= 16 else 2 if cores >= 4 else 1)
+    workers = workers or max(1, cores // threads_per_worker)
+    return workers, threads_per_worker
+
+
+def main(argv=None):
+    config_store.load()
+    parser = argparse.ArgumentParser(prog="--transcribe", description="Batch transcribe audio files")
+    parser.add_argument("inputs", nargs="+", help="Audio files and/or folders")
+    parser.add_argument("-o", "--output", default="transcripts.jsonl", help="JSONL results (appended, resumable)")
+    parser.add_argument("--model", default=config_store.get("asr_model"), help="ASR model size (default: app config)")
+    parser.add_argument("--prompt", default=config_store.get("asr_prompt") or None, help="Initial prompt (default: app config)")
+    parser.add_argument("--device", choices=["cpu", "cuda"], default="cpu")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (0 = auto)")
+    parser.add_argument("--threads-per-worker", type=int, default=0, help="ctranslate2 threads per worker (0 = auto)")
+    parser.add_argument("--no-recursive", dest="recursive", action="store_false")
+    parser.add_argument("--no-resume", dest="resume", action="store_false", help="Re-transcribe files already in the output")
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.inputs, args.recursive)
+    done = load_done(args.output) if args.resume else set()
+    todo = [f for f in files if f not in done]
+    if done:
+        print(f"[INFO] Resuming: {len(files) - len(todo)} of {len(files)} files already done", file=sys.stderr)
+    if not todo:
+        print("[OK] Nothing to do", file=sys.stderr)
+        return 0
+
+    workers, threads = plan_workers(args.device, args.workers, args.threads_per_worker)
+    workers = min(workers, len(todo))
+    print(f"[INFO] Transcribing {len(todo)} files with {workers} workers x {threads} threads "
+          f"(model={args.model}, device={args.device})", file=sys.stderr)
+
+    start = time.perf_counter()
+    audio_seconds = 0.0
+    failed = 0
+    with open(args.output, "a", encoding="utf-8") as out, ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(args.model, args.device, threads)) as pool:
+        futures = {pool.submit(_transcribe_file, path, args.prompt): path for path in todo}
+        for n, future in enumerate(as_completed(futures), 1):
+            try:
+                record = future.result()
+            except Exception as e:
+                # Worker crashed (e.g. model failed to load): record it so the file is retried next run
+                record = {"path": futures[future], "error": f"worker failed: {e}"}
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            if record.get("error"):
+                failed += 1
+            audio_seconds += record.get("duration", 0.0)
+            print(f"[{n}/{len(todo)}] {os.path.basename(record['path'])} "
+                  f"({record.get('seconds', 0):.1f}s){' ERROR: ' + record['error'] if record.get('error') else ''}",
+                  file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    speed = audio_seconds / elapsed if elapsed else 0.0
+    print(f"[OK] Done: {len(todo) - failed} ok, {failed} failed, {audio_seconds:.0f}s audio in {elapsed:.0f}s "
+          f"({speed:.1f}x realtime) -> {args.output}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Benchmark: dynamic batching vs. one-by-one ASR under concurrent load.
+
+N client threads each transcribe clips in a closed loop, either calling the
+engine directly (requests serialize on the single model) or through the
+BatchingScheduler. Reports throughput and latency percentiles per
+concurrency level, so both the scaling and the single-stream latency
+(concurrency 1) can be compared.
+
+The fake engine models a GPU-like cost: a fixed per-pass cost plus a small
+per-clip cost, so batching amortizes the fixed part. The real engine loads
+faster-whisper exactly like the app.
+
+Usage:
+    python -m src.bench.batching --engine fake --concurrency 1 2 4 8
+    python -m src.bench.batching --engine real --wav-dir fixtures/ --asr-model small --device cuda
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.core.asr_batch import BatchingScheduler
+from src.core.stats import percentile
+
+
+class FakeBatchASR:
+    """One decode pass costs base_ms + per_clip_ms x clips; only one pass runs at a time"""
+
+    model = object()
+
+    def __init__(self, base_ms=120.0, per_clip_ms=15.0):
+        self.base_ms = base_ms
+        self.per_clip_ms = per_clip_ms
+        self._lock = threading.Lock()
+
+    def transcribe_batch(self, audios, prompts=None):
+        with self._lock:
+            time.sleep((self.base_ms + self.per_clip_ms * len(audios)) / 1000.0)
+        return ["模拟识别结果"] * len(audios)
+
+    def transcribe(self, audio, prompt=None, **_):
+        return self.transcribe_batch([audio], [prompt])[0]
+
+
+def load_clips(args):
+    """Returns (clips, seconds per clip)"""
+    if args.engine == "fake":
+        import numpy as np
+        clips = [np.zeros(int(16000 * args.fake_clip_s), dtype=np.float32)] * 4
+        return clips, [args.fake_clip_s] * len(clips)
+    from faster_whisper.audio import decode_audio
+    files = sorted(glob.glob(os.path.join(args.wav_dir, "*.wav")))
+    if not files:
+        raise SystemExit(f"No .wav files in {args.wav_dir}")
+    clips = [decode_audio(f) for f in files]
+    return clips, [len(c) / 16000.0 for c in clips]
+
+
+def load_engine(args):
+    if args.engine == "fake":
+        return FakeBatchASR(args.fake_base_ms, args.fake_per_clip_ms)
+    from src.core.asr import ASREngine
+    asr = ASREngine()
+    asr.initialize(model_size=args.asr_model, device=args.device,
+                   compute_type="float16" if args.device == "cuda" else "int8")
+    return asr
+
+
+def run_level(transcribe, clips, seconds, concurrency, requests_per_client):
+    latencies = []
+    audio = [0.0]
+    lock = threading.Lock()
+
+    def client(offset):
+        for k in range(requests_per_client):
+            i = (offset + k) % len(clips)
+            start = time.perf_counter()
+            transcribe(clips[i])
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                audio[0] += seconds[i]
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / wall, 2),
+        "throughput_x_realtime": round(audio[0] / wall, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dynamic batching vs direct ASR under concurrency")
+    parser.add_argument("--engine", choices=["fake", "real"], default="fake")
+    parser.add_argument("--wav-dir", help="Clips for the real engine (each <= 30 s is batched)")
+    parser.add_argument("--asr-model", default="small")
+    parser.add_argument("--device", choices=["cpu", "cuda"], default="cuda")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--requests", type=int, default=8, help="Requests per client per level")
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--fake-base-ms", type=float, default=120.0)
+    parser.add_argument("--fake-per-clip-ms", type=float, default=15.0)
+    parser.add_argument("--fake-clip-s", type=float, default=4.0)
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    # Model logs go to stderr so stdout stays pure JSON
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        asr = load_engine(args)
+        clips, seconds = load_clips(args)
+        batcher = BatchingScheduler(asr, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+        asr.transcribe(clips[0])  # Warm-up
+        results = {"direct": [], "batched": []}
+        for n in args.concurrency:
+            results["direct"].append(run_level(asr.transcribe, clips, seconds, n, args.requests))
+            results["batched"].append(run_level(batcher.transcribe, clips, seconds, n, args.requests))
+    finally:
+        sys.stdout = real_stdout
+
+    report = {
+        "engine": args.engine,
+        "max_batch_size": args.max_batch_size,
+        "max_wait_ms": args.max_wait_ms,
+        "results": results,
+        "scheduler": batcher.stats(),
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: ConfigStore reads and debounced saves vs. the old per-save rewrite.
+
+    reads     - ns per lock-free `config_store.get` vs. reading the JSON file
+                (what a path without a cached dict would pay)
+    saves     - a burst of --updates saveConfig calls (e.g. a slider being
+                dragged): files written by the old path (one full rewrite per
+                call) vs. the debounced store; the file on disk must be
+                valid JSON with the last value at the end
+Runs against a temporary config file; the real ~/.a8qingyu_config.json is not touched.
+
+Usage:
+    python -m src.bench.config
+    python -m src.bench.config --updates 200 --output config.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.core.config import ConfigStore
+
+
+def legacy_save(path, config):
+    """The old saveConfig body: rewrite the whole file in place"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=4, ensure_ascii=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ConfigStore reads and debounced saves")
+    parser.add_argument("--reads", type=int, default=200000)
+    parser.add_argument("--updates", type=int, default=100)
+    parser.add_argument("--interval-ms", type=float, default=5.0, help="Gap between updates in the burst")
+    parser.add_argument("--save-delay", type=float, default=0.5)
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    work = tempfile.mkdtemp(prefix="a8_config_")
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        path = os.path.join(work, "config.json")
+        store = ConfigStore(path=path, save_delay=args.save_delay)
+        store.load()
+
+        start = time.perf_counter()
+        for _ in range(args.reads):
+            store.get("llm_enabled")
+        store_ns = (time.perf_counter() - start) / args.reads * 1e9
+
+        legacy_save(path, store.snapshot())
+        file_reads = max(args.reads // 100, 1)
+        start = time.perf_counter()
+        for _ in range(file_reads):
+            with open(path, 'r', encoding='utf-8') as f:
+                json.load(f).get("llm_enabled")
+        file_ns = (time.perf_counter() - start) / file_reads * 1e9
+
+        # Burst of saves
+        legacy_path = os.path.join(work, "legacy.json")
+        config = dict(store.snapshot())
+        start = time.perf_counter()
+        for i in range(args.updates):
+            config["ui_fps"] = i + 1
+            legacy_save(legacy_path, config)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        update_s = 0.0
+        for i in range(args.updates):
+            t = time.perf_counter()
+            store.update({"ui_fps": str(i + 1)})  # Strings from the UI are coerced to int
+            update_s += time.perf_counter() - t
+            time.sleep(args.interval_ms / 1000.0)
+        time.sleep(args.save_delay * 2)
+        with open(path, 'r', encoding='utf-8') as f:
+            on_disk = json.load(f)
+        leftovers = [n for n in os.listdir(work) if n.endswith(".tmp")]
+    finally:
+        sys.stdout = real_stdout
+        shutil.rmtree(work, ignore_errors=True)
+
+    report = {
+        "reads": {
+            "store_get_ns": round(store_ns, 1),
+            "json_file_read_ns": round(file_ns, 1),
+        },
+        "saves": {
+            "updates": args.updates,
+            "legacy_writes": args.updates,
+            "legacy_total_ms": round(legacy_ms, 1),
+            "store_writes": store.saves,
+            "store_update_mean_us": round(update_s / args.updates * 1e6, 1),
+            "final_value_on_disk": on_disk.get("ui_fps"),
+            "final_value_ok": on_disk.get("ui_fps") == args.updates,
+            "models_status_persisted": "models_status" in on_disk,
+            "temp_files_left": len(leftovers),
+        },
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Benchmark: ModelFetcher against a local HTTP stand-in for the model hub.
+
+The stand-in serves a Hugging Face style tree API and `resolve` URLs from
+memory, honours Range requests (optionally not), throttles each connection to
+--per-connection-mbps like a CDN edge, and counts the bytes it sends.
+Scenarios:
+    single_stream  - one connection (segments=1)
+    parallel       - --segments range requests
+    resume         - cancel at ~50 %, fetch again; reports bytes sent twice
+    no_ranges      - server ignores Range: falls back to one stream
+Each scenario checks the result against the expected sha256. Correctness
+(ranges, fallback, resume, checksum mismatch) is tested in tests/test_fetcher.py.
+
+Usage:
+    python -m src.bench.fetcher
+    python -m src.bench.fetcher --size-mb 64 --per-connection-mbps 16 --segments 8 --output fetch.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.core.fetcher import FetchCancelled, ModelFetcher, hf_files
+
+REPO = "bench/fake-model"
+
+
+class StandIn:
+    """In-memory model repo served over HTTP"""
+
+    def __init__(self, files, bytes_per_s, ranges=True):
+        self.files = files  # path -> bytes
+        self.bytes_per_s = bytes_per_s
+        self.ranges = ranges
+        self.sent = 0
+        self._lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stand_in.handle(self)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.endpoint = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tree(self):
+        entries = []
+        for path, data in self.files.items():
+            entry = {"type": "file", "path": path, "size": len(data),
+                     "oid": hashlib.sha1(f"blob {len(data)}\0".encode() + data).hexdigest()}
+            if len(data) > 1 << 20:
+                entry["lfs"] = {"oid": hashlib.sha256(data).hexdigest(), "size": len(data)}
+            entries.append(entry)
+        return json.dumps(entries).encode()
+
+    def handle(self, req):
+        if req.path.startswith(f"/api/models/{REPO}/tree/"):
+            body = self.tree()
+            req.send_response(200)
+            req.send_header("Content-Length", str(len(body)))
+            req.end_headers()
+            req.wfile.write(body)
+            return
+        prefix = f"/{REPO}/resolve/main/"
+        path = req.path[len(prefix):] if req.path.startswith(prefix) else None
+        if path not in self.files:
+            req.send_error(404)
+            return
+        data = self.files[path]
+        start, end = 0, len(data) - 1
+        header = req.headers.get("Range")
+        if header and self.ranges:
+            first, _, last = header[len("bytes="):].partition("-")
+            start = int(first)
+            end = min(int(last), end) if last else end
+            req.send_response(206)
+            req.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            req.send_response(200)
+        req.send_header("Content-Length", str(end - start + 1))
+        req.send_header("Accept-Ranges", "bytes" if self.ranges else "none")
+        req.end_headers()
+        # Throttled per connection
+        block = 64 << 10
+        offset = start
+        try:
+            while offset <= end:
+                chunk = data[offset:min(offset + block, end + 1)]
+                req.wfile.write(chunk)
+                offset += len(chunk)
+                with self._lock:
+                    self.sent += len(chunk)
+                time.sleep(len(chunk) / self.bytes_per_s)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def close(self):
+        self.server.shutdown()
+
+
+def timed_fetch(stand_in, dest, **kwargs):
+    files = hf_files(REPO, endpoint=stand_in.endpoint)
+    fetcher = ModelFetcher(**kwargs)
+    sent_before = stand_in.sent
+    start = time.perf_counter()
+    fetcher.fetch(files, dest)
+    seconds = time.perf_counter() - start
+    return fetcher, seconds, stand_in.sent - sent_before
+
+
+def sha256_of(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ModelFetcher against a local hub stand-in")
+    parser.add_argument("--size-mb", type=float, default=32.0)
+    parser.add_argument("--per-connection-mbps", type=float, default=8.0, help="MB/s per connection")
+    parser.add_argument("--segments", type=int, default=4)
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    size = int(args.size_mb * (1 << 20))
+    blob = os.urandom(size)
+    files = {"model.bin": blob, "config.json": b'{"fake": true}\n'}
+    expected = hashlib.sha256(blob).hexdigest()
+    rate = args.per_connection_mbps * (1 << 20)
+    work = tempfile.mkdtemp(prefix="a8_fetch_")
+    results = {}
+
+    def check(dest):
+        return sha256_of(os.path.join(dest, "model.bin")) == expected
+
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    stand_in = StandIn(files, rate)
+    try:
+        kwargs = dict(segment_min_bytes=1 << 20, progress_interval=0.1)
+
+        dest = os.path.join(work, "single")
+        _, seconds, sent = timed_fetch(stand_in, dest, segments=1, **kwargs)
+        results["single_stream"] = {"seconds": round(seconds, 2), "mb_per_s": round(args.size_mb / seconds, 1),
+                                    "verified": check(dest)}
+
+        dest = os.path.join(work, "parallel")
+        samples = []
+        fetcher, seconds, sent = timed_fetch(stand_in, dest, segments=args.segments,
+                                             on_progress=samples.append, **kwargs)
+        results["parallel"] = {"segments": args.segments, "seconds": round(seconds, 2),
+                               "mb_per_s": round(args.size_mb / seconds, 1), "verified": check(dest),
+                               "progress_events": len(samples),
+                               "last_progress": samples[-1] if samples else None}
+
+        # Resume: cancel halfway through, then fetch again into the same directory
+        dest = os.path.join(work, "resume")
+        remote = hf_files(REPO, endpoint=stand_in.endpoint)
+        fetcher = ModelFetcher(segments=args.segments, **kwargs)
+        fetcher.on_progress = lambda p: fetcher.cancel() if p["progress"] >= 0.5 else None
+        sent_before = stand_in.sent
+        try:
+            fetcher.fetch(remote, dest)
+        except FetchCancelled:
+            pass
+        first = stand_in.sent - sent_before
+        _, seconds, second = timed_fetch(stand_in, dest, segments=args.segments, **kwargs)
+        results["resume"] = {"first_attempt_mb": round(first / (1 << 20), 1),
+                             "second_attempt_mb": round(second / (1 << 20), 1),
+                             "overlap_mb": round(max(first + second - size, 0) / (1 << 20), 2),
+                             "verified": check(dest)}
+
+        # Server without Range support
+        stand_in.ranges = False
+        dest = os.path.join(work, "no_ranges")
+        _, seconds, sent = timed_fetch(stand_in, dest, segments=args.segments, **kwargs)
+        results["no_ranges"] = {"seconds": round(seconds, 2), "verified": check(dest)}
+        stand_in.ranges = True
+    finally:
+        sys.stdout = real_stdout
+        stand_in.close()
+        shutil.rmtree(work, ignore_errors=True)
+
+    report = {
+        "size_mb": args.size_mb,
+        "per_connection_mbps": args.per_connection_mbps,
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark / regression guard: import cost of everything loaded before the first window.
+
+Imports the first-window module (src.main_webview by default) in fresh
+interpreters with the import profiler installed and reports the median
+import time, the most expensive modules, and any module that is supposed to
+load on demand (engines, tray, input automation) but was imported anyway.
+Exits with status 1 when the median exceeds --budget-ms or a deferred
+module was loaded, so it can guard the budget in CI.
+
+Usage:
+    python -m src.bench.imports
+    python -m src.bench.imports --budget-ms 400 --runs 7 --output imports.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.core.stats import percentile
+
+# Must not be imported before the window is up: loaded by startup steps or on first use
+DEFERRED = [
+    "faster_whisper", "ctranslate2", "llama_cpp", "openai", "huggingface_hub", "torch",
+    "pystray", "PIL", "pyautogui", "pyperclip", "keyboard", "sounddevice", "websockets",
+]
+
+_CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from src.core.importprof import profiler
+profiler.install()
+start = time.perf_counter()
+error = None
+try:
+    __import__({module!r})
+except BaseException as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+elapsed = time.perf_counter() - start
+profiler.uninstall()
+report = profiler.report({top})
+report["wall_ms"] = round(elapsed * 1000, 1)
+report["error"] = error
+report["deferred_loaded"] = profiler.loaded({deferred!r})
+sys.__stdout__.write("\\n@@REPORT@@" + json.dumps(report))
+"""
+
+
+def run_once(module, top):
+    code = _CHILD.format(root=project_root, module=module, top=top, deferred=DEFERRED)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=project_root,
+                          capture_output=True, text=True, encoding="utf-8", errors="replace")
+    marker = proc.stdout.rfind("@@REPORT@@")
+    if marker < 0:
+        raise RuntimeError(f"Import run failed: {proc.stderr.strip()[-500:]}")
+    return json.loads(proc.stdout[marker + len("@@REPORT@@"):])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="First-window import budget")
+    parser.add_argument("--module", default="src.main_webview")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=400.0)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.module, args.top) for _ in range(args.runs)]
+    walls = [r["wall_ms"] for r in runs]
+    median = percentile(walls, 50)
+    last = runs[-1]
+    deferred = sorted({m.split(".")[0] for r in runs for m in r["deferred_loaded"]})
+    errors = sorted({r["error"] for r in runs if r["error"]})
+
+    report = {
+        "module": args.module,
+        "runs": args.runs,
+        "wall_ms": {"median": round(median, 1), "min": min(walls), "max": max(walls)},
+        "budget_ms": args.budget_ms,
+        "modules_imported": last["modules"],
+        "top_cumulative": [{"module": r["module"], "ms": r["cumulative_ms"]} for r in last["top_cumulative"]],
+        "top_self": [{"module": r["module"], "ms": r["self_ms"]} for r in last["top_self"]],
+        "deferred_loaded": deferred,
+        "errors": errors,
+        "ok": median <= args.budget_ms and not deferred and not errors,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Benchmark: overlay level link over shared memory vs. WebSocket.
+
+A writer process publishes audio levels at --rate Hz for --seconds, the
+way the main process does while recording. The reader (this process)
+receives them the way the overlay does:
+    websocket - api_server broadcast -> WebSocket client thread -> json.loads
+                -> WebSocketMessage.from_dict
+    shm       - LevelChannel polled at the overlay frame rate (--fps)
+Both readers apply the level on an animation tick at --fps, so the reported
+latency is publish -> frame that draws it. Reader CPU time covers the
+receive thread (WebSocket) or the polling itself (shm).
+
+Usage:
+    python -m src.bench.level_channel
+    python -m src.bench.level_channel --rate 20 --fps 30 --seconds 5 --output levels.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.core.level_channel import LevelChannel
+from src.core.stats import percentile
+
+
+def _shm_writer(name, rate, seconds):
+    channel = LevelChannel.attach(name, untrack=False)  # Shares the parent's resource tracker
+    channel.publish_state("RECORDING")
+    end = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < end:
+        channel.publish_level((i % 20) / 20.0)
+        i += 1
+        time.sleep(1.0 / rate)
+    channel.close()
+
+
+def _ws_writer(port, rate, seconds, ready):
+    import asyncio
+    import websockets
+    sys.stdout = open(os.devnull, "w")
+    import src.api_server as api
+
+    async def run():
+        async with websockets.serve(api.handler, "127.0.0.1", port):
+            ready.set()
+            while not api.CLIENTS:
+                await asyncio.sleep(0.01)
+            end = time.perf_counter() + seconds
+            i = 0
+            while time.perf_counter() < end:
+                await api.broadcast({"type": "audio_level", "data": (i % 20) / 20.0, "t": time.time()})
+                i += 1
+                await asyncio.sleep(1.0 / rate)
+            await api.broadcast({"type": "done", "data": None})
+            await asyncio.sleep(0.2)
+
+    asyncio.run(run())
+
+
+def _summary(latencies, cpu_s, seconds, received):
+    return {
+        "received": received,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(max(latencies) * 1000, 3) if latencies else None,
+        },
+        "reader_cpu_ms_per_s": round(cpu_s * 1000 / seconds, 3),
+    }
+
+
+def bench_shm(args):
+    channel = LevelChannel.create(f"a8qingyu_bench_{os.getpid()}")
+    writer = multiprocessing.Process(target=_shm_writer, args=(channel.name, args.rate, args.seconds))
+    writer.start()
+    latencies = []
+    interval = 1.0 / args.fps
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    while writer.is_alive():
+        snapshot = channel.poll()
+        if snapshot is not None:
+            latencies.append(max(time.time() - snapshot[2], 0.0))
+        time.sleep(interval)
+    cpu = time.process_time() - cpu_start
+    elapsed = time.perf_counter() - start
+    writer.join()
+    channel.close()
+    return _summary(latencies, cpu, elapsed, len(latencies))
+
+
+def bench_websocket(args):
+    from websockets.sync.client import connect
+    from src.ui.native_overlay.types import WebSocketMessage
+
+    ready = multiprocessing.Event()
+    writer = multiprocessing.Process(target=_ws_writer, args=(args.port, args.rate, args.seconds, ready))
+    writer.start()
+    ready.wait(10)
+    latencies = []
+    latest = [None]  # Publish time of the newest level not yet drawn
+
+    def receive():
+        with connect(f"ws://127.0.0.1:{args.port}") as ws:
+            for raw in ws:
+                data = json.loads(raw)
+                message = WebSocketMessage.from_dict(data)
+                if message.type == "done":
+                    return
+                if message.type == "audio_level":
+                    float(message.data)
+                    latest[0] = data["t"]
+
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    reader = threading.Thread(target=receive)
+    reader.start()
+    interval = 1.0 / args.fps
+    while reader.is_alive():
+        # Animation tick: draw whatever arrived since the last frame
+        t, latest[0] = latest[0], None
+        if t is not None:
+            latencies.append(max(time.time() - t, 0.0))
+        time.sleep(interval)
+    cpu = time.process_time() - cpu_start
+    elapsed = time.perf_counter() - start
+    writer.join()
+    return _summary(latencies, cpu, elapsed, len(latencies))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared-memory vs WebSocket overlay level link")
+    parser.add_argument("--rate", type=float, default=20.0, help="Levels published per second")
+    parser.add_argument("--fps", type=float, default=30.0, help="Overlay animation frame rate")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--port", type=int, default=9137)
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = {
+        "rate_hz": args.rate,
+        "fps": args.fps,
+        "seconds": args.seconds,
+        "websocket": bench_websocket(args),
+        "shm": bench_shm(args),
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark: LOCAL correct_batch() throughput against batch size.
+
+Loads a GGUF model exactly like the app and corrects the held-out dictation
+fixtures (repeated up to --items) in batches of each --batch-sizes value.
+Every batch, including size 1, decodes its items as parallel sequences of
+one llama.cpp context (src.core.llm_batch), with the same greedy sampling and
+per-item token budgets, so the sizes differ only in how many sequences share
+each decode step. Reports items/s, the speed-up over batch size 1, per-item
+latency and how often the output equals the fixture reference.
+Exits with status 1 if a batch fell back to one-by-one correction or an
+item failed.
+
+Usage:
+    python -m src.bench.llm_batch --model models/qwen2.5-1.5b-instruct-q4_k_m.gguf
+    python -m src.bench.llm_batch --model m.gguf --batch-sizes 1 4 16 --items 32 --output llm_batch.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.core.stats import percentile
+
+FIXTURES = os.path.join(current_dir, "fixtures", "punct_zh_heldout.jsonl")
+USER_DICT = ["Python", "PySide6", "LLM", "CUDA", "A8轻语"]
+
+
+class FallbackCounter(logging.Handler):
+    """Counts correct_batch() falling back from parallel decoding"""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.count = 0
+
+    def emit(self, record):
+        if record.getMessage().startswith("Parallel LOCAL batch failed"):
+            self.count += 1
+
+
+def load_items(n):
+    with open(FIXTURES, "r", encoding="utf-8") as f:
+        fixtures = [json.loads(line) for line in f if line.strip()]
+    return [fixtures[i % len(fixtures)] for i in range(n)]
+
+
+def run(llm, items, batch_size):
+    texts = [item["input"] for item in items]
+    results = []
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        results += llm.correct_batch(texts[i:i + batch_size], USER_DICT)
+    elapsed = time.perf_counter() - start
+    latency = [r.wait_s + r.seconds for r in results]
+    return {
+        "batch_size": batch_size,
+        "seconds": round(elapsed, 3),
+        "items_per_s": round(len(results) / elapsed, 3) if elapsed else 0.0,
+        "item_ms": {
+            "p50": round(percentile(latency, 50) * 1000, 1),
+            "p95": round(percentile(latency, 95) * 1000, 1),
+        },
+        "errors": sum(1 for r in results if r.error),
+        "reference_exact": round(sum(r.text == item["reference"] for r, item in zip(results, items)) / len(items), 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LOCAL LLM batch correction throughput")
+    parser.add_argument("--model", required=True, help="Path to the GGUF model")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--items", type=int, default=16, help="Texts corrected per batch size")
+    parser.add_argument("--n-gpu-layers", type=int, default=-1)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        from src.core.llm import LLMEngine
+        llm = LLMEngine()
+        llm.initialize_local(args.model, n_gpu_layers=args.n_gpu_layers, n_threads=args.threads)
+        if not llm.model:
+            print("[ERROR] llama_cpp is not installed", file=sys.stderr)
+            return 1
+        fallbacks = FallbackCounter()
+        logging.getLogger("src.core.llm").addHandler(fallbacks)
+        items = load_items(args.items)
+        llm.correct_batch([items[0]["input"]], USER_DICT)  # Warm-up
+        results = []
+        for batch_size in args.batch_sizes:
+            before = fallbacks.count
+            result = run(llm, items, batch_size)
+            result["fallbacks"] = fallbacks.count - before
+            results.append(result)
+            print(f"batch {batch_size}: {result['items_per_s']} items/s", file=sys.stderr)
+    finally:
+        sys.stdout = real_stdout
+
+    base = next((r["items_per_s"] for r in results if r["batch_size"] == 1), None)
+    for result in results:
+        result["speedup"] = round(result["items_per_s"] / base, 2) if base else None
+    ok = all(r["fallbacks"] == 0 and r["errors"] == 0 for r in results)
+    report = {"model": os.path.basename(args.model), "items": args.items, "results": results, "ok": ok}
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
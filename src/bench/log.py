@@ -0,0 +1,156 @@
+"""
+Benchmark: caller-thread cost of logging, old LogWriter vs. the queued logger.
+
+    legacy_print     - print() into the frozen app's old LogWriter (file write +
+                       flush on every write call)
+    queued_logger    - logger.info(...) with src.core.log set up (QueueHandler,
+                       rotating file written by the listener thread)
+    queued_print     - print() redirected into the same queue (frozen mode)
+    disabled_debug   - logger.debug(...) with DEBUG off
+Each writes --messages lines carrying a --payload-bytes payload (like the
+event payloads the hot paths used to print) and reports per-call latency on
+the calling thread, plus the lines that reached the file after shutdown.
+--stall-every / --stall-ms simulate a disk that occasionally blocks (antivirus
+scan, slow USB or network home dir): every Nth write to the file sleeps. With
+the old writer the stall lands on the printing thread, with the queue on the
+listener. A small --rotate-kb check confirms size-based rotation.
+
+Usage:
+    python -m src.bench.log
+    python -m src.bench.log --messages 20000 --payload-bytes 512 --output log.json
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.core import log
+from src.core.stats import percentile
+
+
+class Stall:
+    """Sleeps on every Nth call"""
+
+    def __init__(self, every, ms):
+        self.every = every
+        self.seconds = ms / 1000.0
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.every and self.calls % self.every == 0:
+            time.sleep(self.seconds)
+
+
+class LegacyLogWriter:
+    """main_webview's former frozen-mode stdout: every write is flushed to disk"""
+
+    def __init__(self, file, stall):
+        self.file = file
+        self.stall = stall
+
+    def write(self, message):
+        self.file.write(message)
+        self.file.flush()
+        self.stall()
+
+    def flush(self):
+        self.file.flush()
+
+
+def timed(n, fn):
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return {
+        "p50_us": round(percentile(samples, 50), 2),
+        "p99_us": round(percentile(samples, 99), 2),
+        "max_us": round(max(samples), 1),
+        "total_ms": round(sum(samples) / 1000, 1),
+    }
+
+
+def count_lines(pattern, marker):
+    total = 0
+    for path in glob.glob(pattern):
+        with open(path, encoding="utf-8") as f:
+            total += sum(1 for line in f if marker in line)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Logging cost on the calling thread")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--payload-bytes", type=int, default=256)
+    parser.add_argument("--stall-every", type=int, default=500, help="Every Nth disk write blocks (0 = never)")
+    parser.add_argument("--stall-ms", type=float, default=20.0)
+    parser.add_argument("--rotate-kb", type=int, default=64)
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    payload = {"type": "audio_level", "data": "x" * args.payload_bytes}
+    work = tempfile.mkdtemp(prefix="a8_log_")
+    real_stdout, real_stderr = sys.stdout, sys.stderr
+    results = {}
+    try:
+        sys.stdout = sys.stderr
+        # Old path
+        legacy_path = os.path.join(work, "legacy.log")
+        with open(legacy_path, "a", encoding="utf-8", buffering=1) as f:
+            writer = LegacyLogWriter(f, Stall(args.stall_every, args.stall_ms))
+            results["legacy_print"] = timed(args.messages, lambda i: print(f"[DEBUG] Emitting event legacy {i}: {payload}", file=writer))
+        results["legacy_print"]["lines_written"] = count_lines(legacy_path, "legacy")
+
+        # Queued logger, console off so only the file is measured
+        queued_path = os.path.join(work, "queued.log")
+        log.setup(path=queued_path, console=False, max_bytes=1 << 30)
+        file_handler = log._listener.handlers[0]
+        stall, emit = Stall(args.stall_every, args.stall_ms), file_handler.emit
+        file_handler.emit = lambda record: (emit(record), stall())
+        logger = logging.getLogger("bench")
+        results["queued_logger"] = timed(args.messages, lambda i: logger.info("Emitting event queued %s: %s", i, payload))
+        results["disabled_debug"] = timed(args.messages, lambda i: logger.debug("Emitting event %s: %s", i, payload))
+        sys.stdout = log._StreamToLog(logging.getLogger("stdout"), logging.INFO)
+        results["queued_print"] = timed(args.messages, lambda i: print(f"[INFO] Emitting event printed {i}: {payload}"))
+        sys.stdout = sys.stderr
+        log.shutdown()
+        results["queued_logger"]["lines_written"] = count_lines(queued_path, "queued")
+        results["queued_print"]["lines_written"] = count_lines(queued_path, "printed")
+        results["disabled_debug"]["lines_written"] = 0
+
+        # Rotation
+        rotate_path = os.path.join(work, "rotate.log")
+        log.setup(path=rotate_path, console=False, max_bytes=args.rotate_kb * 1024, backups=3)
+        for i in range(args.messages):
+            logger.info("rotation %s: %s", i, payload)
+        log.shutdown()
+        sizes = [os.path.getsize(p) for p in sorted(glob.glob(rotate_path + "*"))]
+        results["rotation"] = {"files": len(sizes), "largest_kb": round(max(sizes) / 1024, 1),
+                               "limit_kb": args.rotate_kb}
+    finally:
+        sys.stdout, sys.stderr = real_stdout, real_stderr
+        shutil.rmtree(work, ignore_errors=True)
+
+    report = {"messages": args.messages, "payload_bytes": args.payload_bytes,
+              "stall": {"every": args.stall_every, "ms": args.stall_ms}, "results": results}
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Self-check / benchmark: scrape the local metrics endpoint.
+
+Starts the real api_server handler on a free port (same process_request as
+the app's port-9000 server), feeds synthetic utterance traces and executor
+work, then:
+    - GET /metrics: validates the Prometheus text format (one TYPE per family,
+      well-formed sample lines, cumulative histogram buckets, required families)
+    - measures scrape latency and how long the event loop is blocked meanwhile
+    - getMetrics over WebSocket (json and prometheus)
+    - subscribes to the "metrics" topic and waits for a pushed snapshot
+Exits with status 1 if any check fails. The format checks are also asserted
+by tests/test_metrics.py; this script adds the latency and push measurements.
+
+Usage:
+    python -m src.bench.metrics
+    python -m src.bench.metrics --scrapes 200 --output metrics.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+import urllib.request
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src import api_server
+from src.core import metrics
+from src.core.executor import TaskExecutor
+from src.core.stats import percentile
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{([a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*",?)*\})? (\S+)$')
+REQUIRED = ["a8_process_resident_memory_bytes", "a8_stage_seconds", "a8_executor_submitted_total",
+            "a8_ws_clients", "a8_dropped_events_total"]
+
+
+def validate(text):
+    """Problems found in a Prometheus text exposition"""
+    problems = []
+    types = {}
+    buckets = {}
+    for n, line in enumerate(text.splitlines(), 1):
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ", 3)
+            if name in types:
+                problems.append(f"line {n}: second TYPE for {name}")
+            types[name] = kind
+            continue
+        if not line or line.startswith("#"):
+            continue
+        match = SAMPLE.match(line)
+        if not match:
+            problems.append(f"line {n}: malformed sample: {line}")
+            continue
+        name, value = match.group(1), match.group(4)
+        try:
+            float(value.replace("Inf", "inf"))
+        except ValueError:
+            problems.append(f"line {n}: bad value {value}")
+        base = re.sub(r"_(bucket|sum|count)$", "", name)
+        if name not in types and base not in types:
+            problems.append(f"line {n}: sample before TYPE: {name}")
+        if name.endswith("_bucket"):
+            series = re.sub(r',?le="[^"]*"', "", match.group(2) or "")
+            count = float(value)
+            previous = buckets.get((name, series), 0)
+            if count < previous:
+                problems.append(f"line {n}: bucket count decreased")
+            buckets[(name, series)] = count
+    for name in REQUIRED:
+        if name not in types:
+            problems.append(f"missing family {name}")
+    return problems, len(types)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape and validate the local metrics endpoint")
+    parser.add_argument("--scrapes", type=int, default=100)
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    import websockets
+
+    # Synthetic activity: traces for the stage histograms, executor tasks
+    for i in range(50):
+        metrics.observe_trace({"spans_ms": {"press_to_stream": 8 + i % 5, "asr": 300 + 10 * i,
+                                            "llm": 900 + 5 * i, "paste": 30, "total": 1400 + 15 * i}})
+    executor = TaskExecutor("bench", workers=2, max_queue=8)
+    for _ in range(12):  # A few overflow the queue: shows up in a8_dropped_events_total
+        executor.submit(time.sleep, 0.001)
+    metrics.registry.register("bench", lambda: metrics.stats_families(
+        "a8_executor", executor.stats(), {"executor": "bench"}, counters=("submitted", "completed", "failed", "dropped")))
+
+    ready = threading.Event()
+    state = {}
+
+    async def serve():
+        api_server.SERVER_LOOP = asyncio.get_running_loop()
+        metrics.registry.register("server", api_server.collect_server_metrics)
+        api_server.METRICS_INTERVAL_S = 0.2
+        asyncio.ensure_future(api_server.publish_metrics())
+        # Event loop stall probe: longest gap between 1 ms ticks
+        state["max_gap"] = 0.0
+
+        async def probe():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.001)
+                now = time.perf_counter()
+                state["max_gap"] = max(state["max_gap"], now - last)
+                last = now
+        asyncio.ensure_future(probe())
+        async with websockets.serve(api_server.handler, "127.0.0.1", 0,
+                                    process_request=api_server.process_request) as server:
+            state["port"] = list(server.sockets)[0].getsockname()[1]
+            ready.set()
+            await asyncio.Future()
+
+    threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+    ready.wait(10)
+    url = f"http://127.0.0.1:{state['port']}/metrics"
+
+    async def ws_checks():
+        async with websockets.connect(f"ws://127.0.0.1:{state['port']}") as ws:
+            await ws.send(json.dumps({"action": "getMetrics"}))
+            as_json = json.loads(await ws.recv())
+            await ws.send(json.dumps({"action": "getMetrics", "payload": {"format": "prometheus"}}))
+            as_text = json.loads(await ws.recv())
+            await ws.send(json.dumps({"action": "subscribe", "payload": {"topics": ["metrics"]}}))
+            start = time.perf_counter()
+            pushed = None
+            while time.perf_counter() - start < 3:
+                message = json.loads(await asyncio.wait_for(ws.recv(), 3))
+                if message.get("type") == "metrics":
+                    pushed = message
+                    break
+            return as_json, as_text, pushed, time.perf_counter() - start
+
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            content_type = response.headers.get("Content-Type")
+            text = response.read().decode("utf-8")
+        problems, families = validate(text)
+
+        state["max_gap"] = 0.0
+        latencies = []
+        for _ in range(args.scrapes):
+            start = time.perf_counter()
+            with urllib.request.urlopen(url, timeout=5) as response:
+                response.read()
+            latencies.append(time.perf_counter() - start)
+        max_gap = state["max_gap"]
+
+        as_json, as_text, pushed, push_wait = asyncio.run(ws_checks())
+    finally:
+        sys.stdout = real_stdout
+
+    checks = {
+        "content_type": content_type,
+        "format_problems": problems[:20],
+        "families": families,
+        "ws_get_metrics_json": as_json.get("type") == "metrics" and "a8_stage_seconds_bucket" in as_json["data"],
+        "ws_get_metrics_prometheus": as_text.get("type") == "metrics_text" and not validate(as_text["data"])[0],
+        "ws_topic_push": pushed is not None,
+    }
+    ok = not problems and checks["ws_get_metrics_json"] and checks["ws_get_metrics_prometheus"] and checks["ws_topic_push"]
+    report = {
+        "checks": checks,
+        "scrape_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+        },
+        "body_bytes": len(text),
+        "max_event_loop_gap_ms": round(max_gap * 1000, 2),
+        "topic_push_wait_ms": round(push_wait * 1000, 1),
+        "ok": ok,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Offscreen frame-time benchmark for the native overlay (ModernOverlay).
+
+Renders with Qt's offscreen platform, so no display is needed. Measures
+synchronous repaint cost per frame for:
+    uncached_full  - static layer rebuilt every frame, whole widget repainted
+                     (what every frame used to cost)
+    cached_full    - cached static layer, whole widget repainted
+    cached_region  - cached static layer, only the visualizer repainted
+                     (what the animation timer does now)
+and checks the timer: frames delivered per second while RECORDING against
+OverlayConfig.animation_fps, and wakeups while IDLE (should be zero).
+
+Usage:
+    python -m src.bench.overlay
+    python -m src.bench.overlay --frames 2000 --fps 60 --output overlay.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.core.stats import percentile
+
+
+def frame_times(widget, frames, invalidate=False, region=None):
+    times = []
+    for i in range(frames):
+        widget._update_level_slot((i % 20) / 20.0)
+        widget._phase += 0.15
+        start = time.perf_counter()
+        if invalidate:
+            widget._static_cache = None
+        if region is not None:
+            widget.repaint(region)
+        else:
+            widget.repaint()
+        times.append(time.perf_counter() - start)
+    return {
+        "mean_us": round(sum(times) / len(times) * 1e6, 1),
+        "p50_us": round(percentile(times, 50) * 1e6, 1),
+        "p99_us": round(percentile(times, 99) * 1e6, 1),
+    }
+
+
+def run_loop(app, seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ModernOverlay offscreen frame-time benchmark")
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--fps", type=int, default=30, help="OverlayConfig.animation_fps")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Event-loop time for the timer checks")
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    from PySide6.QtWidgets import QApplication
+    from src.ui.native_overlay.qt_overlay import ModernOverlay
+    from src.ui.native_overlay.types import OverlayConfig, OverlayState
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    widget = ModernOverlay(OverlayConfig(animation_fps=args.fps))
+
+    # Overlay logs go to stderr so stdout stays pure JSON
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        results = {}
+        for state in (OverlayState.RECORDING, OverlayState.RECOGNIZING):
+            widget._set_state_slot(state)
+            run_loop(app, 0.05)
+            results[state.value] = {
+                "uncached_full": frame_times(widget, args.frames, invalidate=True),
+                "cached_full": frame_times(widget, args.frames),
+                "cached_region": frame_times(widget, args.frames, region=widget._dirty_rect),
+            }
+
+        widget._set_state_slot(OverlayState.RECORDING)
+        start_frames = widget.frames
+        run_loop(app, args.seconds)
+        animated_fps = (widget.frames - start_frames) / args.seconds
+
+        widget._set_state_slot(OverlayState.IDLE)
+        start_frames = widget.frames
+        run_loop(app, args.seconds)
+        idle_frames = widget.frames - start_frames
+    finally:
+        sys.stdout = real_stdout
+
+    report = {
+        "platform": app.platformName(),
+        "animation_fps": args.fps,
+        "frame_time": results,
+        "timer": {
+            "recording_fps": round(animated_fps, 1),
+            "idle_frames_per_s": round(idle_frames / args.seconds, 1),
+            "idle_timer_active": widget.timer.isActive(),
+        },
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark: overlay StateManager link to the main process.
+
+The overlay (this process, Qt offscreen) starts first; the WebSocket server
+comes up in a child process --server-delay seconds later, like an overlay
+launched before the main process finished starting. The server then emits
+app_state changes through emit_status every --state-interval-ms, with
+--levels audio levels spread evenly in between, while the overlay's GUI thread
+stalls for --stall-ms every --stall-every-ms (a slow repaint) so frames
+queue up in the socket. Reports:
+    reconnect       - server listening -> overlay subscribed and state synced,
+                      next to what the old 1 s..30 s doubling backoff would give
+    state_latency   - emit_status() -> overlay handler (cross-process)
+    levels          - level frames received vs. overlay updates after coalescing
+
+Usage:
+    python -m src.bench.overlay_link
+    python -m src.bench.overlay_link --server-delay 5 --states 100 --output link.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+
+def legacy_reconnect_s(server_delay, first=1.0, cap=30.0):
+    """When the old thread client's doubling backoff would first find the server up"""
+    t, delay = 0.0, first
+    while t < server_delay:
+        t += delay
+        delay = min(delay * 2, cap)
+    return t - server_delay
+
+
+def _server(port, delay, states, interval_ms, levels, listening_at):
+    import asyncio
+    import websockets
+    sys.stdout = open(os.devnull, "w")
+    import src.api_server as api
+
+    async def run():
+        await asyncio.sleep(delay)
+        api.SERVER_LOOP = asyncio.get_running_loop()
+        async with websockets.serve(api.handler, "127.0.0.1", port):
+            listening_at.value = time.time()
+            while not api.CLIENTS:
+                await asyncio.sleep(0.001)
+            await asyncio.sleep(0.2)  # Let the subscribe/getState exchange finish
+            cycle = ["RECORDING", "RECOGNIZING", "POLISHING", "IDLE"]
+            for i in range(states):
+                api.emit_status("app_state", cycle[i % len(cycle)])
+                for k in range(levels):
+                    api.emit_status("audio_level", (k % 20) / 20.0)
+                    await asyncio.sleep(interval_ms / 1000.0 / levels)
+            api.emit_status("app_state", "IDLE")
+            await asyncio.sleep(0.3)
+
+    asyncio.run(run())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Overlay WebSocket link: reconnect, state latency, coalescing")
+    parser.add_argument("--server-delay", type=float, default=3.0, help="Seconds before the server starts")
+    parser.add_argument("--states", type=int, default=100)
+    parser.add_argument("--state-interval-ms", type=float, default=50.0)
+    parser.add_argument("--levels", type=int, default=10, help="Audio levels emitted between states")
+    parser.add_argument("--stall-ms", type=float, default=15.0, help="Simulated GUI-thread stall")
+    parser.add_argument("--stall-every-ms", type=int, default=40)
+    parser.add_argument("--port", type=int, default=9138)
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+    from src.ui.native_overlay.manager import StateManager
+    from src.ui.native_overlay.qt_overlay import ModernOverlay
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    # Overlay logs go to stderr so stdout stays pure JSON
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        overlay = ModernOverlay()
+        manager = StateManager(overlay)
+        manager.websocket_url = f"ws://127.0.0.1:{args.port}"
+
+        listening_at = multiprocessing.Value("d", 0.0)
+        server = multiprocessing.Process(target=_server, args=(
+            args.port, args.server_delay, args.states, args.state_interval_ms, args.levels, listening_at))
+        started_at = time.time()
+        server.start()
+        manager.connect_websocket()
+
+        synced_at = [0.0]
+        original = manager._handle_state_message
+
+        def on_state(message):
+            if not synced_at[0]:
+                synced_at[0] = time.time()
+            original(message)
+
+        manager.add_message_handler("app_state", on_state)
+
+        def check_done():
+            if not server.is_alive():
+                app.quit()
+
+        poll = QTimer()
+        poll.timeout.connect(check_done)
+        poll.start(50)
+        stall = QTimer()
+        stall.timeout.connect(lambda: time.sleep(args.stall_ms / 1000.0))
+        stall.start(args.stall_every_ms)
+        app.exec()
+        server.join()
+        stats = manager.stats()
+        manager.disconnect_websocket()
+    finally:
+        sys.stdout = real_stdout
+
+    report = {
+        "server_delay_s": args.server_delay,
+        "reconnect": {
+            "server_up_to_synced_ms": round((synced_at[0] - listening_at.value) * 1000, 1),
+            "connect_to_sync_ms": stats["connect_to_sync_ms"],
+            "legacy_backoff_ms": round(legacy_reconnect_s(listening_at.value - started_at) * 1000, 1),
+        },
+        "state_latency_ms": stats["state_latency_ms"],
+        "levels": {
+            "received": stats["levels_received"],
+            "applied": stats["levels_applied"],
+        },
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Offline pipeline benchmark: replay a directory of WAV files through ASR -> LLM.
+
+Uses the same UtterancePipeline and stage functions as the desktop app
+(transcribe_utterance / polish_utterance), with paste replaced by a no-op.
+No GUI, microphone or network is needed. Engines are pluggable: `fake`
+engines sleep in proportion to the audio length so the harness itself can
+be benchmarked anywhere; `real` engines load faster-whisper and the GGUF
+model exactly like the app does.
+
+Prints a machine-readable JSON report: real-time factor, per-stage latency
+percentiles, peak RSS and model load times.
+
+Usage:
+    python -m src.bench.pipeline --wav-dir fixtures/ --engines fake
+    python -m src.bench.pipeline --wav-dir fixtures/ --engines real --asr-model small \\
+        --llm models/qwen2.5-coder-7b-instruct-q4_k_m.gguf --output bench.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import wave
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.core.pipeline import UtterancePipeline, transcribe_utterance, polish_utterance
+from src.core.sysinfo import peak_rss_bytes, rss_bytes
+from src.core.tracing import Tracer
+
+
+class FakeASR:
+    """Sleeps `rtf` x audio duration; returns the sidecar .txt transcript if present"""
+
+    def __init__(self, rtf=0.05):
+        self.rtf = rtf
+
+    def transcribe(self, audio_path, prompt=None):
+        time.sleep(wav_seconds(audio_path) * self.rtf)
+        sidecar = os.path.splitext(audio_path)[0] + ".txt"
+        if os.path.exists(sidecar):
+            with open(sidecar, "r", encoding="utf-8") as f:
+                return f.read().strip()
+        return "这是一段用于基准测试的模拟识别结果"
+
+
+class FakeLLM:
+    """Sleeps a fixed base latency plus a per-character cost"""
+
+    def __init__(self, base_ms=150.0, per_char_ms=2.0):
+        self.base_ms = base_ms
+        self.per_char_ms = per_char_ms
+
+    def correct_text(self, text, user_dict_list=[], system_prompt_template=None):
+        time.sleep((self.base_ms + self.per_char_ms * len(text)) / 1000.0)
+        return text
+
+
+def wav_seconds(path):
+    with wave.open(path, "rb") as wf:
+        return wf.getnframes() / float(wf.getframerate())
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def load_engines(args):
+    """Returns (asr, llm, load_times)"""
+    load = {}
+    if args.engines == "fake":
+        return FakeASR(args.fake_asr_rtf), (None if args.no_llm else FakeLLM(args.fake_llm_ms)), load
+
+    from src.core.asr import ASREngine
+    from src.core.llm import LLMEngine
+    from src.core.threads import plan_threads
+
+    budget = plan_threads(total=args.threads)
+    start = time.perf_counter()
+    asr = ASREngine()
+    asr.initialize(model_size=args.asr_model, device=args.device,
+                   compute_type="float16" if args.device == "cuda" else "int8",
+                   cpu_threads=budget.asr.threads, num_workers=budget.asr.workers)
+    load["asr_s"] = round(time.perf_counter() - start, 3)
+
+    llm = None
+    if not args.no_llm:
+        start = time.perf_counter()
+        llm = LLMEngine()
+        if args.correction_mode == "PUNCT":
+            llm.initialize_punct()
+        elif args.llm:
+            llm.initialize_local(args.llm, n_gpu_layers=-1 if args.device == "cuda" else 0,
+                                 n_threads=budget.llm.threads)
+        else:
+            llm = None
+        load["llm_s"] = round(time.perf_counter() - start, 3)
+    return asr, llm, load
+
+
+def run(args):
+    files = sorted(glob.glob(os.path.join(args.wav_dir, "*.wav")))
+    if not files:
+        raise SystemExit(f"No .wav files in {args.wav_dir}")
+
+    rss_start = rss_bytes()
+    asr, llm, load_times = load_engines(args)
+    rss_loaded = rss_bytes()
+
+    tracer = Tracer(capacity=max(len(files) * args.repeat, 1))
+
+    def _deliver(utt):
+        utt.trace.mark("paste")
+
+    def _on_stage(utt, stage):
+        if stage == "done" and not utt.trace.meta.get("warmup"):
+            utt.trace.meta["file"] = os.path.basename(utt.audio)
+            tracer.finish(utt.trace)
+
+    pipeline = UtterancePipeline(
+        transcribe=lambda utt: transcribe_utterance(asr, utt),
+        polish=(lambda utt: polish_utterance(llm, utt)) if llm else (lambda utt: utt.text),
+        deliver=_deliver,
+        on_stage=_on_stage,
+        max_pending=args.max_pending if args.pipelined else 1,
+    )
+
+    if args.warmup:
+        # Keep one-off costs (CUDA kernels, KV allocation) out of the measured runs
+        trace = tracer.begin()
+        trace.meta["warmup"] = True
+        pipeline.submit(files[0], trace=trace)
+        while pipeline.busy:
+            time.sleep(0.005)
+
+    audio_seconds = 0.0
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for path in files:
+            audio_seconds += wav_seconds(path)
+            trace = tracer.begin()
+            trace.mark("handoff")
+            # Sequential mode waits for each utterance; pipelined mode only waits for a free slot
+            while pipeline.submit(path, trace=trace) is None:
+                time.sleep(0.002)
+            if not args.pipelined:
+                while pipeline.busy:
+                    time.sleep(0.002)
+    while pipeline.busy:
+        time.sleep(0.002)
+    wall = time.perf_counter() - start
+    pipeline.shutdown()
+
+    summary = tracer.summary()
+    asr_total_ms = sum(r["spans_ms"].get("asr", 0.0) for r in tracer.recent(len(files) * args.repeat))
+    stats = pipeline.stats()
+    if args.engines == "fake":
+        llm_name = "none" if args.no_llm else "fake"
+    else:
+        llm_name = "none" if llm is None else (args.correction_mode if args.correction_mode == "PUNCT"
+                                               else os.path.basename(args.llm))
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "engines": args.engines,
+            "asr_model": args.asr_model if args.engines == "real" else "fake",
+            "llm": llm_name,
+            "device": args.device if args.engines == "real" else "none",
+            "mode": "pipelined" if args.pipelined else "sequential",
+        },
+        "files": len(files),
+        "utterances": stats["completed"] + stats["failed"] - (1 if args.warmup else 0),
+        "failed": stats["failed"],
+        "audio_seconds": round(audio_seconds, 3),
+        "wall_seconds": round(wall, 3),
+        # RTF < 1 means faster than real time
+        "asr_rtf": round(asr_total_ms / 1000.0 / audio_seconds, 4) if audio_seconds else None,
+        "end_to_end_rtf": round(wall / audio_seconds, 4) if audio_seconds else None,
+        "model_load_s": load_times,
+        "memory_mb": {
+            "rss_start": round(rss_start / 1024 ** 2, 1),
+            "rss_after_load": round(rss_loaded / 1024 ** 2, 1),
+            "peak_rss": round(peak_rss_bytes() / 1024 ** 2, 1),
+        },
+        "stages_ms": summary["spans_ms"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay WAV files through the ASR -> LLM pipeline")
+    parser.add_argument("--wav-dir", required=True, help="Directory of 16 kHz mono WAV files (optional .txt sidecars for fake ASR)")
+    parser.add_argument("--engines", choices=["fake", "real"], default="fake")
+    parser.add_argument("--asr-model", default="small")
+    parser.add_argument("--device", choices=["cpu", "cuda"], default="cpu")
+    parser.add_argument("--threads", type=int, default=0, help="CPU thread budget (0 = all cores)")
+    parser.add_argument("--llm", help="GGUF model path for the real LLM stage")
+    parser.add_argument("--correction-mode", choices=["LOCAL", "PUNCT"], default="LOCAL")
+    parser.add_argument("--no-llm", action="store_true", help="Skip the correction stage")
+    parser.add_argument("--fake-asr-rtf", type=float, default=0.05)
+    parser.add_argument("--fake-llm-ms", type=float, default=150.0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--pipelined", action="store_true", help="Overlap utterances like rapid dictation")
+    parser.add_argument("--max-pending", type=int, default=4)
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false")
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    # Stage logs go to stderr so stdout stays pure JSON
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        report = run(args)
+    finally:
+        sys.stdout = real_stdout
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
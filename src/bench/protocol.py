@@ -0,0 +1,97 @@
+"""
+Benchmark: JSON text vs. binary frames for the overlay's WebSocket topics.
+
+Measures, per message, the server encode cost, the overlay decode cost
+(json.loads + WebSocketMessage.from_dict vs. decode_binary) and the bytes
+on the wire for a recording-like stream of audio_level updates with
+occasional app_state changes.
+
+Usage:
+    python -m src.bench.protocol
+    python -m src.bench.protocol --messages 200000 --output protocol.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.core.protocol import decode_binary, encode_binary
+from src.ui.native_overlay.types import WebSocketMessage
+
+
+def make_stream(n, seed=0):
+    rng = random.Random(seed)
+    states = ["RECORDING", "RECOGNIZING", "POLISHING", "IDLE"]
+    stream = []
+    for i in range(n):
+        if i % 100 == 0:
+            stream.append({"type": "app_state", "data": states[(i // 100) % len(states)]})
+        else:
+            stream.append({"type": "audio_level", "data": rng.random()})
+    return stream
+
+
+def bench_json(stream):
+    start = time.perf_counter()
+    frames = [json.dumps(m) for m in stream]
+    encode_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for frame in frames:
+        WebSocketMessage.from_dict(json.loads(frame))
+    decode_s = time.perf_counter() - start
+    return frames, encode_s, decode_s, sum(len(f.encode("utf-8")) for f in frames)
+
+
+def bench_binary(stream):
+    start = time.perf_counter()
+    frames = [encode_binary(m["type"], m["data"]) for m in stream]
+    encode_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for frame in frames:
+        WebSocketMessage(*decode_binary(frame))
+    decode_s = time.perf_counter() - start
+    return frames, encode_s, decode_s, sum(len(f) for f in frames)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON vs binary WebSocket frame benchmark")
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    stream = make_stream(args.messages)
+    results = {}
+    for name, fn in (("json", bench_json), ("binary", bench_binary)):
+        _, encode_s, decode_s, total_bytes = fn(stream)
+        results[name] = {
+            "encode_us": round(encode_s / len(stream) * 1e6, 3),
+            "decode_us": round(decode_s / len(stream) * 1e6, 3),
+            "bytes_per_msg": round(total_bytes / len(stream), 2),
+        }
+
+    j, b = results["json"], results["binary"]
+    report = {
+        "messages": len(stream),
+        "results": results,
+        "ratio": {
+            "encode": round(j["encode_us"] / b["encode_us"], 1) if b["encode_us"] else None,
+            "decode": round(j["decode_us"] / b["decode_us"], 1) if b["decode_us"] else None,
+            "bytes": round(j["bytes_per_msg"] / b["bytes_per_msg"], 1),
+        },
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark: punctuation-only correction vs. the full LLM path.
+
+Runs every fixture through the rule-based PunctuationEngine (and, with --llm,
+through the local GGUF model) and reports latency, memory and punctuation
+quality against the reference text, separately per fixture set:
+    tuning    - punct_zh.jsonl, written together with the rules in
+                src/core/punct.py (scores there only show the rules still hold)
+    held_out  - punct_zh_heldout.jsonl, dictation-style utterances (no spaces,
+                mixed zh/en, digits) that were not looked at while tuning;
+                keep it that way when changing the rules
+
+Usage:
+    python -m src.bench.punct
+    python -m src.bench.punct --fixtures mine=my_fixtures.jsonl
+    python -m src.bench.punct --llm models/qwen2.5-coder-7b-instruct-q4_k_m.gguf
+"""
+
+import argparse
+import difflib
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.core.stats import percentile
+from src.core.sysinfo import rss_bytes
+
+DEFAULT_FIXTURES = {
+    "tuning": os.path.join(current_dir, "fixtures", "punct_zh.jsonl"),
+    "held_out": os.path.join(current_dir, "fixtures", "punct_zh_heldout.jsonl"),
+}
+USER_DICT = ["Python", "PySide6", "LLM", "CUDA", "A8轻语"]
+PUNCT = set("，。？！：；、,.?!:;")
+
+
+def load_fixtures(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _labels(text):
+    """Split into (base characters, {base index: punctuation that follows it})"""
+    base = []
+    marks = {}
+    for ch in text:
+        if ch in PUNCT:
+            if base:
+                marks[len(base) - 1] = ch
+        else:
+            base.append(ch)
+    return "".join(base), marks
+
+
+def punct_scores(output, reference):
+    """Precision / recall of punctuation marks, aligned on the non-punctuation characters"""
+    out_base, out_marks = _labels(output)
+    ref_base, ref_marks = _labels(reference)
+
+    # The LLM may change characters, so align the base strings first
+    mapping = {}
+    matcher = difflib.SequenceMatcher(None, out_base, ref_base, autojunk=False)
+    for block in matcher.get_matching_blocks():
+        for k in range(block.size):
+            mapping[block.a + k] = block.b + k
+
+    tp = 0
+    for i, mark in out_marks.items():
+        j = mapping.get(i)
+        if j is not None and ref_marks.get(j) == mark:
+            tp += 1
+    return tp, len(out_marks), len(ref_marks)
+
+
+def run(name, correct, fixtures, setup_s=0.0, memory_bytes=0):
+    latencies = []
+    tp = n_out = n_ref = exact = 0
+    for item in fixtures:
+        start = time.perf_counter()
+        output = correct(item["input"])
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        a, b, c = punct_scores(output, item["reference"])
+        tp, n_out, n_ref = tp + a, n_out + b, n_ref + c
+        exact += output == item["reference"]
+
+    precision = tp / n_out if n_out else 0.0
+    recall = tp / n_ref if n_ref else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "engine": name,
+        "items": len(fixtures),
+        "setup_s": round(setup_s, 3),
+        "memory_mb": round(memory_bytes / (1024 ** 2), 2),
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies), 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+        },
+        "punct_precision": round(precision, 3),
+        "punct_recall": round(recall, 3),
+        "punct_f1": round(f1, 3),
+        "exact_match": round(exact / len(fixtures), 3) if fixtures else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Punctuation-only vs LLM correction benchmark")
+    parser.add_argument("--fixtures", action="append",
+                        help="[name=]path of a JSONL fixture set (repeatable; default: tuning and held_out)")
+    parser.add_argument("--llm", help="Path to the GGUF model; omit to benchmark the rule engine only")
+    parser.add_argument("--n-gpu-layers", type=int, default=-1)
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    sets = {}
+    for spec in args.fixtures or []:
+        name, _, path = spec.rpartition("=")
+        sets[name or os.path.splitext(os.path.basename(path))[0]] = path
+    sets = sets or DEFAULT_FIXTURES
+    fixtures = {name: load_fixtures(path) for name, path in sets.items()}
+    results = {name: [] for name in sets}
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    from src.core.punct import PunctuationEngine
+    engine = PunctuationEngine()
+    setup_s = time.perf_counter() - start
+    for name, items in fixtures.items():
+        result = run("punct", lambda t: engine.restore(t, USER_DICT), items, setup_s)
+        result["memory_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 ** 2), 3)
+        results[name].append(result)
+    tracemalloc.stop()
+
+    if args.llm:
+        from src.core.llm import LLMEngine
+        rss_before = rss_bytes()
+        start = time.perf_counter()
+        llm = LLMEngine()
+        llm.initialize_local(args.llm, n_gpu_layers=args.n_gpu_layers)
+        setup_s = time.perf_counter() - start
+        memory = rss_bytes() - rss_before
+        for name, items in fixtures.items():
+            results[name].append(run("llm_local", lambda t: llm.correct_text(t, USER_DICT), items, setup_s, memory))
+
+    report = {name: {"path": sets[name], "results": results[name]} for name in sets}
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Self-check / benchmark: the on-demand sampling profiler.
+
+Runs named worker threads ("asr-worker" and "llm-worker" burning CPU in
+distinct functions, plus idle "emitter" threads blocked on an event) and
+measures their combined throughput without the profiler and while it samples
+at --interval-ms, alternating for --rounds rounds (medians reported; a single
+pair is too noisy on a small machine). The profiler is then driven through
+the real api_server handler on a free port (profile.start / profile.status /
+profile.stop), like a user would against the app's port-9000 server. Checks:
+    - per-thread attribution: each worker's samples land in its own function
+    - the speedscope file is well formed (sample / weight lengths, frame indices)
+    - the collapsed file has "thread;...;leaf count" lines rooted at thread names
+Exits with status 1 if any check fails.
+
+Usage:
+    python -m src.bench.sampler
+    python -m src.bench.sampler --seconds 5 --rounds 5 --interval-ms 5 --output sampler.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from statistics import median
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src import api_server
+from src.core.sampler import sampler
+
+
+def asr_burn(counter):
+    total = 0
+    for i in range(2000):
+        total += i * i
+    counter[0] += 1
+    return total
+
+
+def llm_burn(counter):
+    text = ""
+    for i in range(300):
+        text = (text + str(i))[-200:]
+    counter[0] += 1
+    return text
+
+
+def run_workload(seconds):
+    """Iterations completed by both workers in `seconds`"""
+    stop = threading.Event()
+    counters = {"asr": [0], "llm": [0]}
+
+    def loop(fn, counter):
+        while not stop.is_set():
+            fn(counter)
+
+    threads = [
+        threading.Thread(target=loop, args=(asr_burn, counters["asr"]), name="asr-worker", daemon=True),
+        threading.Thread(target=loop, args=(llm_burn, counters["llm"]), name="llm-worker", daemon=True),
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return counters["asr"][0] + counters["llm"][0]
+
+
+def check_speedscope(data):
+    problems = []
+    frames = len(data["shared"]["frames"])
+    for profile in data["profiles"]:
+        if len(profile["samples"]) != len(profile["weights"]):
+            problems.append(f"{profile['name']}: samples / weights length differ")
+        if any(i < 0 or i >= frames for stack in profile["samples"] for i in stack):
+            problems.append(f"{profile['name']}: frame index out of range")
+    return problems
+
+
+def share(data, thread, function):
+    """Fraction of a thread's sampled time whose stack contains `function`"""
+    names = [f["name"] for f in data["shared"]["frames"]]
+    for profile in data["profiles"]:
+        if profile["name"] == thread:
+            total = sum(profile["weights"])
+            hit = sum(w for stack, w in zip(profile["samples"], profile["weights"])
+                      if any(names[i].startswith(function + " ") for i in stack))
+            return hit / total if total else 0.0
+    return 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sampling profiler overhead and output")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Length of each measured phase")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--interval-ms", type=float, default=10.0)
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    import websockets
+
+    work = tempfile.mkdtemp(prefix="a8_sampler_")
+    idle = threading.Event()
+    for i in range(4):
+        threading.Thread(target=idle.wait, name=f"emitter-{i}", daemon=True).start()
+
+    ready = threading.Event()
+    state = {}
+
+    async def serve():
+        async with websockets.serve(api_server.handler, "127.0.0.1", 0) as server:
+            state["port"] = list(server.sockets)[0].getsockname()[1]
+            ready.set()
+            await asyncio.Future()
+
+    threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+    ready.wait(10)
+
+    async def request(ws, action, payload=None):
+        await ws.send(json.dumps({"action": action, "payload": payload or {}}))
+        return json.loads(await ws.recv())
+
+    async def profiled():
+        async with websockets.connect(f"ws://127.0.0.1:{state['port']}") as ws:
+            started = await request(ws, "profile.start", {"interval_ms": args.interval_ms})
+            again = await request(ws, "profile.start")
+            await asyncio.get_running_loop().run_in_executor(None, run_workload, args.seconds)
+            status = await request(ws, "profile.status")
+            # Client paths are ignored: this one must not be written
+            speedscope = await request(ws, "profile.stop", {"path": os.path.join(work, "p.speedscope.json")})
+            collapsed = await request(ws, "profile.stop", {"format": "collapsed"})
+            bad_format = await request(ws, "profile.stop", {"format": "pprof"})
+            return started, again, status, speedscope, collapsed, bad_format
+
+    written = []
+    try:
+        baseline, profiled_runs, cpu_share = [], [], []
+        for _ in range(args.rounds):
+            baseline.append(run_workload(args.seconds))
+            sampler.start(args.interval_ms)
+            profiled_runs.append(run_workload(args.seconds))
+            cpu_share.append(sampler.stop().summary()["overhead"])
+        started, again, status, speedscope, collapsed, bad_format = asyncio.run(profiled())
+        written = [reply["data"]["path"] for reply in (speedscope, collapsed) if reply.get("type") == "profile"]
+        with open(speedscope["data"]["path"], encoding="utf-8") as f:
+            data = json.load(f)
+        with open(collapsed["data"]["path"], encoding="utf-8") as f:
+            folded = [line.rsplit(" ", 1) for line in f.read().splitlines()]
+        speedscope_bytes = os.path.getsize(speedscope["data"]["path"])
+        client_path_written = os.path.exists(os.path.join(work, "p.speedscope.json"))
+    finally:
+        sys.stdout = real_stdout
+        idle.set()
+        shutil.rmtree(work, ignore_errors=True)
+        for path in written:  # The fixed ~/.a8qingyu_profile_* location
+            if os.path.exists(path):
+                os.remove(path)
+
+    summary = speedscope["data"]
+    attribution = {
+        "asr-worker_in_asr_burn": round(share(data, "asr-worker", "asr_burn"), 3),
+        "asr-worker_in_llm_burn": round(share(data, "asr-worker", "llm_burn"), 3),
+        "llm-worker_in_llm_burn": round(share(data, "llm-worker", "llm_burn"), 3),
+    }
+    checks = {
+        "started": started.get("type") == "profile_status" and started["data"]["running"],
+        "second_start_rejected": again.get("type") == "profile_error",
+        "status_while_running": status["data"].get("running") is True and status["data"]["samples"] > 0,
+        "threads_attributed": all(name in summary["threads"] for name in
+                                  ("asr-worker", "llm-worker", "emitter-0")),
+        "attribution": attribution["asr-worker_in_asr_burn"] > 0.9 and attribution["llm-worker_in_llm_burn"] > 0.9
+                       and attribution["asr-worker_in_llm_burn"] == 0,
+        "speedscope_problems": check_speedscope(data),
+        "collapsed_ok": bool(folded) and all(len(p) == 2 and p[1].isdigit() for p in folded)
+                        and any(p[0].startswith("asr-worker;") for p in folded),
+        "bad_format_rejected": bad_format.get("type") == "profile_error",
+        "client_path_ignored": not client_path_written,
+    }
+    ok = all(v for k, v in checks.items() if k != "speedscope_problems") and not checks["speedscope_problems"]
+    base, with_profiler = median(baseline), median(profiled_runs)
+    report = {
+        "interval_ms": args.interval_ms,
+        "seconds": args.seconds,
+        "throughput": {
+            "baseline_iterations": baseline,
+            "profiled_iterations": profiled_runs,
+            "median_slowdown_pct": round((1 - with_profiler / base) * 100, 2) if base else None,
+            "sampler_cpu_share": median(cpu_share),
+        },
+        "profile": {
+            "samples": summary["samples"],
+            "threads": len(summary["threads"]),
+            "unique_stacks": summary["unique_stacks"],
+            "speedscope_kb": round(speedscope_bytes / 1024, 1),
+        },
+        "attribution": attribution,
+        "checks": checks,
+        "ok": ok,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Benchmark: time-to-ready of the old sleep-chained startup vs. StartupOrchestrator.
+
+Both schedules run simulated steps (sleeps) with the same durations:
+    legacy        - webview loop starts ("window"); WebSocket server and
+                    overlay start in the background; 1 s fixed delay; then ASR,
+                    then LLM (window styles applied after their own 0.5 s delay)
+    orchestrated  - the real StartupOrchestrator with the app's step graph:
+                    server and overlay at once, ASR / LLM / hotkey / styles in
+                    parallel as soon as the window milestone is marked
+Durations default to typical GPU-laptop numbers, or come from a timeline the
+app saved on its last start (~/.a8qingyu_startup.json). Reports ready time
+(models loaded) and the orchestrated timeline.
+
+Usage:
+    python -m src.bench.startup
+    python -m src.bench.startup --timeline ~/.a8qingyu_startup.json --output startup.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.core.startup import StartupOrchestrator
+
+DEFAULT_DURATIONS_MS = {
+    "window": 1500.0,  # webview loop up (measured as a milestone offset)
+    "ws_server": 50.0,
+    "overlay": 300.0,
+    "window_styles": 300.0,  # until the page has loaded
+    "asr_model": 4000.0,
+    "llm_model": 3000.0,
+    "hotkey": 50.0,
+    "models_ready": 1.0,
+}
+
+
+def load_durations(path):
+    durations = dict(DEFAULT_DURATIONS_MS)
+    if not path:
+        return durations
+    with open(os.path.expanduser(path), encoding="utf-8") as f:
+        for row in json.load(f):
+            if row["step"] not in durations:
+                continue
+            if row["kind"] == "milestone" and row["end_ms"] is not None:
+                durations[row["step"]] = row["end_ms"]
+            elif row["duration_ms"] is not None:
+                durations[row["step"]] = row["duration_ms"]
+    return durations
+
+
+def _sleep(ms, scale):
+    time.sleep(ms * scale / 1000.0)
+
+
+def run_legacy(d, scale):
+    """The sleep chain this replaced; returns ms until models were ready"""
+    start = time.perf_counter()
+    _sleep(d["window"], scale)
+    # Server and overlay started from init_app on their own threads
+    background = [threading.Thread(target=_sleep, args=(d["ws_server"], scale)),
+                  threading.Thread(target=_sleep, args=(d["overlay"], scale)),
+                  threading.Thread(target=lambda: (_sleep(500, scale), _sleep(d["window_styles"], scale)))]
+    for t in background:
+        t.start()
+    _sleep(1000, scale)  # _set_window_internal's fixed delay
+    hotkey = threading.Thread(target=_sleep, args=(d["hotkey"], scale))
+    hotkey.start()
+    _sleep(d["asr_model"], scale)
+    _sleep(d["llm_model"], scale)
+    _sleep(d["models_ready"], scale)
+    ready = time.perf_counter() - start
+    for t in background + [hotkey]:
+        t.join()
+    return ready / scale * 1000
+
+
+def run_orchestrated(d, scale):
+    """Returns (ms until models were ready, timeline)"""
+    done = threading.Event()
+    timeline = []
+
+    def complete(rows):
+        timeline.extend(rows)
+        done.set()
+
+    startup = StartupOrchestrator(on_complete=complete)
+    for name, after in (("window_styles", ("window",)), ("asr_model", ("window",)),
+                        ("llm_model", ("window",)), ("hotkey", ("window",)),
+                        ("models_ready", ("asr_model", "llm_model")),
+                        ("ws_server", ()), ("overlay", ())):
+        startup.add(name, lambda n=name: _sleep(d[n], scale), after=after)
+    startup.start()
+    _sleep(d["window"], scale)
+    startup.mark("window")
+    startup.wait("models_ready")
+    ready = time.perf_counter() - startup.t0
+    done.wait(10)
+    # Report in unscaled milliseconds
+    for row in timeline:
+        for key in ("start_ms", "end_ms", "duration_ms", "blocked_ms"):
+            if row[key] is not None:
+                row[key] = round(row[key] / scale, 1)
+    return ready / scale * 1000, timeline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Startup time-to-ready: sleep chain vs orchestrator")
+    parser.add_argument("--timeline", help="Startup timeline saved by the app (step durations)")
+    parser.add_argument("--scale", type=float, default=0.1, help="Run simulated steps at this fraction of real time")
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    durations = load_durations(args.timeline)
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        legacy_ms = run_legacy(durations, args.scale)
+        orchestrated_ms, timeline = run_orchestrated(durations, args.scale)
+    finally:
+        sys.stdout = real_stdout
+
+    report = {
+        "durations_ms": durations,
+        "ready_ms": {
+            "legacy": round(legacy_ms, 1),
+            "orchestrated": round(orchestrated_ms, 1),
+            "saved": round(legacy_ms - orchestrated_ms, 1),
+        },
+        "timeline": timeline,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Streaming transcription benchmark: N concurrent clients against the WebSocket endpoint.
+
+Each client streams a WAV file (in real time, or as fast as possible with
+--fast) and waits for its final transcript. Reports latency from stop to
+final transcript, time to first partial, and aggregate throughput (audio
+seconds transcribed per wall second), plus the server's scheduler stats.
+
+With --serve fake an in-process server with a fake ASR (sleeping
+`rtf` x audio length) is started, so the endpoint and scheduler can be
+measured without a model; otherwise the running app at --url is used.
+
+Usage:
+    python -m src.bench.stream --wav sample.wav --clients 4 --serve fake
+    python -m src.bench.stream --wav sample.wav --clients 8 --fast --output stream.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.core.stats import percentile
+from src.stream_client import DEFAULT_URL, load_pcm16, stream_pcm
+
+
+class FakeStreamASR:
+    """Sleeps `rtf` x audio duration, like a model with that real-time factor"""
+
+    model = object()
+
+    def __init__(self, rtf=0.05):
+        self.rtf = rtf
+
+    def transcribe(self, audio, prompt=None):
+        time.sleep(len(audio) / 16000.0 * self.rtf)
+        return f"{len(audio) / 16000.0:.1f} 秒模拟识别结果"
+
+
+async def _server_stats(url):
+    import websockets
+    async with websockets.connect(url) as ws:
+        await ws.send(json.dumps({"action": "subscribe", "payload": {"topics": []}}))
+        await ws.send(json.dumps({"action": "transcribe.stats"}))
+        async for raw in ws:
+            msg = json.loads(raw)
+            if msg.get("type") == "transcribe_stats":
+                return msg["data"]
+
+
+async def run(args, pcm):
+    url = args.url
+    server = None
+    if args.serve == "fake":
+        import websockets
+        import src.api_server as api
+        from src.core.asr_service import TranscriptionService
+        api.transcription_service = TranscriptionService(FakeStreamASR(args.fake_rtf), max_sessions=args.clients)
+        server = await websockets.serve(api.handler, "127.0.0.1", 0)
+        url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        stream_pcm(pcm, url, args.chunk_ms, not args.fast, None, args.partial_interval_ms)
+        for _ in range(args.clients)
+    ], return_exceptions=True)
+    wall = time.perf_counter() - start
+    stats = await _server_stats(url)
+
+    if server:
+        server.close()
+        await server.wait_closed()
+
+    ok = [r for r in results if isinstance(r, dict)]
+    errors = [str(r) for r in results if not isinstance(r, dict)]
+    finals = [r["final_latency_ms"] for r in ok if r["final_latency_ms"] is not None]
+    firsts = [r["first_partial_ms"] for r in ok if r["first_partial_ms"] is not None]
+    audio_s = sum(r["audio_s"] for r in ok)
+    return {
+        "url": url if not server else "in-process (fake ASR)",
+        "clients": args.clients,
+        "mode": "fast" if args.fast else "realtime",
+        "audio_s_per_client": round(len(pcm) / 2 / 16000, 3),
+        "completed": len(ok),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_x_realtime": round(audio_s / wall, 2) if wall else None,
+        "final_latency_ms": {
+            "p50": round(percentile(finals, 50), 1),
+            "p99": round(percentile(finals, 99), 1),
+            "max": round(max(finals), 1) if finals else None,
+        },
+        "first_partial_ms": {
+            "p50": round(percentile(firsts, 50), 1),
+            "p99": round(percentile(firsts, 99), 1),
+        },
+        "partials_per_client": round(sum(r["partials"] for r in ok) / len(ok), 2) if ok else 0,
+        "server": stats,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent streaming transcription benchmark")
+    parser.add_argument("--wav", required=True, help="16-bit WAV file each client streams")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--serve", choices=["none", "fake"], default="none",
+                        help="fake = start an in-process server with a fake ASR")
+    parser.add_argument("--fake-rtf", type=float, default=0.05)
+    parser.add_argument("--chunk-ms", type=int, default=100)
+    parser.add_argument("--partial-interval-ms", type=int, default=1000)
+    parser.add_argument("--fast", action="store_true", help="Send audio as fast as possible")
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    pcm = load_pcm16(args.wav)
+    # Server logs go to stderr so stdout stays pure JSON
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        report = asyncio.run(run(args, pcm))
+    finally:
+        sys.stdout = real_stdout
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark: combined ASR + LLM throughput under concurrent CPU load.
+
+Loads both engines on the CPU, then keeps one thread transcribing and one
+thread correcting text for a fixed duration. Runs once with the engines'
+default threading (both grab every core) and once per requested budget.
+
+Usage:
+    python -m src.bench.thread_budget --wav sample.wav --llm models/qwen2.5-coder-7b-instruct-q4_k_m.gguf
+    python -m src.bench.thread_budget --wav sample.wav --llm ... --shares 0.3,0.5,0.7 --pin
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import wave
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.core.threads import plan_threads, available_cores
+
+SAMPLE_TEXT = "今天我们讨论一下派森的异步编程还有大模型推理的性能优化问题"
+
+
+def _wav_seconds(path):
+    with wave.open(path, "rb") as wf:
+        return wf.getnframes() / float(wf.getframerate())
+
+
+def _load_engines(args, asr_threads=0, asr_cores=None, llm_threads=None, llm_cores=None):
+    from src.core.asr import ASREngine
+    from src.core.llm import LLMEngine
+
+    asr = ASREngine()
+    asr.model = None  # Singleton: force a reload with the new thread settings
+    asr.initialize(model_size=args.asr_model, device="cpu", compute_type="int8",
+                   cpu_threads=asr_threads, cores=asr_cores)
+
+    llm = LLMEngine()
+    llm.model = None
+    llm.initialize_local(args.llm, n_gpu_layers=0, n_threads=llm_threads, cores=llm_cores)
+    return asr, llm
+
+
+def _run_concurrent(asr, llm, wav_path, duration):
+    stop = threading.Event()
+    counts = {"asr": 0, "llm": 0}
+
+    def _asr_loop():
+        while not stop.is_set():
+            asr.transcribe(wav_path)
+            counts["asr"] += 1
+
+    def _llm_loop():
+        while not stop.is_set():
+            llm.correct_text(SAMPLE_TEXT)
+            counts["llm"] += 1
+
+    threads = [threading.Thread(target=_asr_loop, daemon=True),
+               threading.Thread(target=_llm_loop, daemon=True)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return counts, elapsed
+
+
+def run_scenario(name, args, audio_seconds, **engine_kwargs):
+    asr, llm = _load_engines(args, **engine_kwargs)
+    # Warm-up pass so model load/first-call costs stay out of the measurement
+    asr.transcribe(args.wav)
+    llm.correct_text(SAMPLE_TEXT)
+
+    counts, elapsed = _run_concurrent(asr, llm, args.wav, args.duration)
+    asr_rate = counts["asr"] / elapsed
+    llm_rate = counts["llm"] / elapsed
+    return {
+        "scenario": name,
+        "elapsed_s": round(elapsed, 3),
+        "asr_runs": counts["asr"],
+        "llm_runs": counts["llm"],
+        "asr_per_s": round(asr_rate, 4),
+        "asr_audio_x_realtime": round(asr_rate * audio_seconds, 3),
+        "llm_per_s": round(llm_rate, 4),
+        "engine": engine_kwargs,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent ASR + LLM CPU throughput benchmark")
+    parser.add_argument("--wav", required=True, help="16 kHz mono WAV used for every ASR run")
+    parser.add_argument("--llm", required=True, help="Path to the GGUF model")
+    parser.add_argument("--asr-model", default="small")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of concurrent load per scenario")
+    parser.add_argument("--threads", type=int, default=0, help="Total cores to budget (0 = all)")
+    parser.add_argument("--shares", default="0.5", help="Comma separated ASR shares to try")
+    parser.add_argument("--pin", action="store_true", help="Pin each engine to its own cores")
+    parser.add_argument("--output", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    audio_seconds = _wav_seconds(args.wav)
+    results = [run_scenario("unpartitioned", args, audio_seconds)]
+
+    for share in [float(s) for s in args.shares.split(",") if s]:
+        budget = plan_threads(total=args.threads, asr_share=share, pin=args.pin)
+        results.append(run_scenario(
+            f"budget_share_{share}", args, audio_seconds,
+            asr_threads=budget.asr.threads, asr_cores=budget.asr.cores,
+            llm_threads=budget.llm.threads, llm_cores=budget.llm.cores,
+        ))
+
+    # Combined throughput relative to the unpartitioned baseline (geometric mean of both engines)
+    base = results[0]
+    for r in results:
+        if base["asr_per_s"] and base["llm_per_s"]:
+            r["combined_speedup"] = round(
+                ((r["asr_per_s"] / base["asr_per_s"]) * (r["llm_per_s"] / base["llm_per_s"])) ** 0.5, 3)
+
+    report = {
+        "cores": len(available_cores()),
+        "audio_seconds": round(audio_seconds, 3),
+        "duration_s": args.duration,
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
+import logging
 import os
 import sys
+from src.core.threads import pinned
 # from faster_whisper import WhisperModel # Lazy import
 
+logger = logging.getLogger(__name__)
+
+LANGUAGE = "zh"  # Fixed decoding language: skips Whisper's per-clip detection
+
 class ASREngine:
     _instance = None
 
@@ -9,18 +15,24 @@ class ASREngine:
         if cls._instance is None:
             cls._instance = super(ASREngine, cls).__new__(cls)
             cls._instance.model = None
+            cls._instance.cores = []
         return cls._instance
 
-    def initialize(self, model_size="large-v3", device="cuda", compute_type="float16"):
+    def initialize(self, model_size="large-v3", device="cuda", compute_type="float16",
+                   cpu_threads=0, num_workers=1, cores=None):
         """
         Initialize the Faster-Whisper model.
         Prioritizes local models in ./models/faster-whisper-{size}
+        cpu_threads: ctranslate2 intra-op threads (0 = one per core).
+        num_workers: Parallel transcriptions the model may run.
+        cores: Optional core set to pin model threads to (see src.core.threads).
         """
         if self.model is not None:
             return
 
         from faster_whisper import WhisperModel
-        print(f"Loading ASR Model: {model_size} on {device}...")
+        logger.info("Loading ASR Model: %s on %s (cpu_threads=%s, workers=%s)...", model_size, device, cpu_threads, num_workers)
+        self.cores = list(cores or [])
         
         # Robust path finding: Project Root / models
         current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -35,9 +47,9 @@ class ASREngine:
             
         local_path = os.path.join(project_root, "models", f"faster-whisper-{model_size}")
         
-        print(f"[DEBUG] Current Dir: {current_dir}")
-        print(f"[DEBUG] Project Root: {project_root}")
-        print(f"[DEBUG] Checking Local Path: {local_path}")
+        logger.debug("Current Dir: %s", current_dir)
+        logger.debug("Project Root: %s", project_root)
+        logger.debug("Checking Local Path: %s", local_path)
         
         load_target = model_size # Default to name (auto-download to cache)
         
@@ -46,67 +58,134 @@ class ASREngine:
             # Validate config file size (avoid corrupt/empty files)
             config_size = os.path.getsize(os.path.join(local_path, "config.json"))
             if config_size < 100: # Config should be larger than 100 bytes
-                print(f"[WARN] Local model config looks invalid (size: {config_size} bytes). Ignoring.")
+                logger.warning("Local model config looks invalid (size: %s bytes). Ignoring.", config_size)
             else:
-                print(f"[OK] Found local model at: {local_path}")
+                logger.info("Found local model at: %s", local_path)
                 load_target = local_path
                 is_local = True
         else:
-            print(f"[WARN] Local model NOT found at {local_path}")
-            print(f"[INFO] Will download from Hugging Face cache (Mirror)")
+            logger.warning("Local model NOT found at %s", local_path)
+            logger.info("Will download from Hugging Face cache (Mirror)")
             # Ensure mirror is set
             os.environ["HF_ENDPOINT"] = "https://hf-mirror.com"
 
         try:
-            self.model = WhisperModel(
-                model_size_or_path=load_target,
-                device=device,
-                compute_type=compute_type,
-                local_files_only=is_local # Prevent HF check if we have it
-            )
-            print("[OK] ASR Model Loaded Successfully.")
+            with pinned(self.cores):
+                self.model = WhisperModel(
+                    model_size_or_path=load_target,
+                    device=device,
+                    compute_type=compute_type,
+                    cpu_threads=cpu_threads,
+                    num_workers=num_workers,
+                    local_files_only=is_local # Prevent HF check if we have it
+                )
+            logger.info("ASR Model Loaded Successfully.")
         except Exception as e:
-            print(f"[ERROR] Failed to load ASR Model: {e}")
+            logger.error("Failed to load ASR Model: %s", e)
             if device == "cuda":
-                print("[INFO] Retrying with device='cpu'...")
+                logger.info("Retrying with device='cpu'...")
                 try:
-                     self.model = WhisperModel(
-                        model_size_or_path=load_target,
-                        device="cpu",
-                        compute_type="int8",
-                        local_files_only=is_local
-                    )
-                     print("[OK] ASR Model Loaded Successfully (CPU Fallback).")
+                     with pinned(self.cores):
+                         self.model = WhisperModel(
+                            model_size_or_path=load_target,
+                            device="cpu",
+                            compute_type="int8",
+                            cpu_threads=cpu_threads,
+                            num_workers=num_workers,
+                            local_files_only=is_local
+                        )
+                     logger.info("ASR Model Loaded Successfully (CPU Fallback).")
                 except Exception as e2:
-                    print(f"[ERROR] Failed to load ASR Model (CPU): {e2}")
+                    logger.error("Failed to load ASR Model (CPU): %s", e2)
                     raise e2
             else:
                  raise e
 
-    def transcribe(self, audio_path, prompt=None):
+    def transcribe(self, audio_path, prompt=None, with_info=False):
         """
         Transcribe audio file.
+        audio_path: File path, or a float32 16 kHz mono array (streaming sessions).
         prompt: Optional initial prompt for context.
+        with_info: Return (text, info) where info carries duration / language.
         """
         if not self.model:
             raise RuntimeError("ASR Model not initialized.")
 
-        # Optimize for speed: beam_size=1 (greedy), language='zh' (skip detection)
+        # Optimize for speed: beam_size=1 (greedy), fixed LANGUAGE (skip detection)
         try:
-             segments, info = self.model.transcribe(
-                audio_path,
-                beam_size=1,
-                language="zh",
-                initial_prompt=prompt
-            )
-             text = "".join([segment.text for segment in segments])
+             with pinned(self.cores):
+                 segments, info = self.model.transcribe(
+                    audio_path,
+                    beam_size=1,
+                    language=LANGUAGE,
+                    initial_prompt=prompt
+                )
+                 # segments is a lazy generator: decoding happens while we consume it
+                 text = "".join([segment.text for segment in segments])
+             if with_info:
+                 return text.strip(), info
              return text.strip()
         except Exception as e:
-            print(f"ASR Transcribe Error: {e}")
+            logger.error("ASR Transcribe Error: %s", e)
             if self.model.device == "cuda":
-                 print("Critical: CUDA failed during transcription. Recommendation: Disable mismatched cuDNN or use CPU.")
+                 logger.critical("CUDA failed during transcription. Recommendation: Disable mismatched cuDNN or use CPU.")
                  raise e 
             raise e
 
+    def transcribe_batch(self, audios, prompts=None):
+        """
+        Transcribe several clips with one batched encoder/decoder pass.
+        audios: File paths or float32 16 kHz mono arrays.
+        prompts: Optional initial prompt per clip.
+        Clips that fit one 30 s window are decoded together (greedy, no
+        temperature fallback); longer clips go through transcribe() one by one
+        (BatchingScheduler never passes them in).
+        """
+        if not self.model:
+            raise RuntimeError("ASR Model not initialized.")
+        import numpy as np
+        from faster_whisper.audio import decode_audio, pad_or_trim
+        from faster_whisper.tokenizer import Tokenizer
+        from faster_whisper.transcribe import get_suppressed_tokens
+
+        model = self.model
+        prompts = list(prompts) if prompts is not None else [None] * len(audios)
+        waves = [decode_audio(a) if isinstance(a, str) else a for a in audios]
+        texts = [None] * len(waves)
+        window = model.feature_extractor.n_samples  # 30 s
+
+        batch = []
+        for i, wave in enumerate(waves):
+            if len(wave) <= window:
+                batch.append(i)
+            else:
+                texts[i] = self.transcribe(wave, prompt=prompts[i])
+        if not batch:
+            return texts
+
+        tokenizer = Tokenizer(model.hf_tokenizer, model.model.is_multilingual, task="transcribe", language=LANGUAGE)
+        features = np.stack([pad_or_trim(model.feature_extractor(waves[i])[..., :-1]) for i in batch])
+        prompt_tokens = [
+            model.get_prompt(
+                tokenizer,
+                tokenizer.encode(" " + prompts[i].strip()) if prompts[i] else [],
+                without_timestamps=True,
+            )
+            for i in batch
+        ]
+        with pinned(self.cores):
+            encoder_output = model.encode(features)
+            results = model.model.generate(
+                encoder_output,
+                prompt_tokens,
+                beam_size=1,
+                max_length=model.max_length,
+                suppress_blank=True,
+                suppress_tokens=get_suppressed_tokens(tokenizer, [-1]),
+            )
+        for i, result in zip(batch, results):
+            texts[i] = tokenizer.decode(result.sequences_ids[0]).strip()
+        return texts
+
 # Global Instance
 asr_engine = ASREngine()
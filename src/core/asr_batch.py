@@ -0,0 +1,214 @@
+"""
+Dynamic batching for concurrent ASR requests.
+
+Callers block in `transcribe()` as with ASREngine, but requests are queued
+and a single dispatcher decodes them together through
+`ASREngine.transcribe_batch`. Requests that arrive while a batch is
+decoding form the next batch, so concurrency turns into larger batches
+instead of a longer queue. A lone request is dispatched immediately; the
+`max_wait_ms` collection window only applies once concurrent traffic has
+been seen, so single-user latency is unchanged. Requests may carry a
+deadline: one that expires before its batch starts fails with
+DeadlineExceeded instead of occupying a batch slot. Clips longer than
+Whisper's 30 s window cannot share a batch; they are decoded with
+`transcribe()` on the caller's thread so they never stall the dispatcher.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+from src.core.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 30.0  # Whisper's decode window: the longest clip transcribe_batch decodes together
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline passed before it could be decoded"""
+
+
+class BatchRequest:
+    """One queued transcription; `wait()` returns the text or raises"""
+
+    __slots__ = ("audio", "prompt", "deadline", "submitted_at", "started_at", "text", "error", "_done")
+
+    def __init__(self, audio, prompt=None, deadline=None):
+        self.audio = audio
+        self.prompt = prompt
+        self.deadline = deadline  # Absolute perf_counter time, or None
+        self.submitted_at = time.perf_counter()
+        self.started_at = 0.0
+        self.text = None
+        self.error = None
+        self._done = threading.Event()
+
+    def finish(self, text=None, error=None):
+        self.text = text
+        self.error = error
+        self._done.set()
+
+    def wait(self, timeout=None) -> str:
+        if not self._done.wait(timeout):
+            raise TimeoutError("Transcription did not finish in time")
+        if self.error is not None:
+            raise self.error
+        return self.text
+
+
+class BatchingScheduler:
+    """Collects concurrent requests and decodes them as batches on one dispatcher thread"""
+
+    def __init__(self, asr, max_batch_size: int = 8, max_wait_ms: float = 10.0,
+                 default_deadline_ms: Optional[float] = None, history: int = 200):
+        """
+        asr: ASREngine (or anything with transcribe_batch(audios, prompts)).
+        max_batch_size: Most requests decoded in one pass.
+        max_wait_ms: How long to hold a batch open for more requests under concurrent load.
+        default_deadline_ms: Deadline for requests that do not pass one (None = no deadline).
+        """
+        self.asr = asr
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_s = max(max_wait_ms, 0.0) / 1000.0
+        self.default_deadline_ms = default_deadline_ms
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._concurrent = False  # Last batch had company: worth waiting for more
+        self._last_done = 0.0  # End of the previous decode pass
+
+        # Metrics
+        self.requests = 0
+        self.batches = 0
+        self.expired = 0
+        self.failed = 0
+        self.oversized = 0  # Decoded directly on the caller's thread
+        self._batch_sizes = deque(maxlen=history)
+        self._queue_wait = deque(maxlen=history)
+        self._latency = deque(maxlen=history)
+
+    @property
+    def model(self):
+        """Loaded model of the wrapped engine (None until initialized)"""
+        return getattr(self.asr, "model", None)
+
+    def submit(self, audio, prompt=None, deadline_ms=None) -> BatchRequest:
+        """
+        Queue a clip (float32 16 kHz array) for the next batch.
+        A clip longer than the 30 s window is decoded before returning, on the
+        calling thread: it cannot be batched, and on the dispatcher it would hold
+        up every queued request for the length of a full transcribe().
+        """
+        deadline_ms = self.default_deadline_ms if deadline_ms is None else deadline_ms
+        request = BatchRequest(audio, prompt,
+                               time.perf_counter() + deadline_ms / 1000.0 if deadline_ms else None)
+        if not isinstance(audio, str) and len(audio) > WINDOW_SECONDS * SAMPLE_RATE:
+            with self._cond:
+                self.requests += 1
+                self.oversized += 1
+            try:
+                request.finish(text=self.asr.transcribe(audio, prompt=prompt))
+            except Exception as e:
+                request.finish(error=e)
+            return request
+        with self._cond:
+            self._queue.append(request)
+            self.requests += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatcher, name="asr-batcher", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return request
+
+    def transcribe(self, audio, prompt=None, deadline_ms=None) -> str:
+        """Blocking drop-in for ASREngine.transcribe"""
+        return self.submit(audio, prompt, deadline_ms).wait()
+
+    # --- Dispatcher ---
+
+    def _collect(self) -> List[BatchRequest]:
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            # Concurrent traffic: the last batch was shared, or this request queued behind a decode
+            concurrent = self._concurrent or self._queue[0].submitted_at < self._last_done
+            if concurrent and len(self._queue) < self.max_batch_size and self.max_wait_s:
+                # Hold the window open, but never past the first request's deadline
+                until = self._queue[0].submitted_at + self.max_wait_s
+                if self._queue[0].deadline is not None:
+                    until = min(until, self._queue[0].deadline)
+                while len(self._queue) < self.max_batch_size:
+                    remaining = until - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            batch = []
+            now = time.perf_counter()
+            while self._queue and len(batch) < self.max_batch_size:
+                request = self._queue.popleft()
+                if request.deadline is not None and now > request.deadline:
+                    self.expired += 1
+                    request.finish(error=DeadlineExceeded("Deadline passed before decoding started"))
+                    continue
+                request.started_at = now
+                batch.append(request)
+            self._concurrent = len(batch) > 1 or bool(self._queue)
+            return batch
+
+    def _dispatcher(self) -> None:
+        while True:
+            batch = self._collect()
+            if not batch:
+                continue
+            try:
+                texts = self.asr.transcribe_batch([r.audio for r in batch], [r.prompt for r in batch])
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error("Batched ASR failed (%s requests): %s", len(batch), e)
+                for request in batch:
+                    request.finish(error=e)
+                continue
+            done = time.perf_counter()
+            self._last_done = done
+            self.batches += 1
+            self._batch_sizes.append(len(batch))
+            for request, text in zip(batch, texts):
+                self._queue_wait.append(request.started_at - request.submitted_at)
+                self._latency.append(done - request.submitted_at)
+                request.finish(text=text)
+
+    # --- Metrics ---
+
+    def stats(self) -> dict:
+        sizes = list(self._batch_sizes)
+        waits = list(self._queue_wait)
+        latency = list(self._latency)
+        with self._cond:
+            queued = len(self._queue)
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait_s * 1000, 1),
+            "queued": queued,
+            "requests": self.requests,
+            "batches": self.batches,
+            "expired": self.expired,
+            "failed": self.failed,
+            "oversized": self.oversized,
+            "batch_size": {
+                "mean": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+                "max": max(sizes) if sizes else 0,
+            },
+            "queue_wait_ms": {
+                "p50": round(percentile(waits, 50) * 1000, 1),
+                "p99": round(percentile(waits, 99) * 1000, 1),
+            },
+            "latency_ms": {
+                "p50": round(percentile(latency, 50) * 1000, 1),
+                "p99": round(percentile(latency, 99) * 1000, 1),
+            },
+        }
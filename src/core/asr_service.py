@@ -0,0 +1,259 @@
+"""
+Streaming transcription service on top of the shared ASREngine.
+
+Local tools stream raw PCM over the WebSocket server and get partial and
+final transcripts back without loading their own model copy. Sessions are
+scheduled round-robin: each session holds at most one pending job, and a
+worker takes the next session in line, so one long stream cannot starve
+the others. A pending partial is replaced by the final once the client
+stops, and partials are skipped while the previous one for the same session
+is still queued (the next one covers all audio received so far anyway).
+"""
+
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict
+
+from src.core.stats import percentile
+
+SAMPLE_RATE = 16000
+FORMATS = {"pcm_s16le": 2, "pcm_f32le": 4}  # format -> bytes per sample
+
+_ids = itertools.count(1)
+
+
+class StreamSession:
+    """Audio received so far for one client stream"""
+
+    def __init__(self, emit: Callable[[str, dict], None], fmt="pcm_s16le", prompt=None,
+                 partial_interval_s=1.0, max_seconds=120.0):
+        self.id = next(_ids)
+        self.emit = emit
+        self.format = fmt
+        self.prompt = prompt
+        self.partial_interval_s = partial_interval_s
+        self.max_bytes = int(max_seconds * SAMPLE_RATE) * FORMATS[fmt]
+        self._chunks = []
+        self.nbytes = 0
+        self.created_at = time.perf_counter()
+        self.last_audio_at = 0.0
+        self.partial_bytes = 0  # Audio covered by the last scheduled partial
+        self.job = None  # None | "partial" | "final"
+        self.running = False  # A worker is decoding this session (jobs never overlap)
+        self.job_at = 0.0
+        self.closed = False
+        self.partials = 0
+
+    @property
+    def seconds(self) -> float:
+        return self.nbytes / FORMATS[self.format] / SAMPLE_RATE
+
+    def append(self, data: bytes) -> None:
+        self._chunks.append(data)
+        self.nbytes += len(data)
+        self.last_audio_at = time.perf_counter()
+
+    def samples(self):
+        """Float32 mono 16 kHz array of everything received"""
+        import numpy as np
+        raw = b"".join(self._chunks)
+        self._chunks = [raw]
+        raw = raw[:len(raw) - len(raw) % FORMATS[self.format]]
+        if self.format == "pcm_s16le":
+            return np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+        return np.frombuffer(raw, dtype="<f4").astype(np.float32)
+
+
+class TranscriptionService:
+    """Round-robin scheduler sharing one ASR engine between stream sessions"""
+
+    def __init__(self, asr, workers: int = 1, max_sessions: int = 8,
+                 partial_deadline_ms: float = None, history: int = 200):
+        """
+        asr: Object with transcribe(audio, prompt=None); float32 arrays are passed in.
+        workers: Concurrent ASR calls (match the engine's num_workers, or the
+            batch size when `asr` is a BatchingScheduler).
+        max_sessions: Streams open at once; further start requests are refused.
+        partial_deadline_ms: Passed as deadline_ms for partials (needs a BatchingScheduler);
+            a partial that cannot start in time is skipped.
+        """
+        self.asr = asr
+        self.workers = workers
+        self.partial_deadline_ms = partial_deadline_ms
+        self.max_sessions = max_sessions
+        self._sessions: Dict[int, StreamSession] = {}
+        self._ready = deque()  # Session ids with a pending job, in service order
+        self._cond = threading.Condition()
+        self._threads = []
+
+        # Metrics
+        self.finals = 0
+        self.partials = 0
+        self.skipped_partials = 0
+        self.errors = 0
+        self.audio_seconds = 0.0
+        self.busy_seconds = 0.0
+        self._final_latency = deque(maxlen=history)
+        self._partial_latency = deque(maxlen=history)
+
+    # --- Session API (any thread) ---
+
+    def open(self, emit: Callable[[str, dict], None], fmt="pcm_s16le", prompt=None,
+             partial_interval_ms=1000, max_seconds=120.0) -> StreamSession:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format {fmt!r}, expected one of {sorted(FORMATS)}")
+        with self._cond:
+            if len(self._sessions) >= self.max_sessions:
+                raise RuntimeError(f"Too many transcription streams ({self.max_sessions})")
+            session = StreamSession(emit, fmt, prompt, max(partial_interval_ms, 0) / 1000.0, max_seconds)
+            self._sessions[session.id] = session
+        self._ensure_started()
+        return session
+
+    def feed(self, session: StreamSession, data: bytes) -> None:
+        with self._cond:
+            if session.closed:
+                return
+            if session.nbytes + len(data) > session.max_bytes:
+                raise ValueError(f"Stream longer than {session.max_bytes // FORMATS[session.format] // SAMPLE_RATE}s")
+            session.append(data)
+            if not session.partial_interval_s:
+                return
+            new_audio = (session.nbytes - session.partial_bytes) / FORMATS[session.format] / SAMPLE_RATE
+            if new_audio < session.partial_interval_s:
+                return
+            if session.job is not None or session.running:
+                self.skipped_partials += 1
+                return
+            self._schedule(session, "partial")
+
+    def finish(self, session: StreamSession) -> None:
+        """Client stopped sending: transcribe everything and close the session"""
+        with self._cond:
+            if session.closed:
+                return
+            session.closed = True
+            if session.job is None and not session.running:
+                self._schedule(session, "final")
+            else:
+                # Replaces a queued partial (keeping its place in line), or runs
+                # once the current decode for this session completes
+                session.job = "final"
+                session.job_at = time.perf_counter()
+
+    def cancel(self, session: StreamSession) -> None:
+        with self._cond:
+            session.closed = True
+            session.job = None
+            self._sessions.pop(session.id, None)
+
+    def _schedule(self, session: StreamSession, job: str) -> None:
+        session.job = job
+        session.job_at = time.perf_counter()
+        if job == "partial":
+            session.partial_bytes = session.nbytes
+        self._ready.append(session.id)
+        self._cond.notify()
+
+    # --- Workers ---
+
+    def _ensure_started(self) -> None:
+        with self._cond:
+            while len(self._threads) < self.workers:
+                t = threading.Thread(target=self._worker, name=f"asr-stream-{len(self._threads)}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    while not self._ready:
+                        self._cond.wait()
+                    session = self._sessions.get(self._ready.popleft())
+                    if session is not None and session.job is not None:
+                        break
+                job, job_at = session.job, session.job_at
+                session.job = None
+                session.running = True
+                audio = session.samples()
+                seconds = session.seconds
+
+            start = time.perf_counter()
+            kwargs = {}
+            if job == "partial" and self.partial_deadline_ms:
+                kwargs["deadline_ms"] = self.partial_deadline_ms
+            text, error, stale = "", None, False
+            try:
+                text = self.asr.transcribe(audio, prompt=session.prompt, **kwargs) if len(audio) else ""
+            except TimeoutError:
+                # Stale partial under load: the next one (or the final) covers this audio
+                stale = True
+            except Exception as e:
+                error = str(e)
+            done = time.perf_counter()
+            self.busy_seconds += done - start
+
+            with self._cond:
+                session.running = False
+                if job == "final":
+                    self._sessions.pop(session.id, None)
+                elif session.job is not None and session.id in self._sessions:
+                    # finish() arrived while this partial was decoding
+                    self._ready.append(session.id)
+                    self._cond.notify()
+
+            if stale:
+                self.skipped_partials += 1
+                continue
+            if error:
+                self.errors += 1
+                session.emit("transcript_error", {"session": session.id, "error": error})
+                continue
+
+            latency_ms = round((done - job_at) * 1000, 1)
+            if job == "final":
+                self.finals += 1
+                self.audio_seconds += seconds
+                self._final_latency.append(done - job_at)
+            else:
+                self.partials += 1
+                session.partials += 1
+                self._partial_latency.append(done - job_at)
+            session.emit("transcript", {
+                "session": session.id,
+                "final": job == "final",
+                "text": text,
+                "audio_s": round(seconds, 3),
+                "latency_ms": latency_ms,
+                "asr_ms": round((done - start) * 1000, 1),
+            })
+
+    # --- Metrics ---
+
+    def stats(self) -> dict:
+        finals = list(self._final_latency)
+        partials = list(self._partial_latency)
+        with self._cond:
+            sessions = len(self._sessions)
+            queued = len(self._ready)
+        return {
+            "sessions": sessions,
+            "queued": queued,
+            "finals": self.finals,
+            "partials": self.partials,
+            "skipped_partials": self.skipped_partials,
+            "errors": self.errors,
+            "audio_seconds": round(self.audio_seconds, 3),
+            "busy_seconds": round(self.busy_seconds, 3),
+            "final_latency_ms": {
+                "p50": round(percentile(finals, 50) * 1000, 1),
+                "p99": round(percentile(finals, 99) * 1000, 1),
+            },
+            "partial_latency_ms": {
+                "p50": round(percentile(partials, 50) * 1000, 1),
+                "p99": round(percentile(partials, 99) * 1000, 1),
+            },
+        }
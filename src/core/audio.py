@@ -1,4 +1,5 @@
 # import sounddevice as sd # Lazy import
+import logging
 import numpy as np
 import wave
 import tempfile
@@ -6,6 +7,8 @@ import threading
 import os
 import time
 
+logger = logging.getLogger(__name__)
+
 class AudioRecorder:
     def __init__(self, sample_rate=16000):
         self.sample_rate = sample_rate
@@ -13,6 +16,13 @@ class AudioRecorder:
         self.audio_data = []
         self.stream = None
         self.start_time = 0
+        # perf_counter timestamps for latency tracing
+        self.stream_started_at = None
+        self.first_sample_at = None
+        # Metrics
+        self.recordings = 0
+        self.status_events = 0  # Input overflows and other PortAudio callback flags
+        self.recorded_seconds = 0.0
 
     def start(self):
         """Start recording from default microphone."""
@@ -23,11 +33,15 @@ class AudioRecorder:
         self.recording = True
         self.audio_data = [] # Reset buffer
         self.start_time = time.time()
+        self.first_sample_at = None
         
-        def callback(indata, frames, time, status):
+        def callback(indata, frames, time_info, status):
             if status:
-                print(status, flush=True)
+                self.status_events += 1
+                logger.warning("Audio input status: %s", status)
             if self.recording:
+                if self.first_sample_at is None and frames:
+                    self.first_sample_at = time.perf_counter()
                 self.audio_data.append(indata.copy())
 
         # Start stream
@@ -38,7 +52,9 @@ class AudioRecorder:
             callback=callback
         )
         self.stream.start()
-        print("Recording started...")
+        self.stream_started_at = time.perf_counter()
+        self.recordings += 1
+        logger.debug("Recording started...")
 
     def stop(self):
         """Stop recording and save to temporary file. Returns file path."""
@@ -51,13 +67,14 @@ class AudioRecorder:
             self.stream.close()
             self.stream = None
         
-        print("Recording stopped.")
+        logger.debug("Recording stopped.")
         
         if not self.audio_data:
             return None
 
         # Concatenate and save
         audio_np = np.concatenate(self.audio_data, axis=0)
+        self.recorded_seconds += len(audio_np) / self.sample_rate
         
         # Create temp file
         temp_dir = os.path.join(tempfile.gettempdir(), "a8wisper")
@@ -0,0 +1,306 @@
+"""
+Process-wide app configuration (~/.a8qingyu_config.json).
+
+The WebView bridge and the WebSocket server share one ConfigStore. Readers
+get the current snapshot, a dict that is replaced (never modified) on every
+update, so hot paths read without locks or disk access. Updates are coerced
+to the type of their default, notify subscribers and are written back after a
+short debounce through a temp file + os.replace, so a crash never leaves a
+truncated config. models_status is derived from the models directory, cached
+by directory mtimes and never persisted.
+"""
+
+import atexit
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = os.path.expanduser("~/.a8qingyu_config.json")
+
+DEFAULT_CONFIG = {
+    "asr_model": "large-v3",
+    "asr_prompt": "请准确识别以下语音内容，注意准确识别专业术语和中英文混合表达。",
+    "asr_batch_size": 8,  # Streaming requests decoded together under concurrency
+    "asr_batch_wait_ms": 10,
+    "llm_enabled": True,
+    "llm_model": "Qwen2.5-Coder-7B-Instruct-GGUF",
+    "llm_prompt": """你是一个语音转录校正助手。
+你的任务：
+1. 修正转录文本中的同音字错误、错别字和标点符号问题。
+2. 保持原意，不添加或删除信息。
+3. 严格遵循 [用户词典] 中的专业术语。
+
+[用户词典]
+{user_dict}
+
+仅输出校正后的文本，不要输出任何解释。""",
+    "use_cloud": False,  # Default to Local
+    "correction_mode": "LOCAL",  # LOCAL (7B GGUF) or PUNCT (rule-based punctuation only)
+    "user_dict": ["Python", "PySide6", "LLM", "A8轻语"],
+    "pipeline_max_pending": 4,  # Utterances queued/processing before new ones are rejected
+    "trace_file": "",  # Optional JSONL file receiving one latency trace per utterance
+    "ui_fps": 30,  # Max webview event flushes per second
+    "hotkey": "left ctrl+left windows",
+    "hotkey_debounce_ms": 30,
+    "overlay_enabled": True,
+    "sound_enabled": False,
+    "cpu_threads": 0,  # 0 = all cores, split between ASR and LLM
+    "asr_thread_share": 0.5,
+    "cpu_affinity": False,
+    "log_level": "INFO",
+    "log_levels": {},  # Per-logger overrides, e.g. {"src.core.asr": "DEBUG"}
+}
+
+# Computed at runtime, never written to disk or accepted from clients
+DERIVED_KEYS = ("models_status",)
+
+MODEL_SIZES = ["large-v3", "medium", "small"]
+
+_MISSING = object()
+
+Subscriber = Callable[[Dict[str, object], Dict[str, object]], None]
+
+
+def models_dir() -> str:
+    """<app root>/models: next to the executable when frozen, the project root otherwise"""
+    if getattr(sys, 'frozen', False):
+        return os.path.join(os.path.dirname(sys.executable), "models")
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "models")
+
+
+def _coerce(default, value):
+    """`value` converted to the type of `default` (raises ValueError/TypeError)"""
+    if default is None or value is None:
+        return value
+    if isinstance(default, bool):
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        return bool(value)
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    if isinstance(default, str):
+        return str(value)
+    if isinstance(default, list):
+        return list(value)
+    if isinstance(default, dict):
+        return dict(value)
+    return value
+
+
+class ConfigStore:
+    """Shared config: snapshot reads, typed updates, subscriptions, debounced atomic saves"""
+
+    def __init__(self, path: str = CONFIG_FILE, defaults: Optional[dict] = None, save_delay: float = 0.5):
+        """
+        path: JSON file the config is loaded from and saved to.
+        defaults: Typed defaults (DEFAULT_CONFIG).
+        save_delay: Seconds to wait for further updates before writing.
+        """
+        self.path = path
+        self.defaults = dict(DEFAULT_CONFIG if defaults is None else defaults)
+        self.save_delay = save_delay
+        self._data: Dict[str, object] = dict(self.defaults, models_status={})
+        self._lock = threading.RLock()
+        self._subscribers: List[tuple] = []
+        self._write_lock = threading.Lock()  # Keeps writes in snapshot order
+        self._saver: Optional[threading.Thread] = None
+        self._save_due = 0.0
+        self._dirty = False
+        self._loaded = False
+        self._models_sig = None
+        self.saves = 0
+        self.models_scans = 0  # models_status rescans (mtimes changed)
+        self.models_scan_skips = 0  # Refreshes answered from the cache
+
+    # --- Reads (lock-free) ---
+
+    def snapshot(self) -> Dict[str, object]:
+        """The current config. Treat as read-only: updates swap in a new dict."""
+        return self._data
+
+    def get(self, key: str, default=None):
+        return self._data.get(key, default)
+
+    def __getitem__(self, key: str):
+        return self._data[key]
+
+    # --- Load / update ---
+
+    def load(self, force: bool = False) -> Dict[str, object]:
+        """Read the file once (later calls are no-ops unless `force`), then scan models"""
+        with self._lock:
+            if self._loaded and not force:
+                return self._data
+            data = dict(self.defaults)
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        saved = json.load(f)
+                    data.update(self._clean(saved))
+                    logger.info("Loaded config from %s", self.path)
+                except Exception as e:
+                    logger.warning("Failed to load config: %s", e)
+            data["models_status"] = self._data.get("models_status", {})
+            self._data = data
+            if not self._loaded:
+                atexit.register(self.flush)
+            self._loaded = True
+        self.refresh_models_status(force=True)
+        return self._data
+
+    def update(self, changes: dict, persist: bool = True) -> Dict[str, object]:
+        """Apply `changes` and notify subscribers. Returns the keys that actually changed."""
+        changes = self._clean(changes or {})
+        with self._lock:
+            changed = {k: v for k, v in changes.items() if self._data.get(k, _MISSING) != v}
+            if not changed:
+                return {}
+            self._data = dict(self._data, **changed)
+            if persist:
+                self._schedule_save()
+        if "asr_model" in changed:
+            self.refresh_models_status()
+        self._notify(changed)
+        return changed
+
+    def _clean(self, changes: dict) -> dict:
+        clean = {}
+        for key, value in changes.items():
+            if key in DERIVED_KEYS:
+                continue
+            try:
+                clean[key] = _coerce(self.defaults.get(key), value)
+            except (TypeError, ValueError):
+                logger.warning("Ignoring config %s=%r: expected %s", key, value, type(self.defaults[key]).__name__)
+        return clean
+
+    # --- Subscriptions ---
+
+    def subscribe(self, callback: Subscriber, keys: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """
+        callback(changed, snapshot) runs on the updating thread after each change
+        (only when one of `keys` changed, if given). Returns an unsubscribe function.
+        """
+        entry = (callback, frozenset(keys) if keys is not None else None)
+        with self._lock:
+            self._subscribers.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+        return unsubscribe
+
+    def _notify(self, changed: dict) -> None:
+        snapshot = self._data
+        for callback, keys in list(self._subscribers):
+            if keys is not None and keys.isdisjoint(changed):
+                continue
+            try:
+                callback(changed, snapshot)
+            except Exception as e:
+                logger.warning("Config subscriber failed: %s", e)
+
+    # --- Persistence ---
+
+    def _schedule_save(self) -> None:
+        # Called with the lock held: push the deadline back, one saver thread per burst
+        self._dirty = True
+        self._save_due = time.monotonic() + self.save_delay
+        if self._saver is None:
+            self._saver = threading.Thread(target=self._save_when_quiet, name="config-save", daemon=True)
+            self._saver.start()
+
+    def _save_when_quiet(self) -> None:
+        while True:
+            with self._lock:
+                wait = self._save_due - time.monotonic()
+                if wait <= 0:
+                    self._saver = None
+                    break
+            time.sleep(wait)
+        self.flush()
+
+    def flush(self) -> bool:
+        """Write pending changes now. Returns True if the file was written."""
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return False
+                data = {k: v for k, v in self._data.items() if k not in DERIVED_KEYS}
+                self._dirty = False
+            try:
+                self._write(data)
+                self.saves += 1
+                return True
+            except Exception as e:
+                logger.error("Config save failed: %s", e)
+                with self._lock:
+                    self._dirty = True
+                return False
+
+    def _write(self, data: dict) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(prefix=".a8qingyu_config.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    # --- Derived: models_status ---
+
+    def _model_sizes(self) -> List[str]:
+        sizes = list(MODEL_SIZES)
+        current = self._data.get("asr_model")
+        if current and current not in sizes:
+            sizes.append(current)
+        return sizes
+
+    def refresh_models_status(self, force: bool = False) -> bool:
+        """Rescan faster-whisper model dirs if their mtimes changed. Returns True if the status changed."""
+        base = models_dir()
+        sizes = self._model_sizes()
+        paths = [base] + [os.path.join(base, f"faster-whisper-{size}") for size in sizes]
+        sig = []
+        for path in paths:
+            try:
+                sig.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                sig.append(None)
+        sig = tuple(sig)
+        with self._lock:
+            if not force and sig == self._models_sig:
+                self.models_scan_skips += 1
+                return False
+            self._models_sig = sig
+            self.models_scans += 1
+        status = {}
+        for size, path in zip(sizes, paths[1:]):
+            status[size] = (os.path.exists(os.path.join(path, "config.json")) and
+                            os.path.exists(os.path.join(path, "model.bin")))
+        with self._lock:
+            if status == self._data.get("models_status"):
+                return False
+            self._data = dict(self._data, models_status=status)
+        self._notify({"models_status": status})
+        return True
+
+
+config_store = ConfigStore()
@@ -0,0 +1,176 @@
+"""
+Coalescing, rate-limited event bus for pushing events into the webview.
+
+Every `evaluate_js` call is a synchronous round trip into the browser
+process, so sending one per event (and another 20 per second for audio
+levels) keeps the UI thread busy while recording. Publishers only enqueue
+here; a single sender thread flushes everything pending as one batch at
+most `fps` times per second. Event types listed in `coalesce` keep only
+their latest value (levels, state, progress), delivered at the position of
+that latest update; all other events are delivered in order, oldest dropped
+first if the backlog overflows.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.core.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+# Types where only the latest value matters. The key function picks the
+# coalescing slot, so e.g. progress for two models does not collide.
+DEFAULT_COALESCE: Dict[str, Optional[Callable[[object], object]]] = {
+    "audio_level": None,
+    "app_state": None,
+    "llm_progress": None,
+    "model_progress": lambda data: data.get("model") if isinstance(data, dict) else None,
+    "download_stats": lambda data: data.get("model") if isinstance(data, dict) else None,
+    "pipeline_stats": None,
+}
+
+
+class UIEventBus:
+    """Batches events and delivers them from one sender thread at a capped frame rate"""
+
+    def __init__(self, send: Callable[[List[Tuple[str, object]]], None],
+                 fps: float = 30.0,
+                 coalesce: Optional[Dict[str, Optional[Callable[[object], object]]]] = None,
+                 max_pending: int = 256,
+                 history: int = 200):
+        """
+        send: Receives one batch [(event_type, data), ...] per flush, on the sender thread.
+        fps: Maximum flushes per second.
+        coalesce: event_type -> slot key function (None = one slot per type).
+        max_pending: Ordered events beyond this are dropped, oldest first.
+        """
+        self._send = send
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.coalesce = DEFAULT_COALESCE if coalesce is None else coalesce
+        self.max_pending = max_pending
+
+        self._cond = threading.Condition()
+        # slot -> (event_type, data); insertion order is delivery order
+        self._pending: "OrderedDict[object, Tuple[str, object]]" = OrderedDict()
+        self._seq = 0
+        self._thread = None
+        self._closed = False
+
+        # Metrics
+        self.published = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.delivered = 0
+        self.errors = 0
+        self._send_times = deque(maxlen=history)
+        self._batch_sizes = deque(maxlen=history)
+
+    def publish(self, event_type: str, data=None) -> None:
+        """Queue an event; never blocks on the webview"""
+        with self._cond:
+            if self._closed:
+                return
+            self.published += 1
+            if event_type in self.coalesce:
+                key_fn = self.coalesce[event_type]
+                slot = (event_type, key_fn(data) if key_fn else None)
+                if slot in self._pending:
+                    self.coalesced += 1
+                self._pending[slot] = (event_type, data)
+                # Delivered where its latest update was published: after any ordered event sent before it
+                self._pending.move_to_end(slot)
+            else:
+                self._seq += 1
+                self._pending[self._seq] = (event_type, data)
+                if len(self._pending) > self.max_pending:
+                    self._drop_oldest()
+            self._ensure_started()
+            self._cond.notify()
+
+    def _drop_oldest(self) -> None:
+        for slot in self._pending:
+            if isinstance(slot, int):
+                del self._pending[slot]
+                self.dropped += 1
+                return
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ui-event-bus", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._pending:
+                    return
+                batch = list(self._pending.values())
+                self._pending.clear()
+
+            started = time.perf_counter()
+            try:
+                self._send(batch)
+                self.delivered += len(batch)
+            except Exception as e:
+                self.errors += 1
+                logger.warning("UI event flush failed: %s", e)
+            elapsed = time.perf_counter() - started
+            self.flushes += 1
+            self._send_times.append(elapsed)
+            self._batch_sizes.append(len(batch))
+
+            # Frame cap: events arriving meanwhile accumulate (and coalesce) for the next flush
+            if self.interval > elapsed:
+                time.sleep(self.interval - elapsed)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        sends = list(self._send_times)
+        sizes = list(self._batch_sizes)
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            "fps_cap": round(1.0 / self.interval, 1) if self.interval else None,
+            "pending": pending,
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "delivered": self.delivered,
+            "errors": self.errors,
+            "batch_size": {
+                "mean": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+                "max": max(sizes) if sizes else 0,
+            },
+            "send_ms": {
+                "p50": round(percentile(sends, 50) * 1000, 2),
+                "p99": round(percentile(sends, 99) * 1000, 2),
+            },
+        }
+
+
+def render_js(batch: Iterable[Tuple[str, object]], dumps: Callable[[object], str]) -> str:
+    """One script for a whole batch: levels go to handleAudioLevel, the rest to handlePywebviewMessage"""
+    messages = []
+    level = None
+    for event_type, data in batch:
+        if event_type == "audio_level":
+            level = data
+        else:
+            messages.append({"type": event_type, "data": data})
+    return (
+        "(function(m,l){var h=window.handlePywebviewMessage;"
+        "if(h){for(var i=0;i<m.length;i++)h(m[i]);}"
+        "if(l!==null&&window.handleAudioLevel)window.handleAudioLevel(l);})"
+        f"({dumps(messages)},{dumps(level)})"
+    )
@@ -0,0 +1,108 @@
+"""
+Bounded task executor with queue and latency metrics.
+
+Replaces spawning a fresh thread per event: a fixed set of worker threads
+drains a bounded queue. With `workers=1` the executor is serial, which
+turns racy event handlers (hotkey edges, recording/processing transitions)
+into an ordered state machine.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from src.core.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class TaskExecutor:
+    """Fixed-size worker pool with a bounded (or unbounded) queue"""
+
+    def __init__(self, name: str, workers: int = 2, max_queue: int = 64, history: int = 200):
+        """
+        name: Prefix for worker thread names and log lines.
+        workers: Number of worker threads (1 = serial execution in submit order).
+        max_queue: Pending tasks beyond this are dropped (0 = unbounded, nothing is ever dropped).
+        """
+        self.name = name
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._threads = []
+        self._start_lock = threading.Lock()
+
+        # Metrics
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.max_queue_seen = 0
+        self._waits = deque(maxlen=history)
+        self._runs = deque(maxlen=history)
+
+    def _ensure_started(self):
+        # Threads start on first use so constructing the executor stays free
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"{self.name}-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> bool:
+        """Queue `fn(*args, **kwargs)`. Returns False if the queue is full and the task was dropped."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((fn, args, kwargs, time.perf_counter()))
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("%s: queue full, dropped %s", self.name, getattr(fn, '__name__', fn))
+            return False
+        self.submitted += 1
+        depth = self._queue.qsize()
+        if depth > self.max_queue_seen:
+            self.max_queue_seen = depth
+        return True
+
+    def _worker(self):
+        while True:
+            fn, args, kwargs, queued_at = self._queue.get()
+            started = time.perf_counter()
+            self._waits.append(started - queued_at)
+            try:
+                fn(*args, **kwargs)
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error("%s: task %s failed: %s", self.name, getattr(fn, '__name__', fn), e)
+            finally:
+                self._runs.append(time.perf_counter() - started)
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        waits = list(self._waits)
+        runs = list(self._runs)
+        return {
+            "workers": self.workers,
+            "queue": self._queue.qsize(),
+            "max_queue_seen": self.max_queue_seen,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "wait_ms": {
+                "p50": round(percentile(waits, 50) * 1000, 2),
+                "p99": round(percentile(waits, 99) * 1000, 2),
+                "max": round(max(waits) * 1000, 2) if waits else 0.0,
+            },
+            "run_ms": {
+                "p50": round(percentile(runs, 50) * 1000, 2),
+                "p99": round(percentile(runs, 99) * 1000, 2),
+            },
+        }
@@ -0,0 +1,382 @@
+"""
+Model fetcher: byte-counted progress, parallel range requests, resume and checksums.
+
+Each file is downloaded to `<name>.part`. Large files on servers that honour
+`Range` are split into segments fetched on parallel connections; each
+segment's progress is checkpointed to `<name>.part.json`, so an interrupted
+download resumes where every segment stopped. Small files and servers
+without range support use one stream, resumed from the size of the part
+file. Every file is verified against its checksum (sha256 for LFS files,
+the git blob sha1 for the rest) and only then renamed into place, all at the
+end, so a model directory only ever contains a complete, verified set.
+
+Progress callbacks receive real byte counts with throughput and ETA, rate
+limited to `progress_interval`. Plain urllib, no extra dependencies.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "a8qingyu-fetcher/1.0"
+
+
+class FetchError(Exception):
+    """A file could not be downloaded"""
+
+
+class ChecksumMismatch(FetchError):
+    """A downloaded file does not match its expected checksum"""
+
+
+class FetchCancelled(FetchError):
+    """cancel() was called"""
+
+
+@dataclass
+class RemoteFile:
+    """One file to fetch"""
+    url: str
+    path: str  # Relative to the destination directory
+    size: Optional[int] = None  # None = ask the server
+    sha256: Optional[str] = None
+    git_sha1: Optional[str] = None  # Git blob id ("blob <size>\0" + content)
+
+
+# --- Hugging Face file listing ---
+
+def hf_endpoint() -> str:
+    return os.environ.get("HF_ENDPOINT", "https://huggingface.co").rstrip("/")
+
+
+def hf_files(repo_id: str, filenames: Optional[List[str]] = None, revision: str = "main",
+             endpoint: Optional[str] = None, timeout: float = 30.0) -> List[RemoteFile]:
+    """Files of a model repo with sizes and checksums from the tree API (optionally only `filenames`)"""
+    endpoint = (endpoint or hf_endpoint()).rstrip("/")
+    url = f"{endpoint}/api/models/{repo_id}/tree/{revision}?recursive=true"
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        entries = json.loads(response.read().decode("utf-8"))
+    files = []
+    for entry in entries:
+        if entry.get("type") != "file":
+            continue
+        path = entry["path"]
+        if filenames is not None and path not in filenames:
+            continue
+        lfs = entry.get("lfs") or {}
+        files.append(RemoteFile(
+            url=f"{endpoint}/{repo_id}/resolve/{revision}/{path}",
+            path=path,
+            size=lfs.get("size", entry.get("size")),
+            sha256=lfs.get("oid") or lfs.get("sha256"),
+            git_sha1=None if lfs else entry.get("oid"),
+        ))
+    if filenames is not None:
+        missing = set(filenames) - {f.path for f in files}
+        if missing:
+            raise FetchError(f"Not found in {repo_id}: {', '.join(sorted(missing))}")
+    return files
+
+
+def fetch_hf(repo_id: str, dest_dir: str, filenames: Optional[List[str]] = None,
+             on_progress: Optional[Callable[[dict], None]] = None, **kwargs) -> List[str]:
+    """Fetch a Hugging Face repo (or some of its files) into dest_dir; kwargs go to ModelFetcher"""
+    return ModelFetcher(on_progress=on_progress, **kwargs).fetch(hf_files(repo_id, filenames), dest_dir)
+
+
+# --- Checksums ---
+
+def verify(path: str, remote: RemoteFile, chunk_size: int = 1 << 20) -> None:
+    """Raise ChecksumMismatch unless the file matches the expected size and checksum"""
+    size = os.path.getsize(path)
+    if remote.size is not None and size != remote.size:
+        raise ChecksumMismatch(f"{remote.path}: size {size} != {remote.size}")
+    if remote.sha256:
+        digest, expected = hashlib.sha256(), remote.sha256
+    elif remote.git_sha1:
+        digest, expected = hashlib.sha1(f"blob {size}\0".encode()), remote.git_sha1
+    else:
+        return
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    if digest.hexdigest() != expected.lower():
+        raise ChecksumMismatch(f"{remote.path}: checksum {digest.hexdigest()} != {expected}")
+
+
+class _Progress:
+    """Shared byte counter with a sliding-window throughput estimate"""
+
+    def __init__(self, total, callback, interval, window_s=3.0):
+        self.total = total
+        self.done = 0
+        self.file = None
+        self._callback = callback
+        self._interval = interval
+        self._window_s = window_s
+        self._lock = threading.Lock()
+        self._samples = deque([(time.perf_counter(), 0)])
+        self._last_emit = 0.0
+        self.started = time.perf_counter()
+
+    def add(self, n: int, force: bool = False) -> None:
+        with self._lock:
+            self.done += n
+            now = time.perf_counter()
+            if not force and now - self._last_emit < self._interval:
+                return
+            self._last_emit = now
+            self._samples.append((now, self.done))
+            while len(self._samples) > 2 and now - self._samples[0][0] > self._window_s:
+                self._samples.popleft()
+            snapshot = self.snapshot(now)
+        if self._callback:
+            try:
+                self._callback(snapshot)
+            except Exception as e:
+                logger.warning("Progress callback failed: %s", e)
+
+    def snapshot(self, now=None) -> dict:
+        now = now or time.perf_counter()
+        t0, d0 = self._samples[0]
+        rate = (self.done - d0) / (now - t0) if now > t0 else 0.0
+        remaining = max(self.total - self.done, 0)
+        return {
+            "file": self.file,
+            "done": self.done,
+            "total": self.total,
+            "progress": round(self.done / self.total, 4) if self.total else 0.0,
+            "bytes_per_s": round(rate),
+            "eta_s": round(remaining / rate, 1) if rate > 0 else None,
+        }
+
+
+class ModelFetcher:
+    """Downloads a set of files into a directory with real progress, resume and verification"""
+
+    def __init__(self, on_progress: Optional[Callable[[dict], None]] = None, segments: int = 4,
+                 segment_min_bytes: int = 64 << 20, chunk_size: int = 1 << 20, timeout: float = 30.0,
+                 retries: int = 3, progress_interval: float = 0.25):
+        """
+        on_progress: Called with {file, done, total, progress, bytes_per_s, eta_s} as bytes arrive.
+        segments: Parallel range requests per large file.
+        segment_min_bytes: Files smaller than this use one stream.
+        retries: Attempts per stream/segment; each retry resumes from the last written byte.
+        """
+        self.on_progress = on_progress
+        self.segments = max(1, int(segments))
+        self.segment_min_bytes = segment_min_bytes
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.retries = max(1, int(retries))
+        self.progress_interval = progress_interval
+        self._cancel = threading.Event()
+        self._progress = None
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    # --- HTTP ---
+
+    def _open(self, url, start=None, end=None):
+        headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "identity"}
+        if start is not None:
+            headers["Range"] = f"bytes={start}-" + ("" if end is None else str(end))
+        return urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=self.timeout)
+
+    def _probe(self, remote: RemoteFile):
+        """(size, supports_ranges)"""
+        with self._open(remote.url, 0, 0) as response:
+            if response.status == 206:
+                content_range = response.headers.get("Content-Range", "")
+                size = content_range.rsplit("/", 1)[-1]
+                return (int(size) if size.isdigit() else remote.size), True
+            length = response.headers.get("Content-Length")
+            return (int(length) if length else remote.size), False
+
+    def _copy(self, response, f, limit=None) -> int:
+        """Stream the body into f; returns bytes written (stops after `limit`)"""
+        written = 0
+        while limit is None or written < limit:
+            if self._cancel.is_set():
+                raise FetchCancelled("Download cancelled")
+            want = self.chunk_size if limit is None else min(self.chunk_size, limit - written)
+            chunk = response.read(want)
+            if not chunk:
+                break
+            f.write(chunk)
+            written += len(chunk)
+            self._progress.add(len(chunk))
+        return written
+
+    # --- Single stream (resumes from the part file's size) ---
+
+    def _fetch_stream(self, remote, part, size, ranges):
+        for attempt in range(self.retries):
+            have = os.path.getsize(part) if os.path.exists(part) else 0
+            if size is not None and have >= size:
+                return
+            try:
+                resume = ranges and have > 0
+                with self._open(remote.url, have if resume else None) as response:
+                    if not resume and have:
+                        self._progress.add(-have)  # Server ignored the range: start over
+                    with open(part, "ab" if resume else "wb") as f:
+                        self._copy(response, f)
+                if size is None or os.path.getsize(part) >= size:
+                    return
+                raise FetchError(f"{remote.path}: connection closed early")
+            except FetchCancelled:
+                raise
+            except Exception as e:
+                if attempt + 1 == self.retries:
+                    raise FetchError(f"{remote.path}: {e}") from e
+                logger.warning("%s: %s, retrying", remote.path, e)
+                time.sleep(min(2 ** attempt, 10))
+
+    # --- Parallel ranges (per-segment checkpoints in <part>.json) ---
+
+    def _fetch_segmented(self, remote, part, size):
+        state_path = part + ".json"
+        state = None
+        if os.path.exists(part) and os.path.exists(state_path):
+            try:
+                with open(state_path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+                if state.get("size") != size:
+                    state = None
+            except (OSError, ValueError):
+                state = None
+        if state is None:
+            step = -(-size // self.segments)
+            state = {"size": size, "segments": [[s, min(s + step, size) - 1, 0] for s in range(0, size, step)]}
+            with open(part, "wb") as f:
+                f.truncate(size)  # Sparse where supported; segments write in place
+        else:
+            self._progress.add(sum(seg[2] for seg in state["segments"]), force=True)
+
+        lock = threading.Lock()
+
+        def checkpoint():
+            with lock:
+                tmp = state_path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(state, f)
+                os.replace(tmp, state_path)
+
+        def run(seg):
+            start, end = seg[0], seg[1]
+            for attempt in range(self.retries):
+                offset = start + seg[2]
+                if offset > end:
+                    return
+                try:
+                    with self._open(remote.url, offset, end) as response, open(part, "r+b") as f:
+                        if response.status != 206:
+                            raise FetchError("server stopped honouring Range")
+                        f.seek(offset)
+                        unsaved = 0
+                        while offset <= end:
+                            # One chunk per call so seg[2] never runs ahead of what was written
+                            n = self._copy(response, f, min(self.chunk_size, end + 1 - offset))
+                            if n == 0:
+                                break
+                            offset += n
+                            seg[2] += n
+                            unsaved += n
+                            if unsaved >= 8 * self.chunk_size:
+                                f.flush()
+                                checkpoint()
+                                unsaved = 0
+                    if offset > end:
+                        return
+                    raise FetchError("connection closed early")
+                except FetchCancelled:
+                    raise
+                except Exception as e:
+                    if attempt + 1 == self.retries:
+                        raise FetchError(f"{remote.path} [{start}-{end}]: {e}") from e
+                    logger.warning("%s segment %s-%s: %s, retrying", remote.path, start, end, e)
+                    time.sleep(min(2 ** attempt, 10))
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(state["segments"]), thread_name_prefix="fetch") as pool:
+                for future in [pool.submit(run, seg) for seg in state["segments"]]:
+                    future.result()
+        finally:
+            checkpoint()  # Every segment has stopped: record exactly what was written
+        try:
+            os.remove(state_path)
+        except OSError:
+            pass
+
+    # --- Public ---
+
+    def fetch(self, files: List[RemoteFile], dest_dir: str) -> List[str]:
+        """
+        Download `files` into dest_dir; returns the final paths.
+        Files only get their final names once every file of the set is verified, so a
+        model directory never looks ready (e.g. config.json present) while its weights are not.
+        """
+        self._cancel.clear()
+        os.makedirs(dest_dir, exist_ok=True)
+        plan = []
+        for remote in files:
+            final = os.path.join(dest_dir, remote.path)
+            ranges = False
+            if not (os.path.exists(final) and remote.size is not None and os.path.getsize(final) == remote.size):
+                size, ranges = self._probe(remote)
+                remote.size = remote.size or size
+            plan.append((remote, final, ranges))
+
+        total = sum(r.size or 0 for r, _, _ in plan)
+        self._progress = _Progress(total, self.on_progress, self.progress_interval)
+        verified = []
+        for remote, final, ranges in plan:
+            self._progress.file = remote.path
+            if os.path.exists(final) and os.path.getsize(final) == remote.size:
+                # Final names only appear after verification
+                self._progress.add(remote.size, force=True)
+                continue
+            os.makedirs(os.path.dirname(final) or dest_dir, exist_ok=True)
+            part = final + ".part"
+            finished = (os.path.exists(part) and not os.path.exists(part + ".json")
+                        and os.path.getsize(part) == remote.size)
+            if finished:
+                # Downloaded by an earlier run that stopped before the set was complete
+                self._progress.add(remote.size, force=True)
+            elif ranges and remote.size and remote.size >= self.segment_min_bytes and self.segments > 1:
+                self._fetch_segmented(remote, part, remote.size)
+            else:
+                if os.path.exists(part):
+                    self._progress.add(os.path.getsize(part), force=True)
+                self._fetch_stream(remote, part, remote.size, ranges)
+            try:
+                verify(part, remote)
+            except ChecksumMismatch:
+                os.remove(part)  # Corrupt: the next attempt starts clean
+                raise
+            verified.append((part, final))
+        for part, final in verified:
+            os.replace(part, final)
+        self._progress.add(0, force=True)
+        return [final for _, final, _ in plan]
+
+    def stats(self) -> dict:
+        if self._progress is None:
+            return {}
+        snapshot = self._progress.snapshot()
+        elapsed = time.perf_counter() - self._progress.started
+        snapshot["elapsed_s"] = round(elapsed, 2)
+        return snapshot
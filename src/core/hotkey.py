@@ -0,0 +1,212 @@
+"""
+Event-driven global hotkey engine.
+
+Hooks key-down / key-up events (keyboard.hook) instead of polling
+`keyboard.is_pressed`, so the thread sleeps while idle and edges are seen
+as soon as the OS delivers them. Supports the configured combination
+(e.g. "left ctrl+left windows" or "ctrl+left_win") and debounces release
+edges so contact bounce cannot stop and restart a recording.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, FrozenSet, List, Optional
+
+from src.core.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+# Spellings accepted in the config -> canonical key name
+_ALIASES = {
+    "control": "ctrl",
+    "win": "windows",
+    "cmd": "windows",
+    "command": "windows",
+    "super": "windows",
+    "meta": "windows",
+    "option": "alt",
+    "return": "enter",
+    "esc": "escape",
+}
+
+# Generic modifiers match either side. `keyboard` reports the left-hand
+# modifiers on Windows without a side prefix ("ctrl", "shift", "alt").
+_SIDED = ("ctrl", "shift", "alt", "windows")
+
+
+def _canonical(part: str) -> str:
+    words = part.strip().lower().replace("_", " ").split()
+    return " ".join(_ALIASES.get(w, w) for w in words)
+
+
+def _accepted_names(part: str) -> FrozenSet[str]:
+    """Key names reported by `keyboard` that satisfy one part of the combo"""
+    name = _canonical(part)
+    for mod in _SIDED:
+        if name == mod:
+            return frozenset({mod, f"left {mod}", f"right {mod}"})
+        if name == f"left {mod}":
+            return frozenset({mod, f"left {mod}"}) if mod != "windows" else frozenset({"left windows"})
+        if name == f"right {mod}":
+            return frozenset({f"right {mod}"})
+    return frozenset({name})
+
+
+def parse_combo(combo: str) -> List[FrozenSet[str]]:
+    """Parse "left ctrl+left windows" into one accepted-name set per key"""
+    parts = [p for p in (combo or "").split("+") if p.strip()]
+    if not parts:
+        raise ValueError(f"Empty hotkey: {combo!r}")
+    return [_accepted_names(p) for p in parts]
+
+
+class HotkeyEngine:
+    """Press/release callbacks for a key combination, driven by keyboard hook events"""
+
+    def __init__(self, combo: str,
+                 on_press: Callable[[float], None],
+                 on_release: Callable[[float], None],
+                 debounce_ms: float = 30.0,
+                 history: int = 100):
+        """
+        combo: Key combination, parts joined by "+".
+        on_press / on_release: Called with the OS event timestamp (time.time()) of the edge.
+        debounce_ms: A release followed by a press within this window is treated as one continuous hold.
+        """
+        self._on_press = on_press
+        self._on_release = on_release
+        self.debounce_s = debounce_ms / 1000.0
+        self.combo = combo
+        self._parts = parse_combo(combo)
+
+        self._lock = threading.Lock()
+        self._down: Dict[int, set] = {}
+        self._active = False
+        self._release_timer: Optional[threading.Timer] = None
+        self._hook = None
+
+        # Metrics: OS event -> callback dispatch, and app-reported press -> recording
+        self.presses = 0
+        self.bounces = 0
+        self._edge_latency = deque(maxlen=history)
+        self._press_to_record = deque(maxlen=history)
+
+    # --- Lifecycle ---
+
+    def start(self) -> None:
+        import keyboard
+        if self._hook is None:
+            self._hook = keyboard.hook(self._on_event)
+            logger.info("Hotkey engine started (%s)", self.combo)
+
+    def stop(self) -> None:
+        import keyboard
+        if self._hook is not None:
+            try:
+                keyboard.unhook(self._hook)
+            except Exception:
+                pass
+            self._hook = None
+        with self._lock:
+            self._cancel_release()
+            self._down.clear()
+            self._active = False
+
+    def set_combo(self, combo: str) -> None:
+        """Switch to a new combination; an active hold is released first"""
+        parts = parse_combo(combo)
+        release = False
+        with self._lock:
+            release = self._active
+            self._cancel_release()
+            self._parts = parts
+            self.combo = combo
+            self._down.clear()
+            self._active = False
+        if release:
+            self._dispatch(self._on_release, time.time())
+        logger.info("Hotkey set to %s", combo)
+
+    # --- Event handling ---
+
+    def _on_event(self, event) -> None:
+        name = (event.name or "").lower()
+        event_time = getattr(event, "time", None) or time.time()
+        matched = [i for i, names in enumerate(self._parts) if name in names]
+        if not matched:
+            return
+
+        fire = None
+        with self._lock:
+            for i in matched:
+                if event.event_type == "down":
+                    self._down.setdefault(i, set()).add(name)
+                else:
+                    self._down.get(i, set()).discard(name)
+            is_combo = all(self._down.get(i) for i in range(len(self._parts)))
+
+            if is_combo and not self._active:
+                self._active = True
+                if self._release_timer is not None:
+                    # Bounce: release pending inside the debounce window, keep holding
+                    self._cancel_release()
+                    self.bounces += 1
+                else:
+                    fire = self._on_press
+                    self.presses += 1
+            elif not is_combo and self._active:
+                self._active = False
+                if self.debounce_s > 0:
+                    self._release_timer = threading.Timer(self.debounce_s, self._fire_release, args=(event_time,))
+                    self._release_timer.daemon = True
+                    self._release_timer.start()
+                else:
+                    fire = self._on_release
+
+        if fire is not None:
+            self._dispatch(fire, event_time)
+
+    def _cancel_release(self) -> None:
+        if self._release_timer is not None:
+            self._release_timer.cancel()
+            self._release_timer = None
+
+    def _fire_release(self, event_time: float) -> None:
+        with self._lock:
+            if self._release_timer is None or self._active:
+                return
+            self._release_timer = None
+        self._dispatch(self._on_release, event_time)
+
+    def _dispatch(self, callback, event_time: float) -> None:
+        self._edge_latency.append(max(time.time() - event_time, 0.0))
+        try:
+            callback(event_time)
+        except Exception as e:
+            logger.error("Hotkey callback failed: %s", e)
+
+    # --- Metrics ---
+
+    def record_press_to_record(self, event_time: float) -> None:
+        """Called by the app once recording has actually started for a press"""
+        self._press_to_record.append(max(time.time() - event_time, 0.0))
+
+    def stats(self) -> dict:
+        edge = list(self._edge_latency)
+        p2r = list(self._press_to_record)
+        return {
+            "combo": self.combo,
+            "presses": self.presses,
+            "bounces": self.bounces,
+            "edge_latency_ms": {
+                "p50": round(percentile(edge, 50) * 1000, 2),
+                "p99": round(percentile(edge, 99) * 1000, 2),
+            },
+            "press_to_record_ms": {
+                "p50": round(percentile(p2r, 50) * 1000, 2),
+                "p99": round(percentile(p2r, 99) * 1000, 2),
+                "max": round(max(p2r) * 1000, 2) if p2r else 0.0,
+            },
+        }
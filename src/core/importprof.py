@@ -0,0 +1,128 @@
+"""
+Import-time profiler for startup budgeting.
+
+Wraps `builtins.__import__` and times every import of a module that is not
+loaded yet, per thread, keeping both the cumulative time (with everything it
+imported) and the self time (without). Works in the frozen app, where
+`python -X importtime` is not available. Enable with `--profile-imports` or
+A8_PROFILE_IMPORTS=1; snapshots are printed and saved as JSON.
+
+Imports through `importlib.import_module` bypass `__import__` and are only
+counted inside the module that triggered them.
+"""
+
+import builtins
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+ENV_VAR = "A8_PROFILE_IMPORTS"
+REPORT_FILE = "~/.a8qingyu_imports.json"
+
+
+class ImportProfiler:
+    """Cumulative / self import time per module"""
+
+    def __init__(self):
+        self.active = False
+        self.t0 = time.perf_counter()
+        self._original = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cumulative: Dict[str, float] = {}
+        self._self: Dict[str, float] = {}
+        self._thread: Dict[str, str] = {}
+        self.snapshots: Dict[str, dict] = {}
+
+    @staticmethod
+    def requested(argv=None) -> bool:
+        import os
+        return "--profile-imports" in (argv if argv is not None else sys.argv) or bool(os.environ.get(ENV_VAR))
+
+    def install(self) -> None:
+        if self.active:
+            return
+        self.active = True
+        self.t0 = time.perf_counter()
+        self._original = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        if self.active and builtins.__import__ is self._import:
+            builtins.__import__ = self._original
+        self.active = False
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        target = name
+        if level:
+            # Same resolution as importlib._bootstrap._resolve_name; importing here would recurse
+            bits = ((globals or {}).get("__package__") or "").rsplit(".", level - 1)
+            target = f"{bits[0]}.{name}" if name else bits[0]
+        if target in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)  # Children's cumulative time
+        start = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                self._cumulative[target] = self._cumulative.get(target, 0.0) + elapsed
+                self._self[target] = self._self.get(target, 0.0) + elapsed - children
+                self._thread.setdefault(target, threading.current_thread().name)
+
+    # --- Reporting ---
+
+    def report(self, top: int = 25) -> dict:
+        with self._lock:
+            names = list(self._cumulative)
+            rows = [{
+                "module": n,
+                "cumulative_ms": round(self._cumulative[n] * 1000, 2),
+                "self_ms": round(self._self[n] * 1000, 2),
+                "thread": self._thread[n],
+            } for n in names]
+        # Self times add up to the total time spent importing
+        total = sum(r["self_ms"] for r in rows)
+        rows.sort(key=lambda r: r["self_ms"], reverse=True)
+        return {
+            "at_ms": round((time.perf_counter() - self.t0) * 1000, 1),
+            "modules": len(rows),
+            "total_ms": round(total, 1),
+            "top_self": rows[:top],
+            "top_cumulative": sorted(rows, key=lambda r: r["cumulative_ms"], reverse=True)[:top],
+        }
+
+    def snapshot(self, label: str, top: int = 25, path: Optional[str] = REPORT_FILE) -> dict:
+        """Print the current report under `label` and save all snapshots so far"""
+        data = self.report(top)
+        self.snapshots[label] = data
+        print(f"[IMPORTS] {label}: {data['modules']} modules, {data['total_ms']:.0f} ms "
+              f"(@ {data['at_ms']:.0f} ms)")
+        for row in data["top_cumulative"][:10]:
+            print(f"[IMPORTS]   {row['cumulative_ms']:8.1f} ms  {row['module']}")
+        if path:
+            import json
+            import os
+            try:
+                with open(os.path.expanduser(path), "w", encoding="utf-8") as f:
+                    json.dump(self.snapshots, f, indent=2, ensure_ascii=False)
+            except Exception as e:
+                print(f"[WARN] Could not save import profile: {e}")
+        return data
+
+    def loaded(self, prefixes: List[str]) -> List[str]:
+        """Modules under any of `prefixes` that are currently imported"""
+        return sorted(n for n in list(sys.modules)
+                      if any(n == p or n.startswith(p + ".") for p in prefixes))
+
+
+profiler = ImportProfiler()
@@ -0,0 +1,151 @@
+"""
+Shared-memory level/state channel from the main process to the overlay process.
+
+One small shared-memory block holds the latest audio level and overlay
+state behind a sequence lock: the writer bumps the sequence to odd, writes
+the payload, then bumps it to even; a reader retries if it saw an odd
+sequence or the sequence changed while it was copying. Readers never block
+the writer and take no locks, so the overlay can poll it from its animation
+tick for the cost of a few struct reads. The WebSocket link stays in place
+for state changes while the overlay is idle and as the fallback when the
+channel is unavailable.
+
+Layout (little endian, 32 bytes):
+    uint64 seq | float64 level | float64 written_at (time.time()) | uint8 state | 7 bytes pad
+"""
+
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Optional, Tuple
+
+from src.core.protocol import APP_STATES
+
+logger = logging.getLogger(__name__)
+
+ENV_VAR = "A8_LEVEL_CHANNEL"
+
+_SEQ = struct.Struct("<Q")
+_PAYLOAD = struct.Struct("<ddB7x")
+SIZE = _SEQ.size + _PAYLOAD.size
+MAX_RETRIES = 1000
+_STATE_INDEX = {name: i for i, name in enumerate(APP_STATES)}
+
+
+class LevelChannel:
+    """Single-writer seqlock over multiprocessing.shared_memory"""
+
+    def __init__(self, shm, owner: bool):
+        self._shm = shm
+        self._buf = shm.buf
+        self.name = shm.name
+        self.owner = owner
+        self._write_lock = threading.Lock()  # Level monitor and state threads share the writer
+        self._level = 0.0
+        self._state = 0
+        self._last_seq = 0
+        self._snapshot = (0, 0.0, APP_STATES[0], 0.0)
+        self.retries = 0
+
+    # --- Construction ---
+
+    @classmethod
+    def create(cls, name: Optional[str] = None) -> "LevelChannel":
+        """Writer side (main process)"""
+        from multiprocessing import shared_memory
+        shm = shared_memory.SharedMemory(name=name or f"a8qingyu_levels_{os.getpid()}", create=True, size=SIZE)
+        shm.buf[:SIZE] = bytes(SIZE)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, untrack: bool = True) -> "LevelChannel":
+        """
+        Reader side (overlay process).
+        untrack: Keep this process's resource tracker from unlinking the block on exit.
+            Pass False from multiprocessing children, which share the creator's tracker.
+        """
+        from multiprocessing import shared_memory
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=not untrack)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            # Attaching registers the block with this process's resource tracker, which
+            # would unlink it when the overlay exits; only the creator owns it.
+            if untrack:
+                try:
+                    from multiprocessing import resource_tracker
+                    resource_tracker.unregister(shm._name, "shared_memory")
+                except Exception:
+                    pass
+        return cls(shm, owner=False)
+
+    @classmethod
+    def attach_from_env(cls) -> Optional["LevelChannel"]:
+        """Reader for the channel named in A8_LEVEL_CHANNEL, or None (use WebSocket only)"""
+        name = os.environ.get(ENV_VAR)
+        if not name:
+            return None
+        try:
+            channel = cls.attach(name)
+            logger.info("Level channel attached: %s", name)
+            return channel
+        except Exception as e:
+            logger.warning("Level channel unavailable (%s), using WebSocket only", e)
+            return None
+
+    # --- Writer ---
+
+    def _write(self) -> None:
+        with self._write_lock:
+            seq = _SEQ.unpack_from(self._buf, 0)[0]
+            _SEQ.pack_into(self._buf, 0, seq + 1)  # Odd: write in progress
+            _PAYLOAD.pack_into(self._buf, _SEQ.size, self._level, time.time(), self._state)
+            _SEQ.pack_into(self._buf, 0, seq + 2)
+
+    def publish_level(self, level: float) -> None:
+        self._level = float(level)
+        self._write()
+
+    def publish_state(self, state: str) -> None:
+        index = _STATE_INDEX.get(state)
+        if index is not None:
+            self._state = index
+            self._write()
+
+    # --- Reader ---
+
+    def read(self) -> Tuple[int, float, str, float]:
+        """Consistent (seq, level, state, written_at) snapshot"""
+        buf = self._buf
+        for _ in range(MAX_RETRIES):
+            seq = _SEQ.unpack_from(buf, 0)[0]
+            if seq & 1:
+                self.retries += 1
+                continue
+            level, written_at, state = _PAYLOAD.unpack_from(buf, _SEQ.size)
+            if _SEQ.unpack_from(buf, 0)[0] == seq:
+                self._snapshot = (seq, level, APP_STATES[state] if state < len(APP_STATES) else APP_STATES[0], written_at)
+                return self._snapshot
+            self.retries += 1
+        # Writer died mid-update: keep showing the last consistent value
+        return self._snapshot
+
+    def poll(self) -> Optional[Tuple[float, str, float]]:
+        """(level, state, written_at) if anything was published since the last poll, else None"""
+        seq, level, state, written_at = self.read()
+        if seq == self._last_seq:
+            return None
+        self._last_seq = seq
+        return level, state, written_at
+
+    def close(self) -> None:
+        self._buf = None
+        try:
+            self._shm.close()
+            if self.owner:
+                self._shm.unlink()
+        except Exception:
+            pass
@@ -1,19 +1,35 @@
+import logging
 import os
-try:
-    from llama_cpp import Llama
-    LLAMA_CPP_AVAILABLE = True
-except ImportError:
-    print("Warning: llama_cpp not available. Local LLM will be disabled.")
-    Llama = None
-    LLAMA_CPP_AVAILABLE = False
-
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    print("Warning: openai not available. Cloud LLM will be disabled.")
-    openai = None
-    OPENAI_AVAILABLE = False
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+from src.core.threads import pinned
+# llama_cpp and openai are imported by the initializer that needs them:
+# together they cost more to import than the rest of startup
+
+logger = logging.getLogger(__name__)
+
+
+def _load_llama():
+    """llama_cpp.Llama, or None if llama-cpp-python is not installed"""
+    try:
+        from llama_cpp import Llama
+        return Llama
+    except ImportError:
+        logger.warning("llama_cpp not available. Local LLM will be disabled.")
+        return None
+
+
+def _load_openai():
+    """The openai module, or None if it is not installed"""
+    try:
+        import openai
+        return openai
+    except ImportError:
+        logger.warning("openai not available. Cloud LLM will be disabled.")
+        return None
 
 SYSTEM_PROMPT_TEMPLATE = """You are a helpful voice transcription correction assistant.
 Your task:
@@ -27,6 +43,18 @@ Your task:
 Strictly output ONLY the corrected text. Do not output any explanation.
 """
 
+
+@dataclass
+class CorrectionResult:
+    """One item of a correct_batch() call"""
+    index: int
+    original: str
+    text: str
+    wait_s: float = 0.0      # Batch start -> item start
+    seconds: float = 0.0     # Item start -> item done
+    error: Optional[str] = None
+
+
 class LLMEngine:
     _instance = None
 
@@ -34,76 +62,190 @@ class LLMEngine:
         if cls._instance is None:
             cls._instance = super(LLMEngine, cls).__new__(cls)
             cls._instance.model = None
-            cls._instance.mode = "LOCAL" # LOCAL or CLOUD
+            cls._instance.mode = "LOCAL" # LOCAL, CLOUD or PUNCT
+            cls._instance.punctuator = None
             cls._instance.api_client = None
+            cls._instance.cores = []
+            # llama.cpp contexts are not thread-safe: one completion at a time.
+            # Reentrant so correct_batch() can hold it across a whole LOCAL batch.
+            cls._instance._local_lock = threading.RLock()
+            # Local requests whose system prompt matched / differed from the previous one.
+            # Only what we sent: whether llama.cpp actually reused its KV cache is not measured.
+            cls._instance._last_system_prompt = None
+            cls._instance.system_prompt_repeats = 0
+            cls._instance.system_prompt_changes = 0
+            # LOCAL correct_batch() context (src.core.llm_batch), created on the first batch
+            cls._instance._decoder = None
         return cls._instance
 
-    def initialize_local(self, model_path, n_gpu_layers=-1, n_ctx=2048):
-        """Initialize Local GGUF Model"""
-        if not LLAMA_CPP_AVAILABLE:
-            print("Local LLM initialization skipped: llama_cpp not available")
+    def initialize_local(self, model_path, n_gpu_layers=-1, n_ctx=2048, n_threads=None,
+                         n_threads_batch=None, cores=None):
+        """
+        Initialize Local GGUF Model
+        n_threads / n_threads_batch: llama.cpp generation / prompt threads (None = llama.cpp default).
+        cores: Optional core set to pin inference threads to (see src.core.threads).
+        """
+        Llama = _load_llama()
+        if Llama is None:
+            logger.info("Local LLM initialization skipped: llama_cpp not available")
             return
             
-        print(f"Loading LLM (Local): {model_path}")
+        logger.info("Loading LLM (Local): %s (n_threads=%s)", model_path, n_threads)
+        self.cores = list(cores or [])
         try:
-            self.model = Llama(
-                model_path=model_path,
-                n_gpu_layers=n_gpu_layers, # -1 = all
-                n_ctx=n_ctx,
-                verbose=False
-            )
+            with pinned(self.cores):
+                self.model = Llama(
+                    model_path=model_path,
+                    n_gpu_layers=n_gpu_layers, # -1 = all
+                    n_ctx=n_ctx,
+                    n_threads=n_threads,
+                    n_threads_batch=n_threads_batch or n_threads,
+                    verbose=False
+                )
             self.mode = "LOCAL"
-            print("Local LLM Loaded.")
+            if self._decoder is not None:
+                self._decoder.close()
+                self._decoder = None
+            logger.info("Local LLM Loaded.")
         except Exception as e:
-            print(f"Failed to load Local LLM: {e}")
+            logger.error("Failed to load Local LLM: %s", e)
             raise e
 
     def initialize_cloud(self, api_key, base_url="https://api.openai.com/v1", model_name="gpt-3.5-turbo"):
         """Initialize Cloud API"""
-        if not OPENAI_AVAILABLE:
-            print("Cloud LLM initialization skipped: openai not available")
+        openai = _load_openai()
+        if openai is None:
+            logger.info("Cloud LLM initialization skipped: openai not available")
             return
             
-        print("Initializing Cloud LLM...")
+        logger.info("Initializing Cloud LLM...")
         self.api_client = openai.Client(api_key=api_key, base_url=base_url)
         self.cloud_model_name = model_name
         self.mode = "CLOUD"
-        print("Cloud LLM Initialized.")
+        logger.info("Cloud LLM Initialized.")
 
-    def correct_text(self, text, user_dict_list=[], system_prompt_template=None):
-        """
-        Correct the transcribed text.
-        text: Input string.
-        user_dict_list: List of strings (terminology).
-        system_prompt_template: Optional custom system prompt with {user_dict} placeholder.
-        """
+    def initialize_punct(self):
+        """Initialize the rule-based punctuation restorer (no model, no network)"""
+        from src.core.punct import punctuation_engine
+        self.punctuator = punctuation_engine
+        self.mode = "PUNCT"
+        logger.info("Punctuation-only correction enabled.")
+
+    def _build_messages(self, text, user_dict_list, system_prompt_template):
         user_dict_str = "\n".join(user_dict_list)
         template = system_prompt_template if system_prompt_template else SYSTEM_PROMPT_TEMPLATE
         system_prompt = template.replace("{user_dict}", user_dict_str)
         
         user_message = f"原始文本: {text}"
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message}
+        ]
 
-        if self.mode == "LOCAL" and self.model:
+    def _note_system_prompt(self, messages):
+        if messages[0]["content"] == self._last_system_prompt:
+            self.system_prompt_repeats += 1
+        else:
+            self.system_prompt_changes += 1
+            self._last_system_prompt = messages[0]["content"]
+
+    def _complete_local(self, messages):
+        with self._local_lock, pinned(self.cores):
+            self._note_system_prompt(messages)
             output = self.model.create_chat_completion(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
+                messages=messages,
                 max_tokens=1024,
                 temperature=0.1
             )
-            return output['choices'][0]['message']['content'].strip()
+        return output['choices'][0]['message']['content'].strip()
+
+    def _complete_cloud(self, messages):
+        response = self.api_client.chat.completions.create(
+            model=self.cloud_model_name,
+            messages=messages,
+            temperature=0.1
+        )
+        return response.choices[0].message.content.strip()
+
+    def correct_text(self, text, user_dict_list=[], system_prompt_template=None):
+        """
+        Correct the transcribed text.
+        text: Input string.
+        user_dict_list: List of strings (terminology).
+        system_prompt_template: Optional custom system prompt with {user_dict} placeholder.
+        """
+        if self.mode == "PUNCT" and self.punctuator:
+            return self.punctuator.restore(text, user_dict_list)
+
+        messages = self._build_messages(text, user_dict_list, system_prompt_template)
+
+        if self.mode == "LOCAL" and self.model:
+            return self._complete_local(messages)
             
         elif self.mode == "CLOUD" and self.api_client:
-            response = self.api_client.chat.completions.create(
-                model=self.cloud_model_name,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                temperature=0.1
-            )
-            return response.choices[0].message.content.strip()
+            return self._complete_cloud(messages)
             
         else:
             return text # Fallback: return original
+
+    def correct_batch(self, texts: List[str], user_dict_list=[], system_prompt_template=None,
+                      max_concurrency: int = 8) -> List[CorrectionResult]:
+        """
+        Correct several texts. Results come back in input order with per-item timings.
+        CLOUD: up to `max_concurrency` requests in flight at once.
+        LOCAL: all items decode together as parallel sequences of one llama.cpp context
+        (greedy; see src.core.llm_batch), so wait_s is 0 and seconds is when each item's
+        sequence finished. If that path fails (no chat template, older llama-cpp-python,
+        context too large) the items run one after another instead.
+        A failed item keeps its original text and records the error; it does not fail the batch.
+        """
+        batch_start = time.perf_counter()
+
+        def _one(index, text):
+            started = time.perf_counter()
+            result = CorrectionResult(index=index, original=text, text=text,
+                                      wait_s=started - batch_start)
+            try:
+                result.text = self.correct_text(text, user_dict_list, system_prompt_template)
+            except Exception as e:
+                logger.warning("Batch correction #%s failed: %s", index, e)
+                result.error = str(e)
+            result.seconds = time.perf_counter() - started
+            return result
+
+        if not texts:
+            return []
+
+        if self.mode == "CLOUD" and self.api_client and len(texts) > 1:
+            workers = max(1, min(max_concurrency, len(texts)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-batch") as pool:
+                return list(pool.map(_one, range(len(texts)), texts))
+
+        if self.mode == "LOCAL" and self.model:
+            with self._local_lock:
+                try:
+                    return self._correct_batch_local(texts, user_dict_list, system_prompt_template)
+                except Exception as e:
+                    logger.warning("Parallel LOCAL batch failed, correcting one by one: %s", e)
+                return [_one(i, t) for i, t in enumerate(texts)]
+
+        return [_one(i, t) for i, t in enumerate(texts)]
+
+    def _correct_batch_local(self, texts, user_dict_list, system_prompt_template):
+        """correct_batch() LOCAL path: one sequence per item. Caller holds _local_lock."""
+        from src.core.llm_batch import ParallelDecoder, chat_prompt
+        if self._decoder is None:
+            self._decoder = ParallelDecoder(self.model)
+        prompts, budgets, stop = [], [], []
+        for text in texts:
+            messages = self._build_messages(text, user_dict_list, system_prompt_template)
+            self._note_system_prompt(messages)
+            tokens, stop = chat_prompt(self.model, messages)
+            prompts.append(tokens)
+            # A correction is about as long as its input: size each sequence's share of the context from it
+            budgets.append(min(1024, 2 * len(self.model.tokenize(text.encode("utf-8"), add_bos=False)) + 32))
+        started = time.perf_counter()
+        with pinned(self.cores):
+            outputs = self._decoder.generate(prompts, budgets, stop)
+        return [CorrectionResult(index=i, original=text, text=output.strip(), seconds=done - started)
+                for i, (text, (output, done)) in enumerate(zip(texts, outputs))]
@@ -0,0 +1,168 @@
+"""
+Parallel decoding of several prompts in one llama.cpp context.
+
+Single completions go through Llama.create_chat_completion, one at a time on
+the model's own context, so a LOCAL batch of n corrections used to take n
+times as long as one. Here each prompt gets its own sequence id in a
+dedicated context (n_seq_max = batch size, n_ctx sized for every sequence):
+the prompts are prefilled together, then every step decodes one token for
+each unfinished sequence in a single llama_decode call. The weights are
+streamed once per step instead of once per item, which is where decoding
+spends its time on both CPU and GPU.
+
+Sampling is greedy (argmax): the batch counterpart of the temperature 0.1
+used for single completions. Written against the llama-cpp-python 0.3
+low-level bindings (llama_batch_init / llama_decode / llama_get_logits_ith);
+callers fall back to one-by-one completions if they are missing.
+"""
+
+import logging
+import time
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CTX_ROUND = 256  # Context sizes are rounded up so similar batches reuse the same context
+
+
+def chat_prompt(llama, messages) -> Tuple[List[int], List[str]]:
+    """Tokens and stop strings of `messages` rendered with the model's own chat template"""
+    from llama_cpp.llama_chat_format import Jinja2ChatFormatter
+    template = llama.metadata.get("tokenizer.chat_template")
+    if not template:
+        raise ValueError("Model has no chat template")
+
+    def token_text(token):
+        return llama.detokenize([token], special=True).decode("utf-8", errors="ignore") if token != -1 else ""
+
+    formatter = Jinja2ChatFormatter(template=template, eos_token=token_text(llama.token_eos()),
+                                    bos_token=token_text(llama.token_bos()))
+    result = formatter(messages=messages)
+    tokens = llama.tokenize(result.prompt.encode("utf-8"),
+                            add_bos=not getattr(result, "added_special", False), special=True)
+    stop = result.stop if isinstance(result.stop, list) else [result.stop] if result.stop else []
+    return tokens, stop
+
+
+class ParallelDecoder:
+    """Greedy multi-sequence generation on a context of its own; reused while batches fit it"""
+
+    def __init__(self, llama):
+        """llama: A loaded llama_cpp.Llama (its model weights and thread settings are shared)."""
+        self.llama = llama
+        self._ctx = None
+        self._n_ctx = 0
+        self._n_seq = 0
+        self._n_batch = 0
+
+    def close(self) -> None:
+        import llama_cpp
+        if self._ctx is not None:
+            llama_cpp.llama_free(self._ctx)
+            self._ctx = None
+            self._n_ctx = self._n_seq = 0
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _context(self, n_seq: int, n_ctx: int):
+        import llama_cpp
+        if self._ctx is not None and n_seq <= self._n_seq and n_ctx <= self._n_ctx:
+            llama_cpp.llama_kv_cache_clear(self._ctx)
+            return self._ctx
+        self.close()
+        n_ctx = -(-n_ctx // CTX_ROUND) * CTX_ROUND
+        params = llama_cpp.llama_context_default_params()
+        params.n_ctx = n_ctx
+        params.n_seq_max = n_seq
+        params.n_batch = min(n_ctx, max(self.llama.n_batch, n_seq))
+        params.n_ubatch = params.n_batch
+        params.n_threads = self.llama.context_params.n_threads
+        params.n_threads_batch = self.llama.context_params.n_threads_batch
+        ctx = llama_cpp.llama_new_context_with_model(self.llama.model, params)
+        if not ctx:
+            raise RuntimeError(f"Failed to create a llama.cpp context for {n_seq} sequences ({n_ctx} tokens)")
+        logger.debug("Batch context: %s sequences, n_ctx=%s", n_seq, n_ctx)
+        self._ctx, self._n_seq, self._n_ctx, self._n_batch = ctx, n_seq, n_ctx, params.n_batch
+        return ctx
+
+    def generate(self, prompts: List[List[int]], max_tokens: List[int],
+                 stop: Optional[List[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Decode every prompt as its own sequence, all in lockstep.
+        prompts: Token ids per sequence.
+        max_tokens: Generation budget per sequence (the context is sized from these).
+        stop: Strings that end a sequence (not included in its text).
+        Returns (text, perf_counter time the sequence finished) per prompt, in order.
+        """
+        import llama_cpp
+        import numpy as np
+
+        llama = self.llama
+        n = len(prompts)
+        ctx = self._context(n, sum(len(p) for p in prompts) + sum(max_tokens))
+        n_vocab = llama.n_vocab()
+        stop = [s for s in (stop or []) if s]
+        outputs: List[List[int]] = [[] for _ in prompts]
+        texts = [""] * n
+        finished_at = [0.0] * n
+        batch = llama_cpp.llama_batch_init(self._n_batch, 0, 1)
+
+        def add(token, pos, seq, logits):
+            i = batch.n_tokens
+            batch.token[i] = token
+            batch.pos[i] = pos
+            batch.n_seq_id[i] = 1
+            batch.seq_id[i][0] = seq
+            batch.logits[i] = logits
+            batch.n_tokens = i + 1
+
+        def decode():
+            rc = llama_cpp.llama_decode(ctx, batch)
+            if rc != 0:
+                raise RuntimeError(f"llama_decode failed ({rc}) with {batch.n_tokens} tokens")
+
+        def sample(seq, index):
+            """Pick the next token of `seq` from logits row `index`; False once the sequence is done"""
+            logits = np.ctypeslib.as_array(llama_cpp.llama_get_logits_ith(ctx, index), shape=(n_vocab,))
+            token = int(np.argmax(logits))
+            done = llama_cpp.llama_token_is_eog(llama.model, token)
+            if not done:
+                outputs[seq].append(token)
+                text = llama.detokenize(outputs[seq]).decode("utf-8", errors="ignore")
+                cut = min((text.find(s) for s in stop if s in text), default=-1)
+                if cut >= 0:
+                    text, done = text[:cut], True
+                texts[seq] = text
+                done = done or len(outputs[seq]) >= max_tokens[seq]
+            if done:
+                finished_at[seq] = time.perf_counter()
+            return not done
+
+        try:
+            # Prefill: all prompts packed into n_batch-sized decodes; logits only for each last prompt token
+            tokens = [(seq, pos, token) for seq, prompt in enumerate(prompts) for pos, token in enumerate(prompt)]
+            active = []
+            for start in range(0, len(tokens), self._n_batch):
+                batch.n_tokens = 0
+                ends = []
+                for seq, pos, token in tokens[start:start + self._n_batch]:
+                    last = pos == len(prompts[seq]) - 1
+                    if last:
+                        ends.append((seq, batch.n_tokens))
+                    add(token, pos, seq, last)
+                decode()
+                active += [seq for seq, index in ends if sample(seq, index)]
+            # Generation: one token per unfinished sequence per llama_decode
+            while active:
+                batch.n_tokens = 0
+                for seq in active:
+                    add(outputs[seq][-1], len(prompts[seq]) + len(outputs[seq]) - 1, seq, True)
+                decode()
+                active = [seq for index, seq in enumerate(active) if sample(seq, index)]
+        finally:
+            llama_cpp.llama_batch_free(batch)
+        return list(zip(texts, finished_at))
@@ -0,0 +1,185 @@
+"""
+Buffered, leveled logging.
+
+Every module logs through `logging.getLogger(__name__)`. setup() puts a
+single QueueHandler on the root logger: the calling thread only resolves the
+message and enqueues the record, a QueueListener thread formats and writes it
+to a size-rotated file (~/.a8qingyu_debug.log) and/or the console. Levels are
+per logger name: A8_LOG_LEVEL / A8_LOG_LEVELS ("src.core.asr=DEBUG,websockets=WARNING")
+or the log_level / log_levels config keys. A disabled logger.debug(...) costs
+one cached level check.
+
+In the frozen app stdout/stderr are redirected into the queue too, so the
+remaining print() calls (and third-party output) are written in the background
+instead of flushing the file on every write.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+from typing import Dict, Optional
+
+LOG_FILE = os.path.expanduser("~/.a8qingyu_debug.log")
+FORMAT = "%(asctime)s.%(msecs)03d %(levelname)-7s [%(threadName)s] %(name)s: %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# print() tags -> levels, for output redirected from stdout/stderr
+_TAG = re.compile(r"^\s*\[(DEBUG|INFO|OK|WARN|WARNING|ERROR|CRITICAL)\]\s*")
+_TAG_LEVELS = {"DEBUG": logging.DEBUG, "INFO": logging.INFO, "OK": logging.INFO, "WARN": logging.WARNING,
+               "WARNING": logging.WARNING, "ERROR": logging.ERROR, "CRITICAL": logging.CRITICAL}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_lock = threading.Lock()
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Resolves only the message on the calling thread; formatting happens on the listener"""
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _handler_error(record) -> None:
+    """handleError for listener handlers: straight to fd 2, never back through sys.stderr
+    (which may be a _StreamToLog feeding the same queue)"""
+    exc = sys.exc_info()[1]
+    try:
+        os.write(2, f"--- Logging error in {record.name}: {exc!r}\n".encode("utf-8", "replace"))
+    except OSError:
+        pass  # No console (windowed exe): drop it
+
+
+def _writable(stream) -> bool:
+    """False for None, closed, detached (main_webview's win32 re-wrap) or already redirected streams"""
+    if stream is None or isinstance(stream, _StreamToLog):
+        return False
+    try:
+        return not getattr(stream, "closed", False)
+    except ValueError:  # underlying buffer has been detached
+        return False
+
+
+class _StreamToLog:
+    """File-like stdout/stderr replacement: complete lines become log records"""
+
+    def __init__(self, logger: logging.Logger, level: int):
+        self.logger = logger
+        self.level = level
+        self._local = threading.local()
+
+    def write(self, message):
+        buffer = getattr(self._local, "buffer", "") + message
+        *lines, rest = buffer.split("\n")
+        self._local.buffer = rest
+        for line in lines:
+            if line.strip():
+                match = _TAG.match(line)
+                level = _TAG_LEVELS[match.group(1)] if match else self.level
+                self.logger.log(level, line.rstrip())
+        return len(message)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+
+def parse_levels(spec) -> Dict[str, str]:
+    """"a=DEBUG,b=WARNING" (or a dict) -> {"a": "DEBUG", "b": "WARNING"}"""
+    if isinstance(spec, dict):
+        return {str(k): str(v).upper() for k, v in spec.items()}
+    levels = {}
+    for item in (spec or "").split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def set_levels(level: Optional[str] = None, levels: Optional[Dict[str, str]] = None) -> None:
+    """Root level and per-logger overrides; unknown level names are ignored"""
+    if level and isinstance(logging.getLevelName(level.upper()), int):
+        logging.getLogger().setLevel(level.upper())
+    for name, value in (levels or {}).items():
+        if isinstance(logging.getLevelName(value), int):
+            logging.getLogger(name).setLevel(value)
+
+
+def apply_config(config) -> None:
+    """log_level / log_levels from the app config; the environment variables still win"""
+    set_levels(config.get("log_level"), parse_levels(config.get("log_levels")))
+    set_levels(os.environ.get("A8_LOG_LEVEL"), parse_levels(os.environ.get("A8_LOG_LEVELS")))
+
+
+def setup(path: Optional[str] = None, console: bool = True, redirect_stdio: bool = False,
+          max_bytes: int = 5 * 1024 * 1024, backups: int = 3) -> logging.Logger:
+    """
+    Install the queue handler and start the listener thread (idempotent).
+    path: Rotating log file, or None for console only.
+    console: Also write to the current stderr (skipped when there is none, e.g. a windowed exe,
+        or it is closed / detached).
+    redirect_stdio: Route print() output through the queue as well.
+    max_bytes / backups: Rotation size and number of old files kept.
+    """
+    global _listener
+    with _lock:
+        root = logging.getLogger()
+        if _listener is not None:
+            return root
+        handlers = []
+        formatter = logging.Formatter(FORMAT, DATE_FORMAT)
+        if path:
+            try:
+                file_handler = logging.handlers.RotatingFileHandler(
+                    path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+                file_handler.setFormatter(formatter)
+                handlers.append(file_handler)
+            except Exception as e:
+                if _writable(sys.stderr):
+                    sys.stderr.write(f"[ERROR] Failed to open log file {path}: {e}\n")
+        # The live stderr, captured before redirecting: sys.__stderr__ may have been detached
+        stream = sys.stderr
+        if console and _writable(stream):
+            console_handler = logging.StreamHandler(stream)
+            console_handler.setFormatter(formatter)
+            handlers.append(console_handler)
+        for handler in handlers:
+            handler.handleError = _handler_error
+
+        records = queue.SimpleQueue()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_QueueHandler(records))
+        root.setLevel(logging.INFO)
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown)
+
+        if redirect_stdio:
+            sys.stdout = _StreamToLog(logging.getLogger("stdout"), logging.INFO)
+            sys.stderr = _StreamToLog(logging.getLogger("stderr"), logging.ERROR)
+    set_levels(os.environ.get("A8_LOG_LEVEL"), parse_levels(os.environ.get("A8_LOG_LEVELS")))
+    return root
+
+
+def shutdown() -> None:
+    """Write out everything still queued and stop the listener (safe to call twice)"""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            try:
+                handler.flush()
+                handler.close()
+            except Exception:
+                pass
@@ -0,0 +1,287 @@
+"""
+Process metrics in the Prometheus text exposition format.
+
+Components keep their own counters and stats(); the registry only holds
+collectors (callables that read those when scraped) and the stage
+histograms fed from finished utterance traces. The WebSocket server serves
+render() at http://127.0.0.1:9000/metrics and pushes snapshot() on the
+"metrics" topic. Collection runs on the scraping thread and never blocks
+the pipeline: collectors only read counters.
+"""
+
+import bisect
+import math
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds; spans from a few ms (hotkey edge) to tens of seconds (long ASR / LLM)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Trace span -> (stage, what) for a8_stage_seconds
+TRACE_STAGES = {
+    "press_to_stream": ("hotkey", "press_to_stream"),
+    "stream_to_first_sample": ("audio", "first_sample"),
+    "recording": ("audio", "recording"),
+    "handoff": ("audio", "handoff"),
+    "queue": ("pipeline", "queue"),
+    "asr": ("asr", "run"),
+    "llm": ("llm", "run"),
+    "paste": ("paste", "run"),
+    "release_to_paste": ("total", "release_to_paste"),
+    "total": ("total", "utterance"),
+}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, object]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _number(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    value = float(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class Family:
+    """One metric name with its samples, as produced by a collector"""
+
+    def __init__(self, name: str, kind: str, help: str):
+        self.name = name
+        self.kind = kind  # counter / gauge / histogram
+        self.help = help
+        self.samples: List[Tuple[str, Dict[str, object], float]] = []  # (suffix, labels, value)
+
+    def add(self, value, **labels) -> "Family":
+        if value is not None:
+            self.samples.append(("", labels, value))
+        return self
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels (thread-safe)"""
+
+    def __init__(self, name: str, help: str, label_names: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def collect(self) -> Family:
+        family = Family(self.name, "histogram", self.help)
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        for key, series in sorted(items):
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                cumulative += count
+                family.samples.append(("_bucket", dict(labels, le=_number(bound)), cumulative))
+            family.samples.append(("_sum", labels, series[-1]))
+            family.samples.append(("_count", labels, cumulative))
+        return family
+
+
+Collector = Callable[[], Iterable[Family]]
+
+
+class MetricsRegistry:
+    """Named collectors plus histograms; render() / snapshot() call every collector"""
+
+    def __init__(self):
+        self._collectors: Dict[str, Collector] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self.scrapes = 0
+        self.collector_errors = 0
+
+    def register(self, name: str, collector: Collector) -> None:
+        """Add or replace the collector called `name`"""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._collectors.pop(name, None)
+
+    def histogram(self, name: str, help: str, label_names: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(name, help, label_names, buckets)
+            return self._histograms[name]
+
+    def collect(self) -> List[Family]:
+        """All families, samples of the same name merged (the text format needs them contiguous)"""
+        with self._lock:
+            collectors = list(self._collectors.items())
+            histograms = list(self._histograms.values())
+        families = []
+        for name, collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                self.collector_errors += 1
+                families.append(Family("a8_metrics_collector_failed", "gauge",
+                                       "Collector raised on the last scrape").add(1, collector=name, error=type(e).__name__))
+        families.extend(h.collect() for h in histograms)
+        self.scrapes += 1
+        merged: Dict[str, Family] = {}
+        for family in families:
+            if family.name in merged:
+                merged[family.name].samples.extend(family.samples)
+            else:
+                merged[family.name] = family
+        return list(merged.values())
+
+    def render(self) -> str:
+        """Prometheus text format 0.0.4"""
+        lines = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for suffix, labels, value in family.samples:
+                lines.append(f"{family.name}{suffix}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, list]:
+        """Same data as JSON: name -> [{"labels": {...}, "value": v}, ...] (histograms as name_bucket etc.)"""
+        out: Dict[str, list] = {}
+        for family in self.collect():
+            for suffix, labels, value in family.samples:
+                out.setdefault(family.name + suffix, []).append({"labels": labels, "value": value})
+        return out
+
+
+# --- Built-in collectors ---
+
+_start_time = time.time()
+_psutil = None  # Module, or False once the import failed
+
+
+def _rss_bytes() -> Optional[int]:
+    global _psutil
+    if _psutil is None:
+        try:
+            import psutil
+            _psutil = psutil
+        except ImportError:
+            _psutil = False
+    if _psutil:
+        return _psutil.Process().memory_info().rss
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _gpu_memory() -> List[Tuple[str, str, int]]:
+    """(device, kind, bytes). Uses torch only if something already imported it: never loads CUDA for a scrape."""
+    torch = sys.modules.get("torch")
+    out = []
+    try:
+        if torch is not None and torch.cuda.is_available():
+            for index in range(torch.cuda.device_count()):
+                out.append((str(index), "allocated", torch.cuda.memory_allocated(index)))
+                out.append((str(index), "reserved", torch.cuda.memory_reserved(index)))
+    except Exception:
+        pass
+    return out
+
+
+def process_collector() -> List[Family]:
+    families = [
+        Family("a8_process_resident_memory_bytes", "gauge", "Resident set size").add(_rss_bytes()),
+        Family("a8_process_cpu_seconds_total", "counter", "CPU time used by this process").add(time.process_time()),
+        Family("a8_process_threads", "gauge", "Live Python threads").add(threading.active_count()),
+        Family("a8_process_uptime_seconds", "gauge", "Seconds since the metrics module was loaded").add(
+            time.time() - _start_time),
+    ]
+    gpu = Family("a8_gpu_memory_bytes", "gauge", "CUDA memory held by this process (torch allocator)")
+    for device, kind, value in _gpu_memory():
+        gpu.add(value, device=device, kind=kind)
+    families.append(gpu)
+    return families
+
+
+def stats_families(prefix: str, stats: dict, labels: Optional[dict] = None,
+                   counters: Iterable[str] = ()) -> List[Family]:
+    """
+    Flatten a component's stats() dict into gauges/counters.
+    prefix: Metric name prefix, e.g. "a8_pipeline".
+    stats: Numbers at the top level; nested {"p50": .., "p99": ..} dicts become a `stat` label.
+    labels: Added to every sample.
+    counters: Keys that only ever increase (exported as <prefix>_<key>_total counters).
+    """
+    labels = labels or {}
+    counters = set(counters)
+    families = []
+    for key, value in stats.items():
+        if isinstance(value, bool) or value is None:
+            continue
+        if isinstance(value, (int, float)):
+            if key in counters:
+                families.append(Family(f"{prefix}_{key}_total", "counter", f"{prefix} {key}").add(value, **labels))
+            else:
+                families.append(Family(f"{prefix}_{key}", "gauge", f"{prefix} {key}").add(value, **labels))
+        elif isinstance(value, dict) and value and all(isinstance(v, (int, float)) for v in value.values()):
+            family = Family(f"{prefix}_{key}", "gauge", f"{prefix} {key} summary")
+            for stat, number in value.items():
+                family.add(number, **dict(labels, stat=stat))
+            families.append(family)
+    return families
+
+
+registry = MetricsRegistry()
+registry.register("process", process_collector)
+stage_seconds = registry.histogram("a8_stage_seconds", "Per-utterance stage durations from latency traces",
+                                   label_names=("stage", "span"))
+
+
+def observe_trace(record: dict) -> None:
+    """Tracer observer: one histogram sample per span of a finished utterance"""
+    for span, ms in record.get("spans_ms", {}).items():
+        stage, what = TRACE_STAGES.get(span, ("other", span))
+        stage_seconds.observe(ms / 1000.0, stage=stage, span=what)
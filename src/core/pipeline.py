@@ -0,0 +1,230 @@
+"""
+Pipelined utterance processing: ASR -> polish -> paste.
+
+Each stage has its own worker thread, so ASR of utterance N+1 overlaps with
+LLM polishing of utterance N. Both workers consume FIFO queues, which keeps
+paste order identical to recording order. Admission is bounded: when
+`max_pending` utterances are already in flight, new ones are rejected
+instead of piling up behind a slow model.
+"""
+
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from src.core.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Utterance:
+    """One recorded utterance moving through the pipeline"""
+    seq: int
+    audio: object
+    submitted_at: float = field(default_factory=time.perf_counter)
+    text: str = ""
+    corrected: str = ""
+    asr_started_at: float = 0.0
+    polish_started_at: float = 0.0
+    done_at: float = 0.0
+    error: Optional[str] = None
+    trace: Optional[object] = None  # src.core.tracing.UtteranceTrace
+
+
+def _mark(utt, name):
+    if utt.trace is not None:
+        utt.trace.mark(name)
+
+
+def transcribe_utterance(asr, utt: Utterance) -> str:
+    """ASR stage shared by the app and the offline benchmark"""
+    if not asr:
+        raise RuntimeError("ASR not ready.")
+    logger.debug("Running ASR (#%s)...", utt.seq)
+    _mark(utt, "asr_start")
+    text = asr.transcribe(utt.audio)
+    _mark(utt, "asr_end")
+    logger.info("ASR: %s", text)
+    return text
+
+
+def polish_utterance(llm, utt: Utterance) -> str:
+    """LLM correction stage shared by the app and the offline benchmark"""
+    logger.debug("Running LLM (#%s)...", utt.seq)
+    _mark(utt, "llm_start")
+    corrected_text = llm.correct_text(utt.text)
+    _mark(utt, "llm_end")
+    logger.info("LLM: %s", corrected_text)
+    return corrected_text
+
+
+class UtterancePipeline:
+    """Bounded two-stage pipeline with ordered delivery"""
+
+    _STOP = object()
+
+    def __init__(self,
+                 transcribe: Callable[[Utterance], str],
+                 polish: Callable[[Utterance], str],
+                 deliver: Callable[[Utterance], None],
+                 on_stage: Optional[Callable[[Utterance, str], None]] = None,
+                 max_pending: int = 4,
+                 history: int = 100):
+        """
+        transcribe: Stage 1, returns the raw transcript.
+        polish: Stage 2, returns the corrected text.
+        deliver: Stage 3 (paste), runs on the polish worker so output stays in order.
+        on_stage: Called with ("asr" | "polish" | "deliver" | "done" | "idle") transitions.
+        max_pending: Maximum utterances in flight (queued + processing).
+        """
+        self._transcribe = transcribe
+        self._polish = polish
+        self._deliver = deliver
+        self._on_stage = on_stage
+        self.max_pending = max_pending
+
+        self._asr_queue = queue.Queue()
+        self._polish_queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self._in_flight = 0
+        self._asr_busy = False
+        self._polish_stage = None  # None, "polish" or "deliver"
+
+        # Stats
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self._queue_waits = deque(maxlen=history)
+        self._totals = deque(maxlen=history)
+
+        self._workers = [
+            threading.Thread(target=self._asr_loop, name="pipeline-asr", daemon=True),
+            threading.Thread(target=self._polish_loop, name="pipeline-polish", daemon=True),
+        ]
+        for t in self._workers:
+            t.start()
+
+    # --- Public ---
+
+    def submit(self, audio, trace=None) -> Optional[Utterance]:
+        """Queue an utterance. Returns None if the pipeline is full."""
+        with self._lock:
+            if self._in_flight >= self.max_pending:
+                self.rejected += 1
+                return None
+            self._in_flight += 1
+            utt = Utterance(seq=next(self._seq), audio=audio, trace=trace)
+        self._asr_queue.put(utt)
+        return utt
+
+    @property
+    def busy(self) -> bool:
+        return self._in_flight > 0
+
+    def current_stage(self) -> str:
+        """Most downstream stage currently running ("deliver" > "polish" > "asr" > "queued" > "idle")"""
+        if self._polish_stage:
+            return self._polish_stage
+        if self._asr_busy:
+            return "asr"
+        if self._in_flight:
+            return "queued"
+        return "idle"
+
+    def stats(self) -> dict:
+        waits = list(self._queue_waits)
+        totals = list(self._totals)
+        return {
+            "in_flight": self._in_flight,
+            "asr_queue": self._asr_queue.qsize(),
+            "polish_queue": self._polish_queue.qsize(),
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "queue_wait_ms": {
+                "p50": round(percentile(waits, 50) * 1000, 1),
+                "p95": round(percentile(waits, 95) * 1000, 1),
+                "max": round(max(waits) * 1000, 1) if waits else 0.0,
+            },
+            "total_ms": {
+                "p50": round(percentile(totals, 50) * 1000, 1),
+                "p95": round(percentile(totals, 95) * 1000, 1),
+            },
+        }
+
+    def shutdown(self, timeout: float = 2.0) -> None:
+        self._asr_queue.put(self._STOP)
+        for t in self._workers:
+            t.join(timeout=timeout)
+
+    # --- Workers ---
+
+    def _notify(self, utt, stage):
+        if self._on_stage:
+            try:
+                self._on_stage(utt, stage)
+            except Exception as e:
+                logger.warning("Pipeline stage callback failed: %s", e)
+
+    def _asr_loop(self):
+        while True:
+            utt = self._asr_queue.get()
+            if utt is self._STOP:
+                self._polish_queue.put(self._STOP)
+                return
+            self._asr_busy = True
+            utt.asr_started_at = time.perf_counter()
+            self._queue_waits.append(utt.asr_started_at - utt.submitted_at)
+            self._notify(utt, "asr")
+            try:
+                utt.text = self._transcribe(utt) or ""
+            except Exception as e:
+                logger.error("Pipeline ASR #%s failed: %s", utt.seq, e)
+                utt.error = str(e)
+            finally:
+                self._asr_busy = False
+            self._polish_queue.put(utt)
+
+    def _polish_loop(self):
+        while True:
+            utt = self._polish_queue.get()
+            if utt is self._STOP:
+                return
+            try:
+                if utt.text and not utt.error:
+                    utt.polish_started_at = time.perf_counter()
+                    self._polish_stage = "polish"
+                    self._notify(utt, "polish")
+                    try:
+                        utt.corrected = self._polish(utt) or utt.text
+                    except Exception as e:
+                        logger.warning("Pipeline polish #%s failed, pasting raw text: %s", utt.seq, e)
+                        utt.corrected = utt.text
+                    self._polish_stage = "deliver"
+                    self._notify(utt, "deliver")
+                    self._deliver(utt)
+            except Exception as e:
+                logger.error("Pipeline deliver #%s failed: %s", utt.seq, e)
+                utt.error = str(e)
+            finally:
+                self._polish_stage = None
+                utt.done_at = time.perf_counter()
+                self._totals.append(utt.done_at - utt.submitted_at)
+                with self._lock:
+                    self._in_flight -= 1
+                    if utt.error:
+                        self.failed += 1
+                    else:
+                        self.completed += 1
+                    idle = self._in_flight == 0
+                self._notify(utt, "done")
+                if idle:
+                    self._notify(utt, "idle")
@@ -0,0 +1,56 @@
+"""
+Compact binary frames for high-rate WebSocket topics.
+
+JSON text stays the default protocol on port 9000. A client may subscribe
+to a subset of topics and ask for some of them as binary frames:
+
+    {"action": "subscribe", "payload": {"topics": ["app_state", "audio_level"],
+                                        "binary": ["audio_level", "app_state"]}}
+
+Binary frame layout (little endian): one byte topic id, then the payload.
+    audio_level: uint16 level * 65535       -> 3 bytes
+    app_state:   uint8 index into APP_STATES -> 2 bytes
+
+Kept dependency-free so the overlay process can import it cheaply.
+"""
+
+import struct
+from typing import Optional, Tuple
+
+TOPIC_AUDIO_LEVEL = 1
+TOPIC_APP_STATE = 2
+
+# Overlay states in wire order (matches OverlayState values); append only
+APP_STATES = ("IDLE", "RECORDING", "RECOGNIZING", "POLISHING", "PROCESSING", "ERROR")
+_STATE_INDEX = {name: i for i, name in enumerate(APP_STATES)}
+
+_LEVEL = struct.Struct("<BH")
+_STATE = struct.Struct("<BB")
+
+BINARY_TOPICS = {"audio_level": TOPIC_AUDIO_LEVEL, "app_state": TOPIC_APP_STATE}
+
+
+def encode_binary(msg_type: str, data) -> Optional[bytes]:
+    """Binary frame for a message, or None if the topic/value has no binary form"""
+    if msg_type == "audio_level":
+        level = min(max(float(data), 0.0), 1.0)
+        return _LEVEL.pack(TOPIC_AUDIO_LEVEL, int(level * 65535 + 0.5))
+    if msg_type == "app_state":
+        index = _STATE_INDEX.get(data)
+        if index is not None:
+            return _STATE.pack(TOPIC_APP_STATE, index)
+    return None
+
+
+def decode_binary(frame: bytes) -> Tuple[str, object]:
+    """(type, data) from a binary frame. Raises ValueError on unknown frames."""
+    if not frame:
+        raise ValueError("Empty frame")
+    topic = frame[0]
+    if topic == TOPIC_AUDIO_LEVEL and len(frame) == _LEVEL.size:
+        return "audio_level", _LEVEL.unpack(frame)[1] / 65535.0
+    if topic == TOPIC_APP_STATE and len(frame) == _STATE.size:
+        index = frame[1]
+        if index < len(APP_STATES):
+            return "app_state", APP_STATES[index]
+    raise ValueError(f"Unknown binary frame: {frame[:8]!r}")
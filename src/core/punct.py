@@ -0,0 +1,154 @@
+"""
+Rule-based punctuation restoration for Chinese ASR output.
+
+Whisper in `language="zh"` mode often returns text with no punctuation, or
+with plain spaces at pause boundaries. Restoring punctuation is most of what
+the 7B correction model does for us; these rules do it in microseconds and
+without loading a model.
+"""
+
+import re
+from typing import Iterable, List
+
+_CJK = r"㐀-䶿一-鿿豈-﫿"
+_CJK_RE = re.compile(f"[{_CJK}]")
+
+# Half-width punctuation Whisper sometimes emits between CJK characters
+_FULLWIDTH = {",": "，", ".": "。", "?": "？", "!": "！", ":": "：", ";": "；"}
+_HALF_PUNCT_RE = re.compile(rf"(?<=[{_CJK}])\s*([,.?!:;])\s*|\s*([,.?!:;])\s*(?=[{_CJK}])")
+
+_SENTENCE_END = "。？！"
+_ALL_PUNCT = "，。？！：；、"
+
+# Clause-final particles that make a question
+_QUESTION_TAIL = ("吗", "么", "呢", "嘛")
+# A-not-A forms are questions wherever they appear in the clause
+_A_NOT_A = ("是不是", "有没有", "能不能", "可不可以", "要不要", "对不对", "好不好", "行不行", "会不会")
+# Question words, unless used as indefinites ("什么都", "不知道为什么")
+_QUESTION_WORDS = ("什么", "怎么", "为什么", "为啥", "哪里", "哪儿", "哪个", "哪些", "谁", "多少", "几点")
+_INDEFINITE_RE = re.compile(r"(什么|怎么|谁|哪里|哪儿)(都|也)|知道|不管|无论")
+# Words that usually open a new sentence once the current one is long enough
+_SENTENCE_OPENERS = ("所以", "但是", "然后", "另外", "首先", "其次", "最后", "总之", "因此",
+                     "不过", "接下来", "总的来说", "那么")
+# Conjunctions that get a comma in front of them inside unbroken text
+_CLAUSE_OPENERS = ("但是", "所以", "因为", "然后", "而且", "如果", "不过", "还有", "因此",
+                   "并且", "或者", "虽然", "否则", "另外")
+
+
+class PunctuationEngine:
+    """Restore punctuation on unpunctuated Chinese text"""
+
+    def __init__(self, long_sentence: int = 24, min_clause: int = 6):
+        """
+        long_sentence: Characters after which a sentence opener starts a new sentence.
+        min_clause: Minimum characters between inserted commas in unbroken text.
+        """
+        self.long_sentence = long_sentence
+        self.min_clause = min_clause
+
+    def restore(self, text: str, user_dict_list: Iterable[str] = ()) -> str:
+        text = (text or "").strip()
+        if not text:
+            return text
+
+        text = self._normalize_punct(text)
+        clauses = self._split_pauses(text)
+        clauses = [c for clause in clauses for c in self._split_conjunctions(clause)]
+        text = self._join(clauses)
+        return self._apply_dict(text, user_dict_list)
+
+    # --- Steps ---
+
+    def _normalize_punct(self, text: str) -> str:
+        def _sub(m):
+            return _FULLWIDTH[m.group(1) or m.group(2)]
+        text = _HALF_PUNCT_RE.sub(_sub, text)
+        return re.sub(r"\s+", " ", text)
+
+    def _split_pauses(self, text: str) -> List[str]:
+        """Spaces between two CJK characters are ASR pause boundaries; spaces next to Latin words are kept"""
+        clauses = []
+        buf = []
+        for i, ch in enumerate(text):
+            if ch == " ":
+                prev = text[i - 1] if i > 0 else ""
+                nxt = text[i + 1] if i + 1 < len(text) else ""
+                if _CJK_RE.match(prev) and _CJK_RE.match(nxt):
+                    clauses.append("".join(buf))
+                    buf = []
+                    continue
+                if prev in _ALL_PUNCT or nxt in _ALL_PUNCT:
+                    continue
+            buf.append(ch)
+        clauses.append("".join(buf))
+        return [c for c in clauses if c]
+
+    def _split_conjunctions(self, clause: str) -> List[str]:
+        """Break long unbroken runs in front of conjunctions"""
+        if len(clause) < self.min_clause * 2:
+            return [clause]
+        parts = []
+        start = 0
+        i = self.min_clause
+        while i < len(clause) - 1:
+            opener = next((w for w in _CLAUSE_OPENERS if clause.startswith(w, i)), None)
+            if opener and i - start >= self.min_clause and clause[i - 1] not in _ALL_PUNCT \
+                    and _CJK_RE.match(clause[i - 1]):
+                parts.append(clause[start:i])
+                start = i
+                i += len(opener)
+                continue
+            if clause[i] in _ALL_PUNCT:
+                # Existing punctuation resets the distance counter
+                parts.append(clause[start:i + 1])
+                start = i + 1
+            i += 1
+        parts.append(clause[start:])
+        return [p for p in parts if p]
+
+    def _join(self, clauses: List[str]) -> str:
+        out = []
+        sentence_len = 0
+        for idx, clause in enumerate(clauses):
+            out.append(clause)
+            sentence_len += len(clause)
+            if clause[-1] in _ALL_PUNCT:
+                if clause[-1] in _SENTENCE_END:
+                    sentence_len = 0
+                continue
+
+            is_last = idx == len(clauses) - 1
+            if self._is_question(clause):
+                out.append("？")
+                sentence_len = 0
+            elif is_last:
+                out.append("。")
+            elif sentence_len >= self.long_sentence and clauses[idx + 1].startswith(_SENTENCE_OPENERS):
+                out.append("。")
+                sentence_len = 0
+            else:
+                out.append("，")
+
+        return "".join(out)
+
+    def _is_question(self, clause: str) -> bool:
+        if any(w in clause for w in _A_NOT_A):
+            return True
+        has_wh = any(w in clause for w in _QUESTION_WORDS) and not _INDEFINITE_RE.search(clause)
+        if clause.endswith(_QUESTION_TAIL):
+            # "呢" only marks a question together with a question word ("你呢" aside)
+            if clause.endswith("呢") and len(clause) > 2:
+                return has_wh
+            return True
+        return has_wh
+
+    def _apply_dict(self, text: str, user_dict_list: Iterable[str]) -> str:
+        """Restore the casing of dictionary terms (e.g. "pyside6" -> "PySide6")"""
+        for term in user_dict_list or ():
+            if term and term.isascii() and any(c.isalpha() for c in term):
+                text = re.sub(rf"(?<![A-Za-z0-9]){re.escape(term)}(?![A-Za-z0-9])",
+                              lambda m, t=term: t, text, flags=re.IGNORECASE)
+        return text
+
+
+punctuation_engine = PunctuationEngine()
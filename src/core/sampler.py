@@ -0,0 +1,227 @@
+"""
+On-demand sampling profiler for the running app.
+
+A background thread wakes every `interval_ms`, grabs the current frame of
+every Python thread (`sys._current_frames`) and records the stack under the
+thread's name (hotkey, ASR workers, LLM, emitters...). Nothing is installed
+in the profiled threads, so the cost is the sampler's own time plus the GIL
+it holds while walking stacks; at the default 10 ms that is 1-2% of a
+core. Consecutive identical samples of a thread are run-length merged, so
+idle threads cost almost no memory.
+
+Started and stopped over the WebSocket API (profile.start / profile.stop);
+stop() writes a speedscope file (https://www.speedscope.app, one profile per
+thread) or collapsed stacks ("thread;outer;...;leaf count", for
+flamegraph.pl / inferno). Time spent in C code without a Python frame on top
+(a blocking read, a CUDA kernel) shows up as its calling Python line.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+REPORT_FILE = "~/.a8qingyu_profile_{stamp}.{ext}"
+FORMATS = {"speedscope": "speedscope.json", "collapsed": "collapsed.txt"}
+MAX_DEPTH = 128
+
+logger = logging.getLogger(__name__)
+
+
+class Profile:
+    """Samples of one run: per thread a time-ordered list of [stack id, repeat count]"""
+
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self.started = time.time()
+        self.duration_s = 0.0
+        self.samples = 0  # Ticks
+        self.sampler_cpu_s = 0.0
+        self.frames: List[Tuple[str, str, int]] = []  # (name, file, line)
+        self.stacks: List[Tuple[int, ...]] = []  # Frame indices, outermost first
+        self.threads: Dict[str, List[List[int]]] = {}
+
+    def summary(self) -> dict:
+        return {
+            "started": self.started,
+            "duration_s": round(self.duration_s, 3),
+            "interval_ms": round(self.interval_s * 1000, 3),
+            "samples": self.samples,
+            # Copied: status() runs while the sampler thread adds threads
+            "threads": {name: sum(count for _, count in runs) for name, runs in list(self.threads.items())},
+            "unique_stacks": len(self.stacks),
+            "overhead": round(self.sampler_cpu_s / self.duration_s, 4) if self.duration_s else 0.0,
+        }
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format, thread name as the root frame"""
+        lines = []
+        for thread, runs in sorted(self.threads.items()):
+            counts: Dict[int, int] = {}
+            for stack_id, count in runs:
+                counts[stack_id] = counts.get(stack_id, 0) + count
+            root = thread.replace(";", ":")
+            for stack_id, count in sorted(counts.items()):
+                names = [self.frames[i][0].replace(";", ":") for i in self.stacks[stack_id]]
+                lines.append(f"{';'.join([root] + names)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> dict:
+        """Sampled speedscope profile per thread; weights in milliseconds, samples in time order"""
+        interval_ms = self.interval_s * 1000
+        profiles = []
+        for thread, runs in sorted(self.threads.items()):
+            weights = [round(count * interval_ms, 3) for _, count in runs]
+            profiles.append({
+                "type": "sampled",
+                "name": thread,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": [list(self.stacks[stack_id]) for stack_id, _ in runs],
+                "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"a8qingyu {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started))}",
+            "exporter": "a8qingyu sampler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": [{"name": name, "file": file, "line": line} for name, file, line in self.frames]},
+            "profiles": profiles,
+        }
+
+    def dump(self, path: Optional[str] = None, fmt: str = "speedscope") -> str:
+        """Write the profile; returns the path. Default: ~/.a8qingyu_profile_<time>.<ext>
+        (the only location the WebSocket API writes to)"""
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown profile format: {fmt} (expected one of {', '.join(FORMATS)})")
+        if not path:
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+            path = REPORT_FILE.format(stamp=stamp, ext=FORMATS[fmt])
+        path = os.path.expanduser(path)
+        with open(path, "w", encoding="utf-8") as f:
+            if fmt == "collapsed":
+                f.write(self.collapsed())
+            else:
+                json.dump(self.speedscope(), f, ensure_ascii=False)
+        return path
+
+
+class StackSampler:
+    """Samples every thread's Python stack from a background thread; one run at a time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._profile: Optional[Profile] = None
+        self.last: Optional[Profile] = None  # Most recent finished run
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval_ms: float = 10.0, max_seconds: float = 120.0) -> dict:
+        """
+        Begin sampling.
+        interval_ms: Time between samples (clamped to 1..1000).
+        max_seconds: Stops by itself after this long, so a forgotten run does not keep costing CPU.
+        """
+        with self._lock:
+            if self._thread is not None:
+                raise RuntimeError("Profiler is already running")
+            interval_s = min(max(float(interval_ms), 1.0), 1000.0) / 1000.0
+            self._profile = Profile(interval_s)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(self._profile, float(max_seconds)),
+                                            name="stack-sampler", daemon=True)
+            self._thread.start()
+        return self.status()
+
+    def stop(self) -> Optional[Profile]:
+        """Stop sampling and return the profile (the last finished one if not running)"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+        return self.last
+
+    def status(self) -> dict:
+        with self._lock:
+            running = self._thread is not None
+            profile = self._profile if running else self.last
+        return {"running": running, **(profile.summary() if profile else {})}
+
+    def _run(self, profile: Profile, max_seconds: float) -> None:
+        me = threading.get_ident()
+        names: Dict[int, str] = {}
+        labels: Dict[object, int] = {}  # Code object -> frame index
+        stack_ids: Dict[Tuple[int, ...], int] = {}
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        deadline = start + max_seconds
+        next_tick = start
+        while not self._stop.is_set():
+            frames = sys._current_frames()
+            if any(ident not in names for ident in frames):
+                live = threading.enumerate()
+                taken = [t.name for t in live]
+                # Same-named threads (pool workers) stay separate: one time-ordered profile each
+                names = {t.ident: t.name if taken.count(t.name) == 1 else f"{t.name} #{t.ident}" for t in live}
+                for ident in frames:
+                    names.setdefault(ident, f"Thread-{ident}")  # Not started via threading
+            for ident, frame in frames.items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    code = frame.f_code
+                    index = labels.get(code)
+                    if index is None:
+                        index = labels[code] = len(profile.frames)
+                        profile.frames.append(_frame_label(code))
+                    stack.append(index)
+                    frame = frame.f_back
+                key = tuple(reversed(stack))
+                stack_id = stack_ids.get(key)
+                if stack_id is None:
+                    stack_id = stack_ids[key] = len(profile.stacks)
+                    profile.stacks.append(key)
+                runs = profile.threads.setdefault(names[ident], [])
+                if runs and runs[-1][0] == stack_id:
+                    runs[-1][1] += 1
+                else:
+                    runs.append([stack_id, 1])
+            del frames
+            profile.samples += 1
+            profile.sampler_cpu_s = time.thread_time() - cpu_start
+            profile.duration_s = time.perf_counter() - start
+            next_tick += profile.interval_s
+            now = time.perf_counter()
+            if now >= deadline:
+                logger.info("Profiler stopped after the %.0f s limit", max_seconds)
+                break
+            if next_tick < now:
+                next_tick = now  # Fell behind (GIL held elsewhere): don't burst to catch up
+            self._stop.wait(next_tick - now)
+        with self._lock:
+            # Published together: status() / stop() never see running=False with the previous profile
+            self.last = profile
+            if self._thread is threading.current_thread():
+                self._thread = None
+
+
+def _frame_label(code) -> Tuple[str, str, int]:
+    """(name, file, line) for a code object; name stays readable without the file column"""
+    path = code.co_filename
+    parts = path.replace("\\", "/").split("/")
+    short = "/".join(parts[-2:])
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({short}:{code.co_firstlineno})", path, code.co_firstlineno
+
+
+sampler = StackSampler()
@@ -0,0 +1,170 @@
+"""
+Dependency-aware startup orchestration with a timing trace.
+
+Startup is a set of named steps, each declaring the steps or milestones it
+waits for. Every step runs on its own thread as soon as its dependencies
+are done, so independent work (WebSocket server, overlay process, ASR and
+LLM loading) overlaps instead of running behind fixed sleeps. Milestones are
+external readiness signals (e.g. "window": the webview loop is running) set
+with `mark()`. Every step and milestone lands in a timeline of offsets from
+the orchestrator's creation, reported once everything has finished.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupStep:
+    """One unit of startup work and its place in the timeline"""
+
+    __slots__ = ("name", "fn", "after", "done", "queued_at", "started_at", "ended_at", "status", "error")
+
+    def __init__(self, name: str, fn: Optional[Callable], after: Iterable[str]):
+        self.name = name
+        self.fn = fn  # None for milestones
+        self.after = tuple(after)
+        self.done = threading.Event()
+        self.queued_at = None
+        self.started_at = None
+        self.ended_at = None
+        self.status = "pending"
+        self.error = None
+
+
+class StartupOrchestrator:
+    """Runs startup steps as soon as their dependencies are done and records when"""
+
+    def __init__(self, on_complete: Optional[Callable[[List[dict]], None]] = None):
+        """
+        on_complete: Called with the timeline once every step and milestone has finished.
+        """
+        self.t0 = time.perf_counter()
+        self.on_complete = on_complete
+        self._steps: Dict[str, StartupStep] = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self._reported = False
+
+    def _offset_ms(self, t: Optional[float]) -> Optional[float]:
+        return round((t - self.t0) * 1000, 1) if t is not None else None
+
+    # --- Definition ---
+
+    def add(self, name: str, fn: Callable, after: Iterable[str] = ()) -> None:
+        """
+        name: Step name in the timeline; other steps may wait for it.
+        fn: Work to run; returning normally marks the step done, raising marks it failed.
+            Dependents run either way (they check state themselves).
+        after: Steps or milestones that must finish first.
+        """
+        with self._lock:
+            self._steps[name] = StartupStep(name, fn, after)
+            started = self._started
+        if started:
+            self._launch(self._steps[name])
+
+    def milestone(self, name: str) -> None:
+        """Declare an external readiness signal that steps can wait for"""
+        with self._lock:
+            self._steps.setdefault(name, StartupStep(name, None, ()))
+
+    def mark(self, name: str) -> None:
+        """Signal a milestone (idempotent)"""
+        self.milestone(name)
+        step = self._steps[name]
+        if step.done.is_set():
+            return
+        step.started_at = step.ended_at = time.perf_counter()
+        step.status = "ok"
+        logger.info("Startup milestone %s @ %.0f ms", name, self._offset_ms(step.ended_at))
+        step.done.set()
+        self._maybe_report()
+
+    # --- Execution ---
+
+    def start(self) -> None:
+        """Launch every step; each waits on its own thread for its dependencies"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            steps = [s for s in self._steps.values() if s.fn is not None]
+        for step in steps:
+            self._launch(step)
+
+    def _launch(self, step: StartupStep) -> None:
+        step.queued_at = time.perf_counter()
+        threading.Thread(target=self._run, args=(step,), name=f"startup-{step.name}", daemon=True).start()
+
+    def _run(self, step: StartupStep) -> None:
+        for dep in step.after:
+            self.milestone(dep)  # Unknown names become milestones someone has to mark
+            self._steps[dep].done.wait()
+        step.started_at = time.perf_counter()
+        step.status = "running"
+        try:
+            step.fn()
+            step.status = "ok"
+        except Exception as e:
+            step.status = "failed"
+            step.error = str(e)
+            logger.error("Startup step %s failed: %s", step.name, e)
+        step.ended_at = time.perf_counter()
+        logger.info("Startup step %s %.0f ms (@ %.0f ms)", step.name, (step.ended_at - step.started_at) * 1000,
+                    self._offset_ms(step.ended_at))
+        step.done.set()
+        self._maybe_report()
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> bool:
+        """Block until a step or milestone has finished"""
+        self.milestone(name)
+        return self._steps[name].done.wait(timeout)
+
+    def is_done(self, name: str) -> bool:
+        step = self._steps.get(name)
+        return bool(step and step.done.is_set())
+
+    # --- Timeline ---
+
+    def timeline(self) -> List[dict]:
+        """Steps and milestones in start order; times are ms since the orchestrator was created"""
+        with self._lock:
+            steps = list(self._steps.values())
+        rows = []
+        for step in steps:
+            rows.append({
+                "step": step.name,
+                "kind": "milestone" if step.fn is None else "step",
+                "after": list(step.after),
+                "start_ms": self._offset_ms(step.started_at),
+                "end_ms": self._offset_ms(step.ended_at),
+                "duration_ms": round((step.ended_at - step.started_at) * 1000, 1)
+                if step.started_at is not None and step.ended_at is not None else None,
+                # Time spent ready-to-queue but waiting on dependencies
+                "blocked_ms": round((step.started_at - step.queued_at) * 1000, 1)
+                if step.queued_at is not None and step.started_at is not None else None,
+                "status": step.status,
+                "error": step.error,
+            })
+        rows.sort(key=lambda r: (r["start_ms"] is None, r["start_ms"] or 0.0))
+        return rows
+
+    def _maybe_report(self) -> None:
+        with self._lock:
+            if self._reported or not self._started:
+                return
+            if not all(s.done.is_set() for s in self._steps.values()):
+                return
+            self._reported = True
+        timeline = self.timeline()
+        total = max((r["end_ms"] or 0.0) for r in timeline) if timeline else 0.0
+        logger.info("Startup finished in %.0f ms", total)
+        if self.on_complete:
+            try:
+                self.on_complete(timeline)
+            except Exception as e:
+                logger.warning("Startup timeline report failed: %s", e)
@@ -0,0 +1,12 @@
+"""
+Small statistics helpers shared by the metrics code.
+"""
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of `values` (0.0 for an empty sequence)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
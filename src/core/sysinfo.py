@@ -0,0 +1,68 @@
+"""
+Process resource probes (resident memory) without third-party dependencies.
+"""
+
+import os
+import sys
+
+
+def _windows_memory_counters():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    psapi = ctypes.WinDLL("psapi")
+    kernel32 = ctypes.windll.kernel32
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+    return counters
+
+
+def _proc_status(field):
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def rss_bytes() -> int:
+    """Current resident set size in bytes (0 if unknown)"""
+    try:
+        if sys.platform == "win32":
+            return int(_windows_memory_counters().WorkingSetSize)
+        if os.path.exists("/proc/self/status"):
+            return _proc_status("VmRSS")
+    except Exception:
+        pass
+    return 0
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size in bytes since process start (0 if unknown)"""
+    try:
+        if sys.platform == "win32":
+            return int(_windows_memory_counters().PeakWorkingSetSize)
+        if os.path.exists("/proc/self/status"):
+            return _proc_status("VmHWM")
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+    except Exception:
+        return 0
@@ -0,0 +1,158 @@
+"""
+CPU thread budget for the ASR (ctranslate2) and LLM (llama.cpp) engines.
+
+Both engines default to one thread per logical core. When they run at the
+same time on a CPU-only machine they oversubscribe every core and thrash,
+so we hand each engine an explicit thread count and (optionally) a disjoint
+core set.
+"""
+
+import logging
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EngineThreads:
+    """Thread allocation for a single engine"""
+    threads: int
+    workers: int = 1
+    cores: List[int] = field(default_factory=list)
+
+
+@dataclass
+class ThreadBudget:
+    """Thread allocation for both engines"""
+    asr: EngineThreads
+    llm: EngineThreads
+    total: int
+    pinned: bool = False
+
+    def to_dict(self):
+        return {
+            "total": self.total,
+            "pinned": self.pinned,
+            "asr": {"threads": self.asr.threads, "workers": self.asr.workers, "cores": self.asr.cores},
+            "llm": {"threads": self.llm.threads, "cores": self.llm.cores},
+        }
+
+
+def available_cores() -> List[int]:
+    """Logical cores this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_threads(total: int = 0, asr_share: float = 0.5, reserve: int = 1,
+                 pin: bool = False) -> ThreadBudget:
+    """
+    Split the available cores between ASR and LLM.
+    total: Cores to hand out (0 = all available cores).
+    asr_share: Fraction of the budget given to ASR; the LLM gets the rest.
+    reserve: Cores left free for the UI, hotkey and audio threads.
+    pin: Record disjoint core sets so each engine can be pinned to its own cores.
+    """
+    cores = available_cores()
+    if total <= 0 or total > len(cores):
+        total = len(cores)
+
+    usable = max(total - reserve, 2)
+    usable = min(usable, len(cores)) if len(cores) >= 2 else 1
+
+    if usable < 2:
+        # Single core: nothing to partition, both engines share it
+        single = EngineThreads(threads=1, cores=cores[:1] if pin else [])
+        return ThreadBudget(asr=single, llm=EngineThreads(threads=1, cores=single.cores),
+                            total=1, pinned=pin)
+
+    asr_share = min(max(asr_share, 0.1), 0.9)
+    asr_threads = min(max(int(round(usable * asr_share)), 1), usable - 1)
+    llm_threads = usable - asr_threads
+
+    # Leave the first `reserve` cores (core 0 usually takes the most interrupts) to the UI
+    pool = cores[len(cores) - usable:]
+    asr_cores = pool[:asr_threads] if pin else []
+    llm_cores = pool[asr_threads:asr_threads + llm_threads] if pin else []
+
+    return ThreadBudget(
+        asr=EngineThreads(threads=asr_threads, workers=1, cores=asr_cores),
+        llm=EngineThreads(threads=llm_threads, cores=llm_cores),
+        total=usable,
+        pinned=pin,
+    )
+
+
+def plan_from_config(config) -> ThreadBudget:
+    """Build a budget from the app config (cpu_threads / asr_thread_share / cpu_affinity)"""
+    return plan_threads(
+        total=int(config.get("cpu_threads", 0) or 0),
+        asr_share=float(config.get("asr_thread_share", 0.5)),
+        pin=bool(config.get("cpu_affinity", False)),
+    )
+
+
+def _get_thread_affinity():
+    if sys.platform == "win32":
+        return None  # Windows has no GetThreadAffinityMask; restore to the process mask instead
+    if hasattr(os, "sched_getaffinity"):
+        return set(os.sched_getaffinity(0))
+    return None
+
+
+def _set_thread_affinity(cores) -> bool:
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        if cores is None:
+            proc_mask = ctypes.c_size_t()
+            sys_mask = ctypes.c_size_t()
+            kernel32.GetProcessAffinityMask(kernel32.GetCurrentProcess(),
+                                            ctypes.byref(proc_mask), ctypes.byref(sys_mask))
+            mask = proc_mask.value
+        else:
+            mask = 0
+            for c in cores:
+                mask |= 1 << c
+        kernel32.SetThreadAffinityMask.restype = ctypes.c_size_t
+        kernel32.SetThreadAffinityMask.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+        return kernel32.SetThreadAffinityMask(kernel32.GetCurrentThread(), mask) != 0
+    if hasattr(os, "sched_setaffinity") and cores is not None:
+        # On Linux pid 0 means the calling thread, and threads it spawns inherit the mask
+        os.sched_setaffinity(0, cores)
+        return True
+    return False
+
+
+@contextmanager
+def pinned(cores: Optional[List[int]]):
+    """
+    Pin the calling thread to `cores` for the duration of the block.
+    Worker threads created inside the block (ctranslate2 pool, OpenMP team)
+    inherit the mask on Linux. On Windows only the calling thread is pinned.
+    No-op when `cores` is empty.
+    """
+    if not cores:
+        yield
+        return
+
+    previous = _get_thread_affinity()
+    applied = False
+    try:
+        applied = _set_thread_affinity(cores)
+    except Exception as e:
+        logger.warning("Failed to pin thread %s to %s: %s", threading.current_thread().name, cores, e)
+    try:
+        yield
+    finally:
+        if applied:
+            try:
+                _set_thread_affinity(previous)
+            except Exception:
+                pass
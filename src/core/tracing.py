@@ -0,0 +1,159 @@
+"""
+Per-utterance latency tracing.
+
+Every utterance gets an UtteranceTrace that collects timestamps as it
+moves through the pipeline (hotkey edge -> audio stream -> ASR -> LLM ->
+paste). Finished traces go into a bounded in-memory ring used for
+p50/p95/p99 aggregates, are pushed to an optional sink (the WebSocket
+broadcast) and can be appended to a JSONL file.
+"""
+
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from src.core.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+# Marks in pipeline order
+MARKS = (
+    "hotkey",        # Hotkey press edge (OS event time)
+    "stream_start",  # Audio input stream started
+    "first_sample",  # First audio callback with data
+    "stop",          # Hotkey release handled, stream stopping
+    "handoff",       # WAV written / audio handed to the pipeline
+    "asr_start",
+    "asr_end",
+    "llm_start",
+    "llm_end",
+    "paste",
+)
+
+# Derived spans: name -> (from mark, to mark)
+SPANS = {
+    "press_to_stream": ("hotkey", "stream_start"),
+    "stream_to_first_sample": ("stream_start", "first_sample"),
+    "recording": ("stream_start", "stop"),
+    "handoff": ("stop", "handoff"),
+    "queue": ("handoff", "asr_start"),
+    "asr": ("asr_start", "asr_end"),
+    "llm": ("llm_start", "llm_end"),
+    "paste": ("llm_end", "paste"),
+    "release_to_paste": ("stop", "paste"),
+}
+
+_ids = itertools.count(1)
+
+
+class UtteranceTrace:
+    """Timestamps for one utterance (perf_counter based, plus the wall-clock start)"""
+
+    def __init__(self):
+        self.id = next(_ids)
+        self.wall_start = time.time()
+        self.marks: Dict[str, float] = {}
+        self.meta: Dict[str, object] = {}
+
+    def mark(self, name: str, t: Optional[float] = None) -> None:
+        """Record `name` now (or at perf_counter time `t`). The first value wins."""
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() if t is None else t
+
+    def mark_wall(self, name: str, wall_ts: float) -> None:
+        """Record a mark given as a time.time() timestamp (e.g. a keyboard event time)"""
+        self.mark(name, time.perf_counter() - (time.time() - wall_ts))
+
+    def spans(self) -> Dict[str, float]:
+        out = {}
+        for span, (a, b) in SPANS.items():
+            if span == "paste" and "llm_end" not in self.marks:
+                a = "asr_end"  # LLM disabled: paste follows ASR directly
+            if a in self.marks and b in self.marks:
+                out[span] = max(self.marks[b] - self.marks[a], 0.0)
+        if self.marks:
+            out["total"] = max(self.marks.values()) - min(self.marks.values())
+        return out
+
+    def to_dict(self) -> dict:
+        origin = min(self.marks.values()) if self.marks else 0.0
+        return {
+            "id": self.id,
+            "started_at": round(self.wall_start, 3),
+            "marks_ms": {k: round((v - origin) * 1000, 2)
+                         for k, v in sorted(self.marks.items(), key=lambda kv: kv[1])},
+            "spans_ms": {k: round(v * 1000, 2) for k, v in self.spans().items()},
+            "meta": self.meta,
+        }
+
+
+class Tracer:
+    """Bounded ring of finished traces with percentile aggregates"""
+
+    def __init__(self, capacity: int = 200):
+        self._ring = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.jsonl_path: Optional[str] = None
+        self.sink: Optional[Callable[[dict], None]] = None
+        self._observers: List[Callable[[dict], None]] = []
+
+    def configure(self, jsonl_path: Optional[str] = None,
+                  sink: Optional[Callable[[dict], None]] = None) -> None:
+        self.jsonl_path = jsonl_path or None
+        self.sink = sink
+
+    def add_observer(self, observer: Callable[[dict], None]) -> None:
+        """Called with every finished record, in addition to the sink (e.g. metrics histograms)"""
+        self._observers.append(observer)
+
+    def begin(self) -> UtteranceTrace:
+        return UtteranceTrace()
+
+    def finish(self, trace: UtteranceTrace) -> dict:
+        record = trace.to_dict()
+        with self._lock:
+            self._ring.append(record)
+        for observer in self._observers:
+            try:
+                observer(record)
+            except Exception as e:
+                logger.warning("Trace observer failed: %s", e)
+        if self.sink:
+            try:
+                self.sink(record)
+            except Exception as e:
+                logger.warning("Trace sink failed: %s", e)
+        if self.jsonl_path:
+            try:
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            except Exception as e:
+                logger.warning("Trace file write failed: %s", e)
+        return record
+
+    def recent(self, n: int = 20) -> list:
+        with self._lock:
+            return list(self._ring)[-n:]
+
+    def summary(self) -> dict:
+        with self._lock:
+            records = list(self._ring)
+        out = {"count": len(records), "spans_ms": {}}
+        for span in list(SPANS) + ["total"]:
+            values = [r["spans_ms"][span] for r in records if span in r["spans_ms"]]
+            if values:
+                out["spans_ms"][span] = {
+                    "n": len(values),
+                    "p50": round(percentile(values, 50), 2),
+                    "p95": round(percentile(values, 95), 2),
+                    "p99": round(percentile(values, 99), 2),
+                }
+        return out
+
+
+# Global Instance
+tracer = Tracer()
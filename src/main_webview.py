@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
-import webview
-import threading
 import sys
 import os
+# Import-time profiling (--profile-imports / A8_PROFILE_IMPORTS=1) has to start before anything heavy.
+# Only what the first window needs is imported up front; tray, engines and clients load on demand.
+from src.core.importprof import profiler
+if profiler.requested():
+    profiler.install()
+import webview
+import threading
 # Fix: Allow multiple OpenMP libraries (torch + ctranslate2 conflict)
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 os.environ["HF_HUB_DISABLE_SYMLINKS_WARNING"] = "1"
@@ -15,50 +20,25 @@ if sys.platform == "win32":
     import codecs
     sys.stdout = codecs.getwriter("utf-8")(sys.stdout.detach())
     sys.stderr = codecs.getwriter("utf-8")(sys.stderr.detach())
-import pystray
 import subprocess
 import socket
 import time
 import atexit
-from PIL import Image, ImageDraw
 
-# LOGGING SETUP FOR RELEASE
-# In frozen mode (EXE), redirect stdout/stderr to a file for debugging
+# LOGGING SETUP
+# Records go through a queue and are written by a background thread (src.core.log).
+# In frozen mode (EXE) print() output is routed into the same queue and into a rotating file.
+from src.core import log
 if getattr(sys, 'frozen', False):
-    log_path = os.path.expanduser("~/.a8qingyu_debug.log")
-    try:
-        # Open in append mode with buffering=1 (line buffered)
-        log_file = open(log_path, 'a', encoding='utf-8', buffering=1)
-        
-        # Write header
-        log_file.write(f"\n\n=== A8 Whisper Session Started: {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n")
-        
-        # Define a Tee-like writer if we want to keep original stdout (though it's None in noconsole)
-        class LogWriter:
-            def __init__(self, stream, file):
-                self.stream = stream
-                self.file = file
-            def write(self, message):
-                try:
-                    self.file.write(message)
-                    self.file.flush() # Ensure it hits disk
-                    if self.stream: self.stream.write(message)
-                except: pass
-            def flush(self):
-                try:
-                    self.file.flush()
-                    if self.stream: self.stream.flush()
-                except: pass
-                
-        sys.stdout = LogWriter(sys.stdout, log_file)
-        sys.stderr = LogWriter(sys.stderr, log_file)
-        print(f"[INFO] Logging to {log_path}")
-    except Exception as e:
-        print(f"[ERROR] Failed to setup logging: {e}")
-        pass # Fallback to no logging
+    log.setup(path=log.LOG_FILE, redirect_stdio=True)
+    print(f"=== A8 Whisper Session Started: {time.strftime('%Y-%m-%d %H:%M:%S')} ===")
+    print(f"[INFO] Logging to {log.LOG_FILE}")
+else:
+    log.setup(path=os.environ.get("A8_LOG_FILE") or None)
 
 
 from src import api_server
+from src.core.config import config_store
 
 from src.webview_bridge import WebviewBridge
 
@@ -131,9 +111,13 @@ class DevServer:
 
 # Global reference for cleanup
 overlay_process = None
+level_channel = None
 
 def cleanup_processes():
     global overlay_process
+    config_store.flush()  # os._exit skips atexit: write a pending debounced save now
+    if level_channel:
+        level_channel.close()  # Unlinks the shared-memory block
     if overlay_process:
         print("Killing overlay process...")
         try:
@@ -144,9 +128,14 @@ def cleanup_processes():
                 overlay_process.kill()
             except:
                 pass
+    log.shutdown()  # Drain the log queue (also skipped by os._exit)
 
 def create_tray_icon(main_window):
     """Create system tray icon"""
+    # Imported here: the tray is created after the window is up
+    import pystray
+    from PIL import Image, ImageDraw
+
     def show_window(icon, item):
         main_window.show()
         main_window.restore()
@@ -219,6 +208,12 @@ def main():
         start_overlay()
         return
 
+    # 0b. Batch transcription CLI: A8轻语.exe --transcribe <files/folders> [-o out.jsonl]
+    if "--transcribe" in sys.argv:
+        from src.batch_transcribe import main as start_batch
+        idx = sys.argv.index("--transcribe")
+        sys.exit(start_batch(sys.argv[idx + 1:]))
+
     global overlay_process
     api = WebviewBridge()
     
@@ -281,20 +276,16 @@ def main():
         easy_drag=False    # Disable global drag (fixes button clicks & resizing)
     )
     
-    def init_app():
-        # This runs in a separate thread AFTER the window loop has started
-        # Safe to access window handle and start background tasks
-        print("[OK] GUI Loop Started. Initializing App...")
-        
-        # 1. Initialize Bridge with Window Handle (Safe now)
-        api._set_window_internal(window_main)
-        # api.set_windows(window_main, None) # Old compatibility
-        
-        # 2. Start WebSocket API Server
+    # Startup steps that need no window start right away, in parallel with the
+    # webview loop; model loading waits for the "window" milestone (see WebviewBridge)
+    def start_ws_server():
         from src.api_server import start_server_wrapper
         threading.Thread(target=start_server_wrapper, daemon=True).start()
-        
-        # 3. Launch Overlay Process
+        api_server.SERVER_READY.wait(10)
+        if not (api_server.SERVER_LOOP and api_server.SERVER_LOOP.is_running()):
+            raise RuntimeError("WebSocket server did not start")
+
+    def launch_overlay():
         if is_frozen:
             overlay_cmd = [sys.executable, "--overlay"]
             print(f"[INFO] Launching Overlay (Frozen): {overlay_cmd}")
@@ -304,14 +295,40 @@ def main():
             overlay_cmd = [sys.executable, overlay_script]
             print(f"[INFO] Launching Overlay (Script): {overlay_script}")
 
-        global overlay_process
+        global overlay_process, level_channel
+        overlay_env = os.environ.copy()
+        if api.level_channel:
+            from src.core.level_channel import ENV_VAR
+            level_channel = api.level_channel
+            overlay_env[ENV_VAR] = level_channel.name
         overlay_process = subprocess.Popen(
             overlay_cmd,
             cwd=os.path.dirname(os.path.abspath(__file__)),
-            env=os.environ.copy()
+            env=overlay_env
         )
+
+    if profiler.active:
+        def report_imports():
+            profiler.snapshot("startup")
+            profiler.uninstall()
+        api.startup.add("import_report", report_imports, after=("models_ready", "hotkey", "window_styles"))
+
+    api.startup.add("ws_server", start_ws_server)
+    # The overlay reconnects on its own and syncs state on connect, so it need not wait for the server
+    api.startup.add("overlay", launch_overlay)
+    api.startup.start()
+
+    def init_app():
+        # This runs in a separate thread AFTER the window loop has started
+        # Safe to access window handle and start background tasks
+        print("[OK] GUI Loop Started. Initializing App...")
+        if profiler.active:
+            profiler.snapshot("first_window")
+        
+        # Initialize Bridge with Window Handle (Safe now): marks the "window" milestone
+        api._set_window_internal(window_main)
         
-        # 4. Start Tray Icon
+        # Start Tray Icon
         tray = create_tray_icon(window_main)
         threading.Thread(target=tray.run, daemon=True).start()
         print("[OK] System Tray started")
@@ -338,5 +355,8 @@ def main():
     os._exit(0)
 
 if __name__ == '__main__':
+    # Required for the batch transcription process pool in the frozen app
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
 
@@ -9,8 +9,11 @@ sys.path.insert(0, project_root)
 
 from src.ui.native_overlay.qt_overlay import ModernOverlay
 from src.ui.native_overlay.manager import StateManager
+from src.core import log
+from src.core.level_channel import LevelChannel
 
 def main():
+    log.setup()  # Level channel and overlay link messages go through the log queue
     # Allow multiple instances or handle single instance check if needed
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
@@ -24,6 +27,14 @@ def main():
     state_manager = StateManager(overlay)
     state_manager.websocket_url = "ws://127.0.0.1:9000"
     
+    # Levels (and state while animating) come from shared memory when available;
+    # WebSocket then only carries state changes that wake the overlay from IDLE
+    channel = LevelChannel.attach_from_env()
+    if channel:
+        overlay.attach_level_channel(channel)
+        state_manager.topics = ["app_state"]
+        state_manager.binary_topics = []
+    
     print(f"Connecting to {state_manager.websocket_url}...")
     state_manager.connect_websocket()
     
@@ -34,6 +45,7 @@ def main():
     
     # Cleanup
     print("Overlay process exiting...")
+    print(f"[INFO] Overlay link stats: {state_manager.stats()}")
     state_manager.disconnect_websocket()
     sys.exit(exit_code)
 
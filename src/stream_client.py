@@ -0,0 +1,140 @@
+"""
+Test client for the streaming transcription endpoint on ws://127.0.0.1:9000.
+
+Streams a WAV file as 16 kHz mono PCM frames (in real time by default),
+prints partial transcripts as they arrive and the final one at the end.
+The app must be running with the ASR model loaded.
+
+Protocol:
+    -> {"action": "transcribe.start", "payload": {"format": "pcm_s16le", "partial_interval_ms": 1000}}
+    <- {"type": "transcribe_started", "data": {"session": 1, "sample_rate": 16000, ...}}
+    -> binary frames of little-endian int16 samples
+    <- {"type": "transcript", "data": {"final": false, "text": "...", ...}}
+    -> {"action": "transcribe.stop"}
+    <- {"type": "transcript", "data": {"final": true, "text": "...", ...}}
+
+Usage:
+    python src/stream_client.py recording.wav
+    python src/stream_client.py recording.wav --fast --chunk-ms 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import wave
+
+# Add project root to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+SAMPLE_RATE = 16000
+DEFAULT_URL = "ws://127.0.0.1:9000"
+
+
+def load_pcm16(path):
+    """16 kHz mono int16 PCM bytes from a WAV file (downmixed / resampled if needed)"""
+    import numpy as np
+    with wave.open(path, "rb") as wf:
+        channels, width, rate = wf.getnchannels(), wf.getsampwidth(), wf.getframerate()
+        raw = wf.readframes(wf.getnframes())
+    if width != 2:
+        raise ValueError(f"{path}: only 16-bit WAV is supported")
+    samples = np.frombuffer(raw, dtype="<i2").astype(np.float32)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        target = int(len(samples) * SAMPLE_RATE / rate)
+        samples = np.interp(np.linspace(0, len(samples) - 1, target), np.arange(len(samples)), samples)
+    return samples.astype("<i2").tobytes()
+
+
+async def stream_pcm(pcm, url=DEFAULT_URL, chunk_ms=100, realtime=True, prompt=None,
+                     partial_interval_ms=1000, on_message=None):
+    """
+    Stream PCM to the server and wait for the final transcript.
+    Returns a result dict with the text, partial count and latencies (ms).
+    """
+    import websockets
+
+    chunk = int(SAMPLE_RATE * chunk_ms / 1000) * 2
+    result = {"text": None, "partials": 0, "first_partial_ms": None, "final_latency_ms": None,
+              "audio_s": len(pcm) / 2 / SAMPLE_RATE}
+
+    async with websockets.connect(url, max_size=None) as ws:
+        # Replies only; skip the broadcast topics
+        await ws.send(json.dumps({"action": "subscribe", "payload": {"topics": []}}))
+        payload = {"format": "pcm_s16le", "partial_interval_ms": partial_interval_ms}
+        if prompt is not None:
+            payload["prompt"] = prompt
+        await ws.send(json.dumps({"action": "transcribe.start", "payload": payload}))
+
+        started = time.perf_counter()
+        stopped_at = None
+        done = asyncio.get_running_loop().create_future()
+
+        async def receive():
+            async for raw in ws:
+                if isinstance(raw, bytes):
+                    continue
+                msg = json.loads(raw)
+                if on_message:
+                    on_message(msg)
+                data = msg.get("data") or {}
+                if msg.get("type") == "transcript_error":
+                    done.set_exception(RuntimeError(data.get("error")))
+                    return
+                if msg.get("type") != "transcript":
+                    continue
+                now = time.perf_counter()
+                if data.get("final"):
+                    result["text"] = data.get("text", "")
+                    result["final_latency_ms"] = round((now - stopped_at) * 1000, 1) if stopped_at else None
+                    done.set_result(result)
+                    return
+                result["partials"] += 1
+                if result["first_partial_ms"] is None:
+                    result["first_partial_ms"] = round((now - started) * 1000, 1)
+
+        receiver = asyncio.create_task(receive())
+        for offset in range(0, len(pcm), chunk):
+            await ws.send(pcm[offset:offset + chunk])
+            if realtime:
+                # Pace against the wall clock so sleep jitter does not accumulate
+                due = started + (offset + chunk) / 2 / SAMPLE_RATE
+                await asyncio.sleep(max(due - time.perf_counter(), 0))
+            if done.done():
+                break
+        stopped_at = time.perf_counter()
+        await ws.send(json.dumps({"action": "transcribe.stop"}))
+        try:
+            return await done
+        finally:
+            receiver.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a WAV file to the A8轻语 transcription endpoint")
+    parser.add_argument("wav")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--chunk-ms", type=int, default=100)
+    parser.add_argument("--partial-interval-ms", type=int, default=1000, help="0 = final transcript only")
+    parser.add_argument("--prompt", help="Initial prompt (default: app config)")
+    parser.add_argument("--fast", action="store_true", help="Send as fast as possible instead of in real time")
+    args = parser.parse_args(argv)
+
+    def _print(msg):
+        if msg.get("type") == "transcript" and not msg["data"].get("final"):
+            print(f"[partial {msg['data']['audio_s']:.1f}s] {msg['data']['text']}")
+
+    result = asyncio.run(stream_pcm(load_pcm16(args.wav), args.url, args.chunk_ms, not args.fast,
+                                    args.prompt, args.partial_interval_ms, _print))
+    print(f"[final] {result['text']}")
+    print(json.dumps({k: v for k, v in result.items() if k != "text"}), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,136 +1,160 @@
 """
 Window and state management for native overlay.
+
+The WebSocket client is Qt's QWebSocket, driven by the overlay's own event
+loop: no receiver thread, no blocking recv(). Frames that arrive together are
+handled in one pass, so queued audio levels collapse to the newest value
+before the overlay sees them. A refused connection is retried on a short,
+capped backoff (the server is local, so attempts are cheap) and every
+(re)connect asks the server for the current state instead of waiting for the
+next change.
 """
 
-import threading
 import json
-try:
-    import websocket
-except ImportError:
-    # Fallback for testing or when websocket-client is not installed
-    websocket = None
-from typing import Optional, Callable, Dict, Any
 import time
+from collections import deque
+from typing import Optional, Callable, Dict, Any
 
+from PySide6.QtCore import QObject, QTimer, QUrl
+from PySide6.QtWebSockets import QWebSocket
+
+from src.core.protocol import decode_binary
+from src.core.stats import percentile
 from .types import OverlayState, WebSocketMessage
 from .qt_overlay import ModernOverlay
 
 
-class StateManager:
+class StateManager(QObject):
     """State management and WebSocket communication"""
-    
-    def __init__(self, overlay_window: ModernOverlay):
+
+    def __init__(self, overlay_window: ModernOverlay, history: int = 200):
         """Initialize state manager"""
+        super().__init__()
         self.overlay_window = overlay_window
-        self.websocket_client: Optional[websocket.WebSocket] = None
+        self.websocket_client: Optional[QWebSocket] = None
         self.websocket_url = "ws://localhost:9000"  # Updated to match API server port
-        
-        # Threading
-        self._ws_thread: Optional[threading.Thread] = None
+
+        # Reconnection (local server: retry fast, cap low so startup order doesn't matter)
         self._running = False
-        self._reconnect_delay = 1.0
-        self._max_reconnect_delay = 30.0
-        
+        self._connected = False
+        self._reconnect_delay = 0.1
+        self._max_reconnect_delay = 0.5
+        self._next_delay = self._reconnect_delay
+        self._reconnect_timer = QTimer(self)
+        self._reconnect_timer.setSingleShot(True)
+        self._reconnect_timer.timeout.connect(self._open)
+
+        # Newest level not yet applied; flushed once per event-loop pass
+        self._pending_level: Optional[float] = None
+        self._flush_scheduled = False
+
+        # Only these topics are requested from the server; high-rate ones as binary frames.
+        # app_state stays JSON: it is rare and carries the server's send time.
+        self.topics = ["app_state", "audio_level"]
+        self.binary_topics = ["audio_level"]
+
+        # Metrics
+        self.connects = 0
+        self.levels_received = 0
+        self.levels_applied = 0
+        self._connected_at = 0.0
+        self._synced = False
+        self._state_latency = deque(maxlen=history)
+        self._sync_time = deque(maxlen=history)
+
         # Callbacks
         self._message_handlers: Dict[str, Callable] = {
             "app_state": self._handle_state_message,
             "audio_level": self._handle_audio_level_message,
-            "init_status": lambda m: None  # Ignore init status messages
+            "init_status": lambda m: None,  # Ignore init status messages
+            "pipeline_stats": lambda m: None,
+            "trace": lambda m: None,
+            "subscribed": lambda m: None
         }
-        
+
     def connect_websocket(self) -> None:
-        """Connect to WebSocket server"""
+        """Connect to WebSocket server (returns immediately; runs on the Qt event loop)"""
         if self._running:
             return
-            
+
         self._running = True
-        self._ws_thread = threading.Thread(
-            target=self._websocket_loop,
-            daemon=True
-        )
-        self._ws_thread.start()
-        
+        self.websocket_client = QWebSocket(parent=self)
+        self.websocket_client.connected.connect(self._on_connected)
+        self.websocket_client.disconnected.connect(self._on_disconnected)
+        self.websocket_client.textMessageReceived.connect(self._process_message)
+        self.websocket_client.binaryMessageReceived.connect(lambda frame: self._process_message(bytes(frame)))
+        self._open()
+
     def disconnect_websocket(self) -> None:
         """Disconnect from WebSocket server"""
         self._running = False
-        
+        self._reconnect_timer.stop()
+
         if self.websocket_client:
             try:
                 self.websocket_client.close()
             except Exception:
                 pass
-            self.websocket_client = None
-            
-        if self._ws_thread and self._ws_thread.is_alive():
-            self._ws_thread.join(timeout=2.0)
-            
-    def _websocket_loop(self) -> None:
-        """Main WebSocket connection loop with reconnection"""
-        if websocket is None:
-            print("WebSocket client not available - install websocket-client package")
-            return
-            
-        reconnect_delay = self._reconnect_delay
-        
-        while self._running:
-            try:
-                print(f"Connecting to WebSocket: {self.websocket_url}")
-                
-                self.websocket_client = websocket.WebSocket()
-                self.websocket_client.connect(self.websocket_url)
-                
-                print("WebSocket connected")
-                reconnect_delay = self._reconnect_delay  # Reset delay on successful connection
-                
-                # Message loop
-                while self._running:
-                    try:
-                        message = self.websocket_client.recv()
-                        if message:
-                            self._process_message(message)
-                    except Exception as e:
-                        # Handle both websocket exceptions and general exceptions
-                        if websocket and hasattr(websocket, 'WebSocketTimeoutException') and isinstance(e, websocket.WebSocketTimeoutException):
-                            continue
-                        print(f"WebSocket receive error: {e}")
-                        break
-                        
-            except Exception as e:
-                print(f"WebSocket connection error: {e}")
-                
-            finally:
-                if self.websocket_client:
-                    try:
-                        self.websocket_client.close()
-                    except Exception:
-                        pass
-                    self.websocket_client = None
-                    
-            # Reconnection delay with exponential backoff
-            if self._running:
-                print(f"Reconnecting in {reconnect_delay} seconds...")
-                time.sleep(reconnect_delay)
-                reconnect_delay = min(reconnect_delay * 2, self._max_reconnect_delay)
-                
-    def _process_message(self, message_str: str) -> None:
-        """Process incoming WebSocket message"""
+
+    # --- Connection lifecycle ---
+
+    def _open(self) -> None:
+        if self._running and self.websocket_client:
+            self.websocket_client.open(QUrl(self.websocket_url))
+
+    def _on_connected(self) -> None:
+        print("WebSocket connected")
+        self._connected = True
+        self.connects += 1
+        self._connected_at = time.perf_counter()
+        self._synced = False
+        self._next_delay = self._reconnect_delay  # Reset delay on successful connection
+        self.send_message_raw({"action": "subscribe",
+                               "payload": {"topics": self.topics, "binary": self.binary_topics}})
+        self.send_message_raw({"action": "getState"})
+
+    def _on_disconnected(self) -> None:
+        # Also emitted when an open() attempt fails (e.g. the server is not up yet)
+        if self._connected:
+            print("WebSocket disconnected")
+        self._connected = False
+        if self._running and not self._reconnect_timer.isActive():
+            self._reconnect_timer.start(int(self._next_delay * 1000))
+            self._next_delay = min(self._next_delay * 2, self._max_reconnect_delay)
+
+    # --- Incoming messages ---
+
+    def _process_message(self, message_str) -> None:
+        """Process incoming WebSocket message (JSON text or binary frame)"""
         try:
-            data = json.loads(message_str)
-            message = WebSocketMessage.from_dict(data)
-            
+            if isinstance(message_str, bytes):
+                message = WebSocketMessage(*decode_binary(message_str))
+                sent_at = None
+            else:
+                raw = json.loads(message_str)
+                message = WebSocketMessage.from_dict(raw)
+                sent_at = raw.get("t")
+
+            if message.type == "app_state" and sent_at:
+                self._state_latency.append(max(time.time() - sent_at, 0.0))
+
             handler = self._message_handlers.get(message.type)
             if handler:
                 handler(message)
             else:
                 print(f"Unknown message type: {message.type}")
-                
+
         except json.JSONDecodeError as e:
             print(f"Invalid JSON message: {e}")
         except Exception as e:
             print(f"Error processing message: {e}")
-            
+
     def _handle_state_message(self, message: WebSocketMessage) -> None:
         """Handle app state change messages"""
+        self._flush_level()  # Keep levels that arrived first ahead of the state change
+        if not self._synced:
+            self._synced = True
+            self._sync_time.append(time.perf_counter() - self._connected_at)
         try:
             state_str = message.data
             if isinstance(state_str, str):
@@ -140,32 +164,66 @@ class StateManager:
                 print(f"Invalid state data: {message.data}")
         except ValueError as e:
             print(f"Invalid state value: {message.data}, error: {e}")
-            
+
     def _handle_audio_level_message(self, message: WebSocketMessage) -> None:
-        """Handle audio level update messages"""
+        """Handle audio level update messages (coalesced to the newest per event-loop pass)"""
         try:
-            level = float(message.data)
-            self.overlay_window.update_audio_level(level)
+            self._pending_level = float(message.data)
         except (ValueError, TypeError) as e:
             print(f"Invalid audio level: {message.data}, error: {e}")
-            
+            return
+        self.levels_received += 1
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            QTimer.singleShot(0, self._flush_level)
+
+    def _flush_level(self) -> None:
+        self._flush_scheduled = False
+        if self._pending_level is None:
+            return
+        level, self._pending_level = self._pending_level, None
+        self.levels_applied += 1
+        self.overlay_window.update_audio_level(level)
+
+    # --- Outgoing messages ---
+
     def send_message(self, message_type: str, data: Any) -> None:
         """Send message to WebSocket server"""
-        if not self.websocket_client:
+        message = WebSocketMessage(type=message_type, data=data)
+        self.send_message_raw(message.to_dict())
+
+    def send_message_raw(self, payload: Dict[str, Any]) -> None:
+        """Send an action request (e.g. subscribe) to the WebSocket server"""
+        if not self._connected:
             return
-            
+
         try:
-            message = WebSocketMessage(type=message_type, data=data)
-            message_str = json.dumps(message.to_dict())
-            self.websocket_client.send(message_str)
+            self.websocket_client.sendTextMessage(json.dumps(payload))
         except Exception as e:
             print(f"Error sending message: {e}")
-            
+
     def add_message_handler(self, message_type: str, handler: Callable) -> None:
         """Add custom message handler"""
         self._message_handlers[message_type] = handler
-        
+
     def remove_message_handler(self, message_type: str) -> None:
         """Remove message handler"""
         if message_type in self._message_handlers:
-            del self._message_handlers[message_type]
\ No newline at end of file
+            del self._message_handlers[message_type]
+
+    def stats(self) -> Dict[str, Any]:
+        """Link health: reconnects, level coalescing and cross-process state latency"""
+        latency = list(self._state_latency)
+        sync = list(self._sync_time)
+        return {
+            "connected": self._connected,
+            "connects": self.connects,
+            "levels_received": self.levels_received,
+            "levels_applied": self.levels_applied,
+            "state_latency_ms": {
+                "p50": round(percentile(latency, 50) * 1000, 2),
+                "p99": round(percentile(latency, 99) * 1000, 2),
+                "max": round(max(latency) * 1000, 2) if latency else None,
+            },
+            "connect_to_sync_ms": round(sync[-1] * 1000, 2) if sync else None,
+        }
@@ -1,14 +1,29 @@
 import sys
 import math
+import time
+from collections import deque
 from PySide6.QtWidgets import QWidget, QApplication
 from PySide6.QtCore import Qt, QTimer, QRectF, QPointF, Signal, Slot
 from PySide6.QtGui import (
-    QPainter, QColor, QFont, QPainterPath, QPen, QBrush, 
-    QLinearGradient, QRadialGradient
+    QPainter, QColor, QFont, QFontMetrics, QPainterPath, QPen, QBrush, 
+    QLinearGradient, QRadialGradient, QPixmap
 )
 
 from .types import OverlayState, OverlayConfig
 
+STATE_TEXT = {
+    OverlayState.RECORDING: "正在听...",
+    OverlayState.RECOGNIZING: "识别中...",
+    OverlayState.POLISHING: "润色中...",
+    OverlayState.PROCESSING: "处理中..."
+}
+
+# Animation speed in radians per second (was 0.15 per 16 ms frame)
+PHASE_SPEED = 9.375
+
+# Layout: [15px] [Visualizer 30px] [10px] [Text] [20px]
+VISUALIZER_RECT = QRectF(15, 0, 30, 48)
+
 class ModernOverlay(QWidget):
     # Define signals for thread safety
     update_state_signal = Signal(object) # Using object to pass Enum
@@ -41,14 +56,30 @@ class ModernOverlay(QWidget):
         # self.setFixedSize(self._width, self._height) # Dynamic now
         self.resize(self._min_width, self._height)
         
-        # Animation
+        # Animation: only runs while visible (started/stopped on state changes)
+        self._frame_ms = max(int(1000 / max(self.config.animation_fps, 1)), 1)
         self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self._animate)
-        self.timer.start(16)  # 60 FPS
+        self._last_tick = 0.0
+        self.frames = 0
+        
+        # Optional shared-memory level channel (src.core.level_channel), polled every tick
+        self._channel = None
+        self._level_latency = deque(maxlen=200)
         
         # Font
         self._font = QFont("Segoe UI", 10)
         self._font.setWeight(QFont.DemiBold)
+        self._font_metrics = QFontMetrics(self._font)
+        
+        # Paint caches: static layer (background, border, text) rebuilt on resize / state change
+        self._static_cache = None
+        self._static_key = None
+        self._bar_color = QColor("#FF453A")  # Apple Red
+        self._spinner_pen = QPen(QColor("#0A84FF"), 2.5)  # Apple Blue
+        self._spinner_pen.setCapStyle(Qt.RoundCap)
+        self._dirty_rect = VISUALIZER_RECT.toAlignedRect()
 
         # Initial Position
         self._force_position = False 
@@ -65,17 +96,8 @@ class ModernOverlay(QWidget):
 
     def _update_size(self):
         # Get text for current state
-        text_map = {
-            OverlayState.RECORDING: "正在听...",
-            OverlayState.RECOGNIZING: "识别中...",
-            OverlayState.POLISHING: "润色中...",
-            OverlayState.PROCESSING: "处理中..."
-        }
-        text = text_map.get(self._state, "")
-        
-        from PySide6.QtGui import QFontMetrics
-        fm = QFontMetrics(self._font)
-        text_w = fm.horizontalAdvance(text)
+        text = STATE_TEXT.get(self._state, "")
+        text_w = self._font_metrics.horizontalAdvance(text)
         
         # Layout: [15px] [Visualizer 30px] [10px] [Text] [20px]
         # Total width
@@ -106,6 +128,8 @@ class ModernOverlay(QWidget):
         self._update_size() # Update size based on new state/text
         
         if state == OverlayState.IDLE:
+            # Hidden: no timer wakeups at all until the next state change
+            self.timer.stop()
             self.hide()
         else:
             self.show()
@@ -113,38 +137,80 @@ class ModernOverlay(QWidget):
             # Re-center if this is the first show or state change to ensure it's on top
             self._center_on_screen() 
             if not self.timer.isActive():
-                self.timer.start(16)
+                self._last_tick = time.perf_counter()
+                self.timer.start(self._frame_ms)
         
         self.update()
 
     @Slot(float)
     def _update_level_slot(self, level: float):
-        # Smooth interpolation: target level -> current level
+        # Smooth interpolation: target level -> current level (drawn on the next frame)
         self._audio_level = self._audio_level * 0.7 + level * 0.3
         
+    def attach_level_channel(self, channel):
+        """Poll levels/state from shared memory on each animation tick"""
+        self._channel = channel
+
+    def _poll_channel(self):
+        snapshot = self._channel.poll()
+        if snapshot is None:
+            return
+        level, state, written_at = snapshot
+        # Publish -> the frame that draws it
+        self._level_latency.append(max(time.time() - written_at, 0.0))
+        self._update_level_slot(level)
+        try:
+            state = OverlayState(state)
+        except ValueError:
+            return
+        if state != self._state:
+            self._set_state_slot(state)
+
+    def level_latency_ms(self):
+        """Recent channel publish -> paint latencies (ms)"""
+        return [round(v * 1000, 2) for v in self._level_latency]
+
     def _animate(self):
-        self._phase += 0.15
+        if self._channel is not None:
+            self._poll_channel()
+            if not self.timer.isActive():
+                return  # Channel switched us to IDLE
+        
+        # Advance by elapsed time so the animation speed does not depend on animation_fps
+        now = time.perf_counter()
+        self._phase += PHASE_SPEED * min(now - self._last_tick, 0.1)
+        self._last_tick = now
         if self._phase > math.pi * 200: # Prevent overflow eventually
             self._phase = 0
         
-        # Continuous repaint if visible
+        # Only the visualizer moves; the rest comes from the static cache
         if self.isVisible():
-            self.update()
+            self.frames += 1
+            self.update(self._dirty_rect)
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
+    def resizeEvent(self, event):
+        self._static_cache = None
+        super().resizeEvent(event)
+
+    def _static_layer(self):
+        """Background pill, border and state text, cached as a pixmap"""
+        dpr = self.devicePixelRatioF()
+        key = (self.width(), self.height(), self._state, dpr)
+        if self._static_cache is not None and self._static_key == key:
+            return self._static_cache
+        
+        pixmap = QPixmap(int(self.width() * dpr), int(self.height() * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.transparent)
+        
+        painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.Antialiasing)
         
-        # 1. Draw Background (Pill Shape)
+        # Background (Pill Shape)
         rect = QRectF(0, 0, self.width(), self.height())
         path = QPainterPath()
         path.addRoundedRect(rect, 24, 24) 
         
-        # Clear background for transparency
-        painter.setCompositionMode(QPainter.CompositionMode_Clear)
-        painter.fillRect(rect, Qt.transparent)
-        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
-
         # Gradient Background (Semi-transparent)
         bg_gradient = QLinearGradient(0, 0, 0, self.height())
         bg_gradient.setColorAt(0.0, QColor(40, 40, 45, 240)) # Slightly more transparent
@@ -156,28 +222,29 @@ class ModernOverlay(QWidget):
         painter.setPen(QPen(QColor(255, 255, 255, 30), 1))
         painter.drawPath(path)
         
-        # 2. Draw Content
-        # Layout: [15px] [Visualizer 30px] [10px] [Text] [20px]
-        
-        visualizer_area = QRectF(15, 0, 30, self.height())
-        text_area = QRectF(55, 0, self.width() - 75, self.height())
-        
-        # Visualizer
-        self._draw_visualizer(painter, visualizer_area)
-        
         # Text
-        text_map = {
-            OverlayState.RECORDING: "正在听...",
-            OverlayState.RECOGNIZING: "识别中...",
-            OverlayState.POLISHING: "润色中...",
-            OverlayState.PROCESSING: "处理中..."
-        }
-        text = text_map.get(self._state, "")
-        
+        text_area = QRectF(55, 0, self.width() - 75, self.height())
         painter.setPen(QColor(240, 240, 240))
         painter.setFont(self._font)
         # Left align text
-        painter.drawText(text_area, Qt.AlignLeft | Qt.AlignVCenter, text)
+        painter.drawText(text_area, Qt.AlignLeft | Qt.AlignVCenter, STATE_TEXT.get(self._state, ""))
+        painter.end()
+        
+        self._static_cache = pixmap
+        self._static_key = key
+        return pixmap
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        
+        # Source mode replaces the dirty region, clearing last frame's visualizer too
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.drawPixmap(0, 0, self._static_layer())
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+        
+        # Visualizer
+        painter.setRenderHint(QPainter.Antialiasing)
+        self._draw_visualizer(painter, VISUALIZER_RECT)
 
     def _draw_visualizer(self, painter, rect):
         cx = rect.center().x()
@@ -205,9 +272,7 @@ class ModernOverlay(QWidget):
                 x = start_x + i * (bar_w + gap)
                 y = cy - h/2
                 
-                # Color Gradient for bars (Red/Orange)
-                c = QColor("#FF453A") # Apple Red
-                painter.setBrush(c)
+                painter.setBrush(self._bar_color)
                 painter.setPen(Qt.NoPen)
                 painter.drawRoundedRect(QRectF(x, y, bar_w, h), 1.5, 1.5)
                 
@@ -217,9 +282,7 @@ class ModernOverlay(QWidget):
             radius = 8
             angle = -math.degrees(self._phase) * 3
             
-            pen = QPen(QColor("#0A84FF"), 2.5) # Apple Blue
-            pen.setCapStyle(Qt.RoundCap)
-            painter.setPen(pen)
+            painter.setPen(self._spinner_pen)
             
             painter.drawArc(
                 QRectF(cx - radius, cy - radius, radius*2, radius*2),
@@ -1,98 +1,134 @@
 
 import os
 import json
+import logging
 import threading
 import time
-import keyboard
-import pyautogui
 import webview
 from src.api_server import emit_status
 # asr/llm lazy imports inside to save startup time
 # BUT AudioRecorder imports numpy, which must be loaded in main thread for frozen app stability
 from src.core.audio import AudioRecorder
-
-CONFIG_FILE = os.path.expanduser("~/.a8qingyu_config.json")
+from src.core.config import config_store, models_dir
+from src.core.event_bus import UIEventBus, render_js
+from src.core.level_channel import LevelChannel
+from src.core import metrics
+from src.core import log
+from src.core.executor import TaskExecutor
+from src.core.pipeline import UtterancePipeline, transcribe_utterance, polish_utterance
+from src.core.startup import StartupOrchestrator
+from src.core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+STARTUP_FILE = os.path.expanduser("~/.a8qingyu_startup.json")  # Last startup timeline
+
+# Frontend app_state -> native overlay OverlayState
+OVERLAY_STATES = {
+    "recording": "RECORDING",
+    "recognizing": "RECOGNIZING",
+    "polishing": "POLISHING",
+    "processing": "PROCESSING",
+    "typing": "PROCESSING",
+    "idle": "IDLE",
+}
 
 class WebviewBridge:
     def __init__(self):
         self._main_window = None
         self._overlay_window = None
-        self._config = self._load_config()
+        # Shared with the WebSocket server; reads are lock-free snapshots
+        config_store.load()
+        config_store.subscribe(self._on_config_changed)
+        log.apply_config(self._config)
+        config_store.subscribe(lambda changed, snapshot: log.apply_config(snapshot), keys=("log_level", "log_levels"))
         
         # Backend components
         self._recorder = None
         self._asr = None
         self._llm = None
+        self._pipeline = None
         self.is_processing = False
         self.stop_requested = False
         self._initialized = False
+        # Cleared while the hotkey is held: pasting (Ctrl+V) must wait until it is released
+        self._keys_released = threading.Event()
+        self._keys_released.set()
+        self._level_thread = None
+        self._hotkey = None
+        self._budget = None
+        self._budget_lock = threading.Lock()
+        self._trace = None  # Trace of the utterance currently being recorded
+        self._configure_tracer(self._config)
+        config_store.subscribe(lambda changed, snapshot: self._configure_tracer(snapshot), keys=("trace_file",))
+        
+        # Worker pools (threads start lazily on first task)
+        # JS API fire-and-forget work: config pushes, window ops
+        self._ui_tasks = TaskExecutor("ui-tasks", workers=2, max_queue=32)
+        # Serialized recording/processing transitions: hotkey edges and pipeline stage updates.
+        # Unbounded: a dropped release edge would leave the microphone recording
+        self._state_tasks = TaskExecutor("state", workers=1, max_queue=0)
+        # At most one queued _refresh_pipeline_state: bursts of stage changes collapse into it
+        self._refresh_lock = threading.Lock()
+        self._refresh_pending = False
+        # Long-running model downloads, one at a time
+        self._downloads = TaskExecutor("downloads", workers=1, max_queue=4)
+        # Shared-memory level/state channel polled by the overlay process (WebSocket is the fallback)
+        try:
+            self.level_channel = LevelChannel.create()
+        except Exception as e:
+            logger.warning("Level channel unavailable: %s", e)
+            self.level_channel = None
+        
+        # Webview pushes: coalesced per type, flushed as one evaluate_js per frame
+        self._ui_events = UIEventBus(self._flush_ui_events, fps=float(self._config.get("ui_fps", 30)))
         
-        # 【延迟初始化】不在这里启动线程，等 set_windows 调用后再启动
+        # 【延迟初始化】后台任务等待 "window" 就绪信号（webview 循环已启动）后并行执行，不再固定 sleep
+        self._startup_timeline = []
+        self.startup = StartupOrchestrator(on_complete=self._on_startup_complete)
+        self.startup.add("window_styles", self._apply_window_styles, after=("window",))
+        self.startup.add("asr_model", self._init_asr, after=("window",))
+        self.startup.add("llm_model", self._init_llm, after=("window",))
+        self.startup.add("hotkey", self._setup_hotkey, after=("window",))
+        self.startup.add("paste_deps", self._import_paste_deps, after=("window",))
+        self.startup.add("models_ready", self._finish_init, after=("asr_model", "llm_model"))
+
+        # Served at /metrics by the local server; collected only when scraped
+        tracer.add_observer(metrics.observe_trace)
+        metrics.registry.register("app", self._collect_metrics)
 
     def _set_windows(self, main, overlay):
         self._main_window = main
         self._overlay_window = overlay
         
-        # 窗口设置后，延迟启动后台任务
+        # 窗口设置后启动后台任务
         if not self._initialized:
             self._initialized = True
-            # 延迟 1 秒确保 webview 完全就绪
-            def _delayed_init():
-                import time
-                time.sleep(3)
-                print("[INFO] Starting background initialization...")
-                threading.Thread(target=self._init_models, daemon=True).start()
-                threading.Thread(target=self._setup_hotkey, daemon=True).start()
-            threading.Thread(target=_delayed_init, daemon=True).start()
-
-    def _load_config(self):
-        config = {
-            "asr_model": "large-v3",
-            "llm_enabled": True,
-            "use_cloud": False,  # Default to Local
-            "hotkey": "left ctrl+left windows",
-            "overlay_enabled": True,
-            "sound_enabled": False,
-            "models_status": {} 
-        }
-        
-        if os.path.exists(CONFIG_FILE):
+            logger.info("Starting background initialization...")
+            self.startup.start()
+            self.startup.mark("window")
+
+    @property
+    def _config(self):
+        return config_store.snapshot()
+
+    def _configure_tracer(self, snapshot):
+        tracer.configure(
+            jsonl_path=snapshot.get("trace_file") or None,
+            sink=lambda record: emit_status("trace", record)
+        )
+
+    def _on_config_changed(self, changed, snapshot):
+        # Runs on whichever thread updated the store (JS API task, WebSocket server, downloads)
+        if "hotkey" in changed and self._hotkey:
             try:
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    saved = json.load(f)
-                    config.update(saved)
-            except:
-                pass
-        
-        # Check Local Model Status
-        model_size = config.get("asr_model", "large-v3")
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(current_dir)
-        local_path = os.path.join(project_root, "models", f"faster-whisper-{model_size}", "config.json")
-        
-        config["models_status"] = {
-            model_size: os.path.exists(local_path)
-        }
-        
-        return config
-
-    def _refresh_model_status(self):
-        # Check Local Model Status
-        model_size = self._config.get("asr_model", "large-v3")
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(current_dir)
-        local_path = os.path.join(project_root, "models", f"faster-whisper-{model_size}", "config.json")
-        
-        self._config["models_status"] = {
-            model_size: os.path.exists(local_path)
-        }
-
-    def _save_to_disk(self):
-        try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self._config, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            print(f"Config save failed: {e}")
+                self._hotkey.set_combo(snapshot["hotkey"])
+            except ValueError as e:
+                logger.error("Invalid hotkey: %s", e)
+        if "pipeline_max_pending" in changed and self._pipeline:
+            # Read under the pipeline lock on every submit; utterances already in flight are kept
+            self._pipeline.max_pending = int(snapshot["pipeline_max_pending"])
+        self._emit_to_all("config", snapshot)
 
     # --- Exposed API to JS ---
     # 【原则】所有 API 方法必须秒返回，重活放后台线程
@@ -101,20 +137,16 @@ class WebviewBridge:
         # Fire-and-Forget: 通过回调推送 config
         def _push():
             self._emit_to_all("config", self._config)
-        threading.Thread(target=_push, daemon=True).start()
+        self._ui_tasks.submit(_push)
         return {"status": "ok"}
 
     def saveConfig(self, config):
         # Fire-and-Forget: 后台更新，立即返回
         def _save():
-            self._config.update(config)
-            self._save_to_disk()
-            
-            # Re-check model status (e.g. if user switched model)
-            self._refresh_model_status()
-            
-            self._emit_to_all("config", self._config)
-        threading.Thread(target=_save, daemon=True).start()
+            # Subscribers apply the hotkey and push the new config; the file is written debounced
+            if not config_store.update(config):
+                self._emit_to_all("config", self._config)
+        self._ui_tasks.submit(_save)
         return {"status": "ok"}
 
     def minimizeWindow(self):
@@ -124,7 +156,7 @@ class WebviewBridge:
                 if self._main_window:
                     self._main_window.minimize()
             except: pass
-        threading.Thread(target=_do, daemon=True).start()
+        self._ui_tasks.submit(_do)
         return {"status": "ok"}
 
     def closeWindow(self):
@@ -134,7 +166,7 @@ class WebviewBridge:
                 if self._main_window:
                     self._main_window.hide()
             except: pass
-        threading.Thread(target=_do, daemon=True).start()
+        self._ui_tasks.submit(_do)
         return {"status": "ok"}
 
     # Combined Window + Init logic
@@ -142,23 +174,24 @@ class WebviewBridge:
         self._main_window = window
         self._window = window # For style fix
         
-        # Apply Resize Fix
-        threading.Thread(target=self._apply_window_styles, daemon=True).start()
-        
-        # Trigger Init Logic if not already started
+        # Trigger Init Logic if not already started: resize fix, models and hotkey
+        # start together as soon as the window exists
         if not self._initialized:
             self._initialized = True
-            def _delayed_init():
-                time.sleep(1) # Wait for window to show
-                print("[INFO] Starting background initialization...")
-                threading.Thread(target=self._init_models, daemon=True).start()
-                threading.Thread(target=self._setup_hotkey, daemon=True).start()
-            threading.Thread(target=_delayed_init, daemon=True).start()
+            logger.info("Starting background initialization...")
+            self.startup.start()
+            self.startup.mark("window")
 
     def _apply_window_styles(self):
-        time.sleep(0.5)
         if not self._window:
             return
+        # Wait for the page instead of a fixed delay: the native window exists by then,
+        # and showing it only after load avoids the white flash
+        try:
+            if not self._window.events.loaded.wait(5):
+                logger.warning("Window not loaded after 5 s, applying styles anyway")
+        except AttributeError:
+            pass
         
         try:
             import ctypes
@@ -171,7 +204,7 @@ class WebviewBridge:
                 hwnd = ctypes.windll.user32.GetForegroundWindow()
 
             if hwnd:
-                print(f"[INFO] Applying Resize Styles to HWND: {hwnd}")
+                logger.info("Applying Resize Styles to HWND: %s", hwnd)
                 GWL_STYLE = -16
                 WS_THICKFRAME = 0x00040000
                 WS_CAPTION = 0x00C00000
@@ -186,7 +219,7 @@ class WebviewBridge:
                 # Fix: Show window only after styles are applied to prevent white screen
                 self._window.show()
         except Exception as e:
-            print(f"[ERROR] Failed to apply window styles: {e}")
+            logger.error("Failed to apply window styles: %s", e)
 
     def startDrag(self):
         # Native Windows Drag (Smoothest)
@@ -204,13 +237,13 @@ class WebviewBridge:
                 hwnd = ctypes.windll.user32.GetForegroundWindow()
 
             if hwnd:
-                print(f"[INFO] Starting Drag on HWND: {hwnd}")
+                logger.info("Starting Drag on HWND: %s", hwnd)
                 # Send WM_NCLBUTTONDOWN (0xA1) with HTCAPTION (2)
                 ctypes.windll.user32.SendMessageW(hwnd, 0xA1, 2, 0)
             else:
-                print("[ERROR] Drag failed: No Window Handle")
+                logger.error("Drag failed: No Window Handle")
         except Exception as e:
-            print(f"Drag failed: {e}")
+            logger.error("Drag failed: %s", e)
         return {"status": "ok"} 
 
     def maximizeWindow(self):
@@ -220,232 +253,300 @@ class WebviewBridge:
                 if self._main_window:
                     self._main_window.toggle_fullscreen()
             except: pass
-        threading.Thread(target=_do, daemon=True).start()
+        self._ui_tasks.submit(_do)
         return {"status": "ok"}
 
     def downloadModel(self, model_name):
-        print(f"Downloading model: {model_name}")
-        threading.Thread(target=self._download_worker, args=(model_name,), daemon=True).start()
+        logger.info("Downloading model: %s", model_name)
+        self._downloads.submit(self._download_worker, model_name)
         return {"status": "ok"}
 
     def checkLLMFileExists(self):
         # Frontend logic calls this to check if LLM is installed
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(current_dir)
-        llm_path = os.path.join(project_root, "models", "qwen2.5-coder-7b-instruct-q4_k_m.gguf")
+        llm_path = os.path.join(models_dir(), "qwen2.5-coder-7b-instruct-q4_k_m.gguf")
         exists = os.path.exists(llm_path)
-        print(f"[INFO] Checking LLM File: {llm_path} -> {exists}")
+        logger.info("Checking LLM File: %s -> %s", llm_path, exists)
         return exists
 
     def downloadLLMModel(self):
-        print("Downloading LLM Model...")
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(current_dir)
+        logger.info("Downloading LLM Model...")
         # Using huggingface-cli or requests to download GGUF?
         # For now, let's map it to _download_worker but with a special flag or separate worker
         # Since logic is different (single file vs directory), let's create a specific worker or handle it here
-        threading.Thread(target=self._download_llm_worker, daemon=True).start()
+        self._downloads.submit(self._download_llm_worker)
         return {"status": "ok"}
 
     def _download_llm_worker(self):
         model_id = "Qwen/Qwen2.5-Coder-7B-Instruct-GGUF"
         filename = "qwen2.5-coder-7b-instruct-q4_k_m.gguf"
         
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(current_dir)
-        models_dir = os.path.join(project_root, "models")
-        os.makedirs(models_dir, exist_ok=True)
-        local_path = os.path.join(models_dir, filename)
+        target_dir = models_dir()
+        os.makedirs(target_dir, exist_ok=True)
+        local_path = os.path.join(target_dir, filename)
 
-        print(f"[INFO] Downloading LLM to {local_path}...")
+        logger.info("Downloading LLM to %s...", local_path)
         
         try:
-             from huggingface_hub import hf_hub_download
+             from src.core.fetcher import fetch_hf
              
-             # Pulse progress
-             stop_pulse = False
-             def _pulse():
-                p = 0.1
-                while not stop_pulse and p < 0.95:
-                    time.sleep(0.5)
-                    p += 0.02
-                    self._emit_to_all("llm_progress", min(p, 0.99)) # Frontend expects number directly? 
-                    # App.tsx: (bridge as any).onLlmDownloadProgress((progress: number)
-            
-             threading.Thread(target=_pulse, daemon=True).start()
+             # Real byte progress; 1.0 only after the checksum has been verified
+             def _progress(p):
+                self._emit_to_all("llm_progress", min(p["progress"], 0.99)) # App.tsx: onLlmDownloadProgress(progress: number)
+                self._emit_to_all("download_stats", dict(p, model="llm"))
 
-             hf_hub_download(repo_id=model_id, filename=filename, local_dir=models_dir, local_dir_use_symlinks=False)
+             fetch_hf(model_id, target_dir, [filename], on_progress=_progress)
              
-             stop_pulse = True
              self._emit_to_all("llm_progress", 1.0)
-             print("[OK] LLM Download Complete")
+             logger.info("LLM Download Complete")
              
         except Exception as e:
-            print(f"[ERROR] LLM Download Failed: {e}")
+            logger.error("LLM Download Failed: %s", e)
             self._emit_to_all("llm_progress", -1.0)
 
     def _download_worker(self, model_name):
-        # Use huggingface_hub to download Faster-Whisper models
+        # Fetch Faster-Whisper models straight from the hub (mirror) with src.core.fetcher
         try:
-            from huggingface_hub import snapshot_download
-            import os
+            from src.core.fetcher import fetch_hf
             
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            project_root = os.path.dirname(current_dir)
-            output_dir = os.path.join(project_root, "models", f"faster-whisper-{model_name}")
+            output_dir = os.path.join(models_dir(), f"faster-whisper-{model_name}")
             
-            print(f"[INFO] Downloading {model_name} to {output_dir}...")
+            logger.info("Downloading %s to %s...", model_name, output_dir)
             
             # Set up Hugging Face mirror for China users
             os.environ["HF_ENDPOINT"] = "https://hf-mirror.com"
             
-            # Progress simulation
-            stop_pulse = False
-            def _pulse():
-                p = 0.1
-                while not stop_pulse and p < 0.95:
-                    time.sleep(1.0)  # Slower pulse for large downloads
-                    p += 0.02
-                    self._emit_to_all("model_progress", {"model": model_name, "progress": min(p, 0.99)})
-            
-            threading.Thread(target=_pulse, daemon=True).start()
-            
+            # Real byte progress (parallel ranges, resumable); files land only once all are verified
+            def _progress(p):
+                self._emit_to_all("model_progress", {"model": model_name, "progress": min(p["progress"], 0.99)})
+                self._emit_to_all("download_stats", dict(p, model=model_name))
+
             # Download from Systran repository
             repo_id = f"Systran/faster-whisper-{model_name}"
-            snapshot_download(
-                repo_id=repo_id,
-                local_dir=output_dir,
-                local_dir_use_symlinks=False,
-                resume_download=True,
-                max_workers=4
-            )
+            fetch_hf(repo_id, output_dir, on_progress=_progress)
             
-            stop_pulse = True
-            
-            print(f"[OK] Download complete: {model_name}")
+            logger.info("Download complete: %s", model_name)
             self._emit_to_all("model_progress", {"model": model_name, "progress": 1.0})
             
             # Refresh Status
-            self._refresh_model_status()
-            self._emit_to_all("config", self._config)
+            config_store.refresh_models_status(force=True)
             
             # Try to initialize the ASR engine with the new model
             try:
                 from src.core.asr import asr_engine
                 asr_engine.model = None  # Reset current model
                 asr_engine.initialize(model_size=model_name)
-                print(f"[OK] ASR engine initialized with {model_name}")
+                logger.info("ASR engine initialized with %s", model_name)
             except Exception as init_e:
-                print(f"[WARN] Failed to auto-initialize ASR: {init_e}")
+                logger.warning("Failed to auto-initialize ASR: %s", init_e)
             
-        except ImportError as e:
-            print(f"[ERROR] Missing dependency: {e}")
-            print("[ERROR] Please install: pip install huggingface_hub")
-            self._emit_to_all("model_progress", {"model": model_name, "progress": -1})
         except Exception as e:
-            print(f"[ERROR] Download failed: {e}")
+            logger.error("Download failed: %s", e)
             self._emit_to_all("model_progress", {"model": model_name, "progress": -1})
 
+    def getPipelineStats(self):
+        if not self._pipeline:
+            return {"in_flight": 0, "completed": 0, "rejected": 0}
+        return self._pipeline.stats()
+
+    def getTraceSummary(self):
+        return {"summary": tracer.summary(), "recent": tracer.recent(10)}
+
+    def getHotkeyStats(self):
+        return self._hotkey.stats() if self._hotkey else {}
+
+    def getExecutorStats(self):
+        return {
+            "ui": self._ui_tasks.stats(),
+            "state": self._state_tasks.stats(),
+            "downloads": self._downloads.stats(),
+            "threads": threading.active_count(),
+        }
+
+    def getUIEventStats(self):
+        return self._ui_events.stats()
+
+    def getStartupTimeline(self):
+        return self._startup_timeline or self.startup.timeline()
+
+    def _collect_metrics(self):
+        """Pipeline, executor, UI bus, hotkey, audio, model and cache metrics (scrape thread)"""
+        Family, families = metrics.Family, metrics.stats_families
+        out = []
+        dropped = Family("a8_dropped_events_total", "counter", "Events dropped or replaced before delivery")
+        if self._pipeline:
+            stats = self._pipeline.stats()
+            out += families("a8_pipeline", stats, counters=("completed", "rejected", "failed"))
+            dropped.add(stats["rejected"], source="pipeline", reason="full")
+        for name, executor in (("ui", self._ui_tasks), ("state", self._state_tasks), ("downloads", self._downloads)):
+            stats = executor.stats()
+            out += families("a8_executor", stats, {"executor": name},
+                            counters=("submitted", "completed", "failed", "dropped"))
+            dropped.add(stats["dropped"], source=f"executor_{name}", reason="queue_full")
+        stats = self._ui_events.stats()
+        out += families("a8_ui_events", stats,
+                        counters=("published", "coalesced", "dropped", "flushes", "delivered", "errors"))
+        dropped.add(stats["dropped"], source="ui_events", reason="queue_full")
+        dropped.add(stats["coalesced"], source="ui_events", reason="coalesced")
+        if self._hotkey:
+            out += families("a8_hotkey", self._hotkey.stats(), counters=("presses", "bounces"))
+        if self._recorder:
+            out.append(Family("a8_audio_recordings_total", "counter", "Recordings started").add(self._recorder.recordings))
+            out.append(Family("a8_audio_recorded_seconds_total", "counter", "Audio captured").add(
+                self._recorder.recorded_seconds))
+            out.append(Family("a8_audio_status_events_total", "counter", "Input overflow / callback status flags").add(
+                self._recorder.status_events))
+        out.append(dropped)
+
+        # Model residency: loaded in memory vs. present on disk
+        loaded = Family("a8_model_loaded", "gauge", "1 if the engine has a model in memory")
+        loaded.add(bool(self._asr and self._asr.model is not None), engine="asr",
+                   model=self._config.get("asr_model"))
+        llm = self._llm
+        loaded.add(bool(llm and (llm.model or llm.punctuator or llm.api_client)), engine="llm",
+                   model=llm.mode if llm else "none")
+        out.append(loaded)
+        on_disk = Family("a8_model_on_disk", "gauge", "1 if the model files are present")
+        for size, present in self._config.get("models_status", {}).items():
+            on_disk.add(present, model=size)
+        out.append(on_disk)
+
+        cache = Family("a8_cache_requests_total", "counter", "Cache lookups by result")
+        cache.add(config_store.models_scan_skips, cache="models_status", result="hit")
+        cache.add(config_store.models_scans, cache="models_status", result="miss")
+        out.append(cache)
+        if llm:
+            out.append(Family("a8_llm_local_requests_total", "counter",
+                              "Local LLM requests by whether the system prompt matched the previous one")
+                       .add(llm.system_prompt_repeats, system_prompt="same")
+                       .add(llm.system_prompt_changes, system_prompt="changed"))
+        return out
+
     def openExternal(self, url):
         # Fire-and-Forget
         def _do():
             import webbrowser
             webbrowser.open(url)
-        threading.Thread(target=_do, daemon=True).start()
+        self._ui_tasks.submit(_do)
         return {"status": "ok"}
 
     # --- Backend Logic (Copied/Adapted from main_backend_only.py) ---
 
     def _emit_to_all(self, event_type, data):
-        """Send event to both windows - SYNCHRONOUS (called from background threads when UI is idle)"""
-        print(f"[DEBUG] Emitting event: {event_type} with data: {data}")
-        js = f"window.handlePywebviewMessage({{type: '{event_type}', data: {json.dumps(data)}}})"
-        try:
-            if self._main_window:
-                print(f"[DEBUG] Sending to main window: {js[:100]}...")
-                self._main_window.evaluate_js(js)
-            else:
-                print("[DEBUG] Main window not available")
-        except Exception as e:
-            print(f"[DEBUG] Error sending to main window: {e}")
-        try:
-            if self._overlay_window:
-                self._overlay_window.evaluate_js(js)
-        except Exception as e:
-            pass
+        """Queue an event for both windows; delivered asynchronously by the UI event bus"""
+        self._ui_events.publish(event_type, data)
+
+    def _flush_ui_events(self, batch):
+        """UI event bus sender: one evaluate_js per window for the whole batch"""
+        js = render_js(batch, json.dumps)
+        # A window closing mid-flush must not cost the other window its events
+        for window in (self._main_window, self._overlay_window):
+            try:
+                if window:
+                    window.evaluate_js(js)
+            except Exception:
+                pass
             
     def _setup_hotkey(self):
-        # Polling Mode: Most stable approach for Pywebview + WinForms
-        print("[OK] Hotkey detection thread started (Ctrl+LeftWin)")
-        self._key_state = {'ctrl': False, 'win': False, 'was_combo': False}
-        
-        while True:
-            try:
-                # 50ms Polling
-                time.sleep(0.05)
-                
-                # Check status
-                is_ctrl = keyboard.is_pressed('ctrl')
-                is_win = keyboard.is_pressed('left windows') or keyboard.is_pressed('right windows')
-                
-                # Debug: Print if either is pressed (throttled)
-                # if is_ctrl or is_win:
-                #    print(f"Key State - Ctrl: {is_ctrl}, Win: {is_win}")
-                
-                is_combo = is_ctrl and is_win
-                was_combo = self._key_state['was_combo']
-                
-                if is_combo and not was_combo:
-                     # Pressed
-                     print("[HOTKEY] Hotkey Detected: Ctrl+Win")
-                     threading.Thread(target=self._trigger_start, daemon=True).start()
-                elif not is_combo and was_combo:
-                     # Released
-                     print("[HOTKEY] Hotkey Released")
-                     threading.Thread(target=self._trigger_stop, daemon=True).start()
-                     
-                self._key_state['was_combo'] = is_combo
-            except Exception as e:
-                print(f"[ERROR] Hotkey Loop Error: {e}")
-                time.sleep(1)
+        # Event-driven: keyboard hook delivers key-down/up edges, no polling loop
+        from src.core.hotkey import HotkeyEngine
+        self._hotkey = HotkeyEngine(
+            self._config.get("hotkey", "left ctrl+left windows"),
+            on_press=self._on_hotkey_press,
+            on_release=self._on_hotkey_release,
+            debounce_ms=float(self._config.get("hotkey_debounce_ms", 30))
+        )
+        self._hotkey.start()
+
+    def _on_hotkey_press(self, event_time):
+        # Runs on the keyboard hook thread: hand off immediately
+        logger.debug("Hotkey Detected: %s", self._hotkey.combo)
+        self._state_tasks.submit(self._trigger_start, event_time)
+
+    def _on_hotkey_release(self, event_time):
+        logger.debug("Hotkey Released")
+        self._state_tasks.submit(self._trigger_stop)
     
-    def _trigger_start(self):
-        if not self.is_processing and (not self._recorder or not self._recorder.recording):
-            self._start_recording()
+    def _trigger_start(self, event_time=None):
+        # Recording is allowed while earlier utterances are still being processed
+        if not self._recorder or not self._recorder.recording:
+            self._start_recording(event_time)
+            if event_time and self._hotkey:
+                self._hotkey.record_press_to_record(event_time)
     
     def _trigger_stop(self):
         if self._recorder and self._recorder.recording:
             self._stop_and_process()
 
-    def _start_recording(self):
-        if self.is_processing or (self._recorder and self._recorder.recording): return
-        print("Start Recording...")
+    def _set_app_state(self, state):
+        if self.level_channel:
+            self.level_channel.publish_state(OVERLAY_STATES[state])
+        emit_status("app_state", OVERLAY_STATES[state])
+        self._emit_to_all("app_state", state)
+
+    def _start_recording(self, event_time=None):
+        if self._recorder and self._recorder.recording: return
+        logger.debug("Start Recording...")
+        self._keys_released.clear()
+        self._trace = tracer.begin()
+        if event_time:
+            self._trace.mark_wall("hotkey", event_time)
         
         # Native Overlay: Show via WebSocket
-        emit_status("app_state", "RECORDING")
-        self._emit_to_all("app_state", "recording")
+        self._set_app_state("recording")
         
         if not self._recorder:
             # AudioRecorder is now imported at top-level to fix numpy threading issue
             self._recorder = AudioRecorder()
             
         self._recorder.start()
-        threading.Thread(target=self._monitor_levels, daemon=True).start()
+        self._trace.mark("stream_start", self._recorder.stream_started_at)
+        # The previous monitor exits once its recording stops; never run two at once
+        if not (self._level_thread and self._level_thread.is_alive()):
+            self._level_thread = threading.Thread(target=self._monitor_levels, name="level-monitor", daemon=True)
+            self._level_thread.start()
 
     def _stop_and_process(self):
         if not self._recorder or not self._recorder.recording: return
-        print("Stop & Process...")
-        emit_status("app_state", "PROCESSING")
-        self._emit_to_all("app_state", "processing")
+        logger.debug("Stop & Process...")
+        trace, self._trace = self._trace, None
+        trace.mark("stop")
+        self._set_app_state("processing")
         
         audio_file = self._recorder.stop()
+        self._keys_released.set()
+        if self._recorder.first_sample_at:
+            trace.mark("first_sample", self._recorder.first_sample_at)
+        trace.mark("handoff")
         
+        pipeline = self._get_pipeline()
         if not audio_file:
-            self._reset_state()
+            trace.meta["result"] = "no_audio"
+            tracer.finish(trace)
+        elif pipeline.submit(audio_file, trace=trace) is None:
+            logger.warning("Pipeline full (%s pending), utterance dropped", pipeline.max_pending)
+            emit_status("app_state", "ERROR")
+            trace.meta["result"] = "rejected"
+            tracer.finish(trace)
+            self._emit_pipeline_stats()
+            # Refreshing now would replace ERROR before the overlay has shown it
+            timer = threading.Timer(1.5, self._request_state_refresh)
+            timer.daemon = True
+            timer.start()
             return
-            
-        self.is_processing = True
-        threading.Thread(target=self._process_audio, args=(audio_file,)).start()
+
+        self._emit_pipeline_stats()
+        self._refresh_pipeline_state()
+
+    def _get_pipeline(self):
+        if self._pipeline is None:
+            self._pipeline = UtterancePipeline(
+                transcribe=self._asr_stage,
+                polish=self._polish_stage,
+                deliver=self._paste_stage,
+                on_stage=self._on_pipeline_stage,
+                max_pending=int(self._config.get("pipeline_max_pending", 4))
+            )
+        return self._pipeline
 
     def _monitor_levels(self):
         while self._recorder and self._recorder.recording:
@@ -453,111 +554,172 @@ class WebviewBridge:
                 level = self._recorder.get_amplitude()
                 norm = min(level / 2000.0, 1.0)
                 
-                # Broadcast level to Native Overlay
+                # Broadcast level to Native Overlay (shared memory, plus WebSocket for other clients)
+                if self.level_channel:
+                    self.level_channel.publish_level(norm)
                 emit_status("audio_level", norm)
                 
-                # Keep existing frontend sync
-                js = f"window.handleAudioLevel({norm})"
-                if self._main_window: # Only main window now
-                     self._main_window.evaluate_js(js)
+                # Keep existing frontend sync (coalesced: only the latest level is sent per frame)
+                self._ui_events.publish("audio_level", norm)
             except:
                 pass # Ignore errors
             time.sleep(0.05) # 20fps
 
-    def _process_audio(self, audio_file):
-        try:
-            print("Running ASR...")
-            emit_status("app_state", "RECOGNIZING")
-            self._emit_to_all("app_state", "recognizing")
-            
-            if not self._asr:
-                print("ASR not ready.")
-                self._reset_state()
-                return
+    # --- Utterance pipeline stages (ASR -> LLM -> paste) ---
 
-            text = self._asr.transcribe(audio_file)
-            print(f"ASR: {text}")
-            
-            if text:
-                corrected_text = text
-                # LLM Logic
-                if self._config.get("llm_enabled", True) and self._llm:
-                    print("Running LLM...")
-                    emit_status("app_state", "POLISHING")
-                    self._emit_to_all("app_state", "polishing")
-                    try:
-                        corrected_text = self._llm.correct_text(text)
-                        print(f"LLM: {corrected_text}")
-                    except Exception as e:
-                        print(f"LLM Error: {e}")
-                
-                # Typing
-                emit_status("app_state", "PROCESSING") # Reset to generic busy
-                self._emit_to_all("app_state", "typing")
-                try:
-                    import pyperclip
-                    pyperclip.copy(corrected_text)
-                    time.sleep(0.05)
-                    pyautogui.hotkey('ctrl', 'v')
-                except Exception as e:
-                    print(f"Paste Error: {e}")
+    def _asr_stage(self, utt):
+        return transcribe_utterance(self._asr, utt)
 
+    def _polish_stage(self, utt):
+        if not (self._config.get("llm_enabled", True) and self._llm):
+            return utt.text
+        return polish_utterance(self._llm, utt)
+
+    def _paste_stage(self, utt):
+        # Ctrl+V while the user holds Ctrl+Win for the next utterance would not paste
+        self._keys_released.wait(timeout=60)
+        try:
+            import pyautogui
+            import pyperclip
+            pyperclip.copy(utt.corrected)
+            time.sleep(0.05)
+            pyautogui.hotkey('ctrl', 'v')
+            utt.trace.mark("paste")
         except Exception as e:
-            print(f"Processing Error: {e}")
-            emit_status("app_state", "ERROR")
-        finally:
-            self.is_processing = False
+            logger.error("Paste Error: %s", e)
+
+    def _import_paste_deps(self):
+        # Pre-import only (warms sys.modules): off the first-window path, but loaded
+        # before the first paste needs them
+        import pyautogui  # noqa: F401
+        import pyperclip  # noqa: F401
+
+    def _on_pipeline_stage(self, utt, stage):
+        if stage == "done":
+            if utt.error:
+                logger.error("Processing Error: %s", utt.error)
+                emit_status("app_state", "ERROR")
+            utt.trace.meta.update({"seq": utt.seq, "chars": len(utt.corrected or utt.text),
+                                   "result": "error" if utt.error else "ok"})
+            tracer.finish(utt.trace)
+            self._emit_pipeline_stats()
+            return
+        self._request_state_refresh()
+
+    def _request_state_refresh(self):
+        """Queue one _refresh_pipeline_state on the state executor unless one is already waiting"""
+        with self._refresh_lock:
+            if self._refresh_pending:
+                return
+            self._refresh_pending = True
+        self._state_tasks.submit(self._run_state_refresh)
+
+    def _run_state_refresh(self):
+        # Cleared before reading the pipeline: a stage change from here on queues a fresh refresh
+        with self._refresh_lock:
+            self._refresh_pending = False
+        self._refresh_pipeline_state()
+
+    def _refresh_pipeline_state(self):
+        """Derive the UI state from the pipeline. Runs on the serial state executor, so a late update cannot overwrite IDLE"""
+        stage = self._pipeline.current_stage() if self._pipeline else "idle"
+        self.is_processing = stage != "idle"
+        # Recording state wins while the user is dictating the next utterance
+        if self._recorder and self._recorder.recording:
+            return
+        if stage == "idle":
             self._reset_state()
+            return
+        state = {"asr": "recognizing", "polish": "polishing", "deliver": "typing"}.get(stage, "processing")
+        self._set_app_state(state)
 
-    def _reset_state(self):
-        emit_status("app_state", "IDLE") # Hides native overlay
-        self._emit_to_all("app_state", "idle")
-        # Hide overlay after short delay
-        time.sleep(0.5)
-        try:
-            if self._overlay_window:
-                self._overlay_window.hide()
-        except: 
-            pass
+    def _emit_pipeline_stats(self):
+        if self._pipeline:
+            emit_status("pipeline_stats", self._pipeline.stats())
 
-    def _init_models(self):
-        # Identical to main_backend_only but uses emit_to_all
+    def _reset_state(self):
+        self._set_app_state("idle") # Hides native overlay
+        # Hide overlay after short delay (without blocking the pipeline worker)
+        def _hide():
+            try:
+                if self._overlay_window:
+                    self._overlay_window.hide()
+            except: 
+                pass
+        if self._overlay_window:
+            threading.Timer(0.5, _hide).start()
+
+    def _thread_budget(self):
+        # Computed once; ASR and LLM load concurrently and split the cores between them
+        with self._budget_lock:
+            if self._budget is None:
+                from src.core.threads import plan_from_config
+                self._budget = plan_from_config(self._config)
+                logger.info("CPU thread budget: %s", self._budget.to_dict())
+            return self._budget
+
+    def _init_asr(self):
+        budget = self._thread_budget()
         self._emit_to_all("init_status", "正在初始化 ASR...")
         try:
             from src.core.asr import ASREngine
             self._asr = ASREngine()
-            self._asr.initialize(model_size=self._config.get("asr_model", "large-v3"))
+            self._asr.initialize(
+                model_size=self._config.get("asr_model", "large-v3"),
+                cpu_threads=budget.asr.threads,
+                num_workers=budget.asr.workers,
+                cores=budget.asr.cores
+            )
             self._emit_to_all("init_status", "ASR 就绪")
         except:
              # Fallback
              try:
-                 self._asr.initialize(device="cpu", compute_type="int8")
+                 self._asr.initialize(device="cpu", compute_type="int8",
+                                      cpu_threads=budget.asr.threads,
+                                      num_workers=budget.asr.workers,
+                                      cores=budget.asr.cores)
                  self._emit_to_all("init_status", "ASR 就绪 (CPU)")
              except:
                  pass
-                 
-        # LLM Init...
-        if self._config.get("llm_enabled", True):
-            # Using robust path finding similar to ASR
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            project_root = os.path.dirname(current_dir)
-            llm_path = os.path.join(project_root, "models", "qwen2.5-coder-7b-instruct-q4_k_m.gguf")
+
+    def _init_llm(self):
+        budget = self._thread_budget()
+        if self._config.get("llm_enabled", True) and self._config.get("correction_mode") == "PUNCT":
+            from src.core.llm import LLMEngine
+            self._llm = LLMEngine()
+            self._llm.initialize_punct()
+        elif self._config.get("llm_enabled", True):
+            # Same models dir as ASR (next to the exe when frozen)
+            llm_path = os.path.join(models_dir(), "qwen2.5-coder-7b-instruct-q4_k_m.gguf")
             
             if os.path.exists(llm_path):
                  self._emit_to_all("init_status", "初始化 LLM...")
                  from src.core.llm import LLMEngine
                  self._llm = LLMEngine()
                  try:
-                     self._llm.initialize_local(llm_path, n_gpu_layers=-1)
-                     print("[OK] LLM Loaded")
+                     self._llm.initialize_local(llm_path, n_gpu_layers=-1,
+                                                n_threads=budget.llm.threads,
+                                                cores=budget.llm.cores)
+                     logger.info("LLM Loaded")
                  except Exception as e:
-                     print(f"[ERROR] LLM Init Failed: {e}")
+                     logger.error("LLM Init Failed: %s", e)
                      self._emit_to_all("init_status", "LLM 加载失败 (非致命)")
             else:
-                 print(f"[WARN] Local LLM not found at: {llm_path}")
+                 logger.warning("Local LLM not found at: %s", llm_path)
         else:
-            print("[INFO] LLM disabled in config - Skipping")
+            logger.info("LLM disabled in config - Skipping")
 
+    def _finish_init(self):
         # Final Ready Status - Frontend expects "就绪" AND "LLM" to hide spinner
         # See App.tsx: if (e.detail.includes("就绪") && e.detail.includes("LLM"))
         self._emit_to_all("init_status", "服务与LLM就绪")
+
+    def _on_startup_complete(self, timeline):
+        self._startup_timeline = timeline
+        emit_status("startup_timeline", timeline)
+        self._emit_to_all("startup_timeline", timeline)
+        try:
+            with open(STARTUP_FILE, 'w', encoding='utf-8') as f:
+                json.dump(timeline, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            logger.warning("Could not save startup timeline: %s", e)
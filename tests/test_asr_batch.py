@@ -0,0 +1,38 @@
+"""BatchingScheduler: clips past the 30 s window stay off the dispatcher thread"""
+
+import threading
+
+from src.core.asr_batch import SAMPLE_RATE, WINDOW_SECONDS, BatchingScheduler
+
+
+class RecordingASR:
+    """Records which thread each call ran on"""
+
+    model = object()
+
+    def __init__(self):
+        self.calls = []  # (method, thread name, clip lengths)
+
+    def transcribe_batch(self, audios, prompts=None):
+        self.calls.append(("batch", threading.current_thread().name, [len(a) for a in audios]))
+        return ["short"] * len(audios)
+
+    def transcribe(self, audio, prompt=None, **_):
+        self.calls.append(("single", threading.current_thread().name, [len(audio)]))
+        return "long"
+
+
+def test_long_clip_decoded_on_caller_thread():
+    asr = RecordingASR()
+    batcher = BatchingScheduler(asr, max_wait_ms=0)
+    window = int(WINDOW_SECONDS * SAMPLE_RATE)
+
+    assert batcher.transcribe([0.0] * window) == "short"
+    assert batcher.transcribe([0.0] * (window + 1)) == "long"
+
+    caller = threading.current_thread().name
+    assert asr.calls == [("batch", "asr-batcher", [window]), ("single", caller, [window + 1])]
+    stats = batcher.stats()
+    assert stats["requests"] == 2
+    assert stats["oversized"] == 1
+    assert stats["batches"] == 1
@@ -0,0 +1,38 @@
+"""TaskExecutor queueing: bounded pools drop, the unbounded serial one never does"""
+
+import threading
+
+from src.core.executor import TaskExecutor
+
+
+def blocked(executor):
+    """Occupy the executor's only worker until the returned event is set"""
+    release, running = threading.Event(), threading.Event()
+    executor.submit(lambda: (running.set(), release.wait(5)))
+    assert running.wait(5)
+    return release
+
+
+def test_bounded_queue_drops_when_full():
+    executor = TaskExecutor("bounded", workers=1, max_queue=2)
+    release = blocked(executor)
+    accepted = [executor.submit(lambda: None) for _ in range(5)]
+    release.set()
+
+    assert accepted == [True, True, False, False, False]
+    assert executor.dropped == 3
+
+
+def test_unbounded_serial_executor_keeps_every_task_in_order():
+    executor = TaskExecutor("state", workers=1, max_queue=0)
+    release = blocked(executor)
+    done = threading.Event()
+    order = []
+    for i in range(200):
+        assert executor.submit(order.append, i)
+    executor.submit(done.set)
+    release.set()
+
+    assert done.wait(5)
+    assert order == list(range(200))
+    assert executor.dropped == 0
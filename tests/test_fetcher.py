@@ -0,0 +1,178 @@
+"""ModelFetcher against a local HTTP stand-in for the model hub"""
+
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.core.fetcher import ChecksumMismatch, ModelFetcher, RemoteFile
+
+SEGMENT_MIN = 64 << 10
+
+
+class StandIn:
+    """Serves in-memory files; records the Range header and body bytes of every GET"""
+
+    def __init__(self, files):
+        self.files = files  # name -> bytes
+        self.ranges = True
+        self.corrupt = set()
+        self.requests = []  # (name, Range header or None, status, body bytes)
+        self._lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stand_in.handle(self)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def handle(self, req):
+        name = req.path.lstrip("/")
+        if name not in self.files:
+            req.send_error(404)
+            return
+        data = self.files[name]
+        if name in self.corrupt:
+            data = data[:-1] + bytes([data[-1] ^ 0xFF])
+        start, end = 0, len(data) - 1
+        header = req.headers.get("Range")
+        if header and self.ranges:
+            first, _, last = header[len("bytes="):].partition("-")
+            start = int(first)
+            end = min(int(last), end) if last else end
+            status = 206
+            req.send_response(206)
+            req.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            status = 200
+            req.send_response(200)
+        req.send_header("Content-Length", str(end - start + 1))
+        req.end_headers()
+        # Recorded before the body: the client may return as soon as it has read it
+        with self._lock:
+            self.requests.append((name, header, status, end - start + 1))
+        try:
+            req.wfile.write(data[start:end + 1])
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def remote(self, name, **checksums):
+        return RemoteFile(url=f"{self.url}/{name}", path=name, **checksums)
+
+    def body_bytes(self, name):
+        """Body bytes sent for `name`, excluding the 1-byte size probe"""
+        return sum(n for f, header, _, n in self.requests if f == name and header != "bytes=0-0")
+
+
+@pytest.fixture
+def blob():
+    return os.urandom(256 << 10)
+
+
+@pytest.fixture
+def hub(blob):
+    stand_in = StandIn({"model.bin": blob, "config.json": b'{"fake": true}\n'})
+    yield stand_in
+    stand_in.server.shutdown()
+    stand_in.server.server_close()
+
+
+def fetcher(**kwargs):
+    kwargs.setdefault("segments", 4)
+    return ModelFetcher(segment_min_bytes=SEGMENT_MIN, chunk_size=4096, retries=1, **kwargs)
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_parallel_range_requests(hub, blob, tmp_path):
+    progress = []
+    paths = fetcher(on_progress=progress.append, progress_interval=0).fetch(
+        [hub.remote("model.bin", sha256=hashlib.sha256(blob).hexdigest())], str(tmp_path))
+
+    assert read(paths[0]) == blob
+    segments = [r for r in hub.requests if r[1] != "bytes=0-0"]
+    assert len(segments) == 4
+    assert all(status == 206 for _, _, status, _ in segments)
+    assert sum(n for *_, n in segments) == len(blob)
+    assert progress[-1]["done"] == progress[-1]["total"] == len(blob)
+    assert not os.path.exists(paths[0] + ".part")
+    assert not os.path.exists(paths[0] + ".part.json")
+
+
+def test_falls_back_to_one_stream_without_range_support(hub, blob, tmp_path):
+    hub.ranges = False
+    paths = fetcher().fetch([hub.remote("model.bin", sha256=hashlib.sha256(blob).hexdigest())], str(tmp_path))
+
+    assert read(paths[0]) == blob
+    statuses = [status for _, _, status, _ in hub.requests]
+    assert statuses == [200, 200]  # Probe, then one full stream
+    assert hub.body_bytes("model.bin") == len(blob)
+
+
+def test_resumes_segments_from_checkpoint(hub, blob, tmp_path):
+    # An interrupted run: every segment stopped halfway, progress recorded in <part>.json
+    part = tmp_path / "model.bin.part"
+    step = len(blob) // 4
+    segments = [[s, s + step - 1, step // 2] for s in range(0, len(blob), step)]
+    with open(part, "wb") as f:
+        f.truncate(len(blob))
+        for start, _, done in segments:
+            f.seek(start)
+            f.write(blob[start:start + done])
+    (tmp_path / "model.bin.part.json").write_text(json.dumps({"size": len(blob), "segments": segments}))
+
+    paths = fetcher().fetch([hub.remote("model.bin", sha256=hashlib.sha256(blob).hexdigest())], str(tmp_path))
+
+    assert read(paths[0]) == blob
+    assert hub.body_bytes("model.bin") == len(blob) // 2  # Only what was missing
+    requested = sorted(header for _, header, _, _ in hub.requests if header != "bytes=0-0")
+    assert requested == sorted(f"bytes={s + d}-{e}" for s, e, d in segments)
+    assert not (tmp_path / "model.bin.part.json").exists()
+
+
+def test_resumes_single_stream_from_part_size(hub, tmp_path):
+    data = hub.files["config.json"]
+    (tmp_path / "config.json.part").write_bytes(data[:5])
+
+    paths = fetcher().fetch([hub.remote("config.json")], str(tmp_path))
+
+    assert read(paths[0]) == data
+    assert hub.body_bytes("config.json") == len(data) - 5
+
+
+def test_checksum_mismatch_leaves_target_untouched(hub, blob, tmp_path):
+    old = b"previous model version"
+    (tmp_path / "model.bin").write_bytes(old)
+    hub.corrupt.add("model.bin")
+
+    with pytest.raises(ChecksumMismatch):
+        fetcher().fetch([hub.remote("config.json"),
+                         hub.remote("model.bin", sha256=hashlib.sha256(blob).hexdigest())], str(tmp_path))
+
+    assert read(tmp_path / "model.bin") == old
+    assert not (tmp_path / "model.bin.part").exists()  # Corrupt part discarded
+    assert not (tmp_path / "config.json").exists()  # Nothing renamed into place from an incomplete set
+
+
+def test_git_blob_checksum(hub, tmp_path):
+    data = hub.files["config.json"]
+    good = hashlib.sha1(f"blob {len(data)}\0".encode() + data).hexdigest()
+
+    paths = fetcher().fetch([hub.remote("config.json", git_sha1=good)], str(tmp_path))
+    assert read(paths[0]) == data
+
+    with pytest.raises(ChecksumMismatch):
+        fetcher().fetch([hub.remote("config.json", git_sha1="0" * 40)], str(tmp_path / "other"))
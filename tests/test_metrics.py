@@ -0,0 +1,129 @@
+"""GET /metrics on the api_server port: Prometheus text format"""
+
+import asyncio
+import re
+import threading
+import urllib.request
+
+import pytest
+
+from src import api_server
+from src.core import metrics
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+@pytest.fixture(scope="module")
+def server():
+    """api_server.handler + process_request on an ephemeral port, in its own loop thread"""
+    websockets = pytest.importorskip("websockets")
+    ready = threading.Event()
+    state = {}
+
+    async def serve():
+        state["stop"] = asyncio.get_running_loop().create_future()
+        async with websockets.serve(api_server.handler, "127.0.0.1", 0,
+                                    process_request=api_server.process_request) as ws_server:
+            state["port"] = list(ws_server.sockets)[0].getsockname()[1]
+            ready.set()
+            await state["stop"]
+
+    metrics.registry.register("server", api_server.collect_server_metrics)
+    thread = threading.Thread(target=lambda: asyncio.run(serve()), daemon=True)
+    thread.start()
+    assert ready.wait(10)
+    state["loop"] = state["stop"].get_loop()
+    yield f"http://127.0.0.1:{state['port']}"
+    state["loop"].call_soon_threadsafe(state["stop"].set_result, None)
+    thread.join(5)
+    metrics.registry.unregister("server")
+
+
+def scrape(url):
+    with urllib.request.urlopen(url + "/metrics", timeout=5) as response:
+        return response.status, response.headers.get("Content-Type"), response.read().decode("utf-8")
+
+
+def parse(text):
+    """{family: kind}, [(name, labels, value)] from a text exposition"""
+    types, samples = {}, []
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ", 3)
+            assert name not in types, f"second TYPE line for {name}"
+            types[name] = kind
+        elif line and not line.startswith("#"):
+            match = SAMPLE.match(line)
+            assert match, f"malformed sample: {line}"
+            labels = dict(LABEL.findall(match.group(2) or ""))
+            samples.append((match.group(1), labels, float(match.group(3))))
+    return types, samples
+
+
+def test_metrics_endpoint_serves_text_format(server):
+    metrics.observe_trace({"spans_ms": {"asr": 320.0, "llm": 1200.0, "total": 1650.0}})
+    status, content_type, text = scrape(server)
+
+    assert status == 200
+    assert content_type.startswith("text/plain; version=0.0.4")
+    types, samples = parse(text)
+    for name in ("a8_process_resident_memory_bytes", "a8_stage_seconds", "a8_ws_clients"):
+        assert name in types
+    assert types["a8_stage_seconds"] == "histogram"
+    # Every sample belongs to a family declared before it
+    for name, _, _ in samples:
+        assert name in types or re.sub(r"_(bucket|sum|count)$", "", name) in types
+
+
+def test_histogram_buckets_are_cumulative(server):
+    for ms in (3, 40, 40, 700, 45000):
+        metrics.observe_trace({"spans_ms": {"paste": ms}})
+    _, _, text = scrape(server)
+    _, samples = parse(text)
+
+    series = {}
+    counts = {}
+    for name, labels, value in samples:
+        key = tuple(sorted((k, v) for k, v in labels.items() if k != "le"))
+        if name == "a8_stage_seconds_bucket":
+            series.setdefault(key, []).append((labels["le"], value))
+        elif name == "a8_stage_seconds_count":
+            counts[key] = value
+    assert series
+    for key, buckets in series.items():
+        values = [v for _, v in buckets]
+        assert values == sorted(values), f"{key}: buckets not cumulative"
+        assert buckets[-1][0] == "+Inf"
+        assert buckets[-1][1] == counts[key]
+    paste = series[(("span", "run"), ("stage", "paste"))]
+    assert paste[-1][1] >= 5
+    assert dict(paste)["0.005"] >= 1  # 3 ms
+
+
+def test_failing_collector_is_reported_not_a_500(server):
+    def broken():
+        raise RuntimeError("component gone")
+
+    metrics.registry.register("broken", broken)
+    try:
+        status, _, text = scrape(server)
+    finally:
+        metrics.registry.unregister("broken")
+
+    assert status == 200
+    _, samples = parse(text)
+    failed = [labels for name, labels, value in samples if name == "a8_metrics_collector_failed" and value == 1]
+    assert {"collector": "broken", "error": "RuntimeError"} in failed
+    assert any(name == "a8_process_resident_memory_bytes" for name, _, _ in samples)
+
+
+def test_other_paths_still_upgrade_to_websocket(server):
+    websockets = pytest.importorskip("websockets")
+
+    async def roundtrip():
+        async with websockets.connect(server.replace("http://", "ws://")) as ws:
+            await ws.send('{"action": "getMetrics"}')
+            return await asyncio.wait_for(ws.recv(), 5)
+
+    assert '"type": "metrics"' in asyncio.run(roundtrip())